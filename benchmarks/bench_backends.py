@@ -0,0 +1,64 @@
+"""Compares the video library backends on the operations the player uses.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_backends [num_videos]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.columnar_library import ColumnarVideoLibrary
+from src.sqlite_library import SqliteVideoLibrary
+from src.video_library import VideoLibrary
+from .catalog import write_catalog
+
+
+def _timed(function, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(num_videos=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        videos_file = Path(tmp) / "videos.txt"
+        write_catalog(videos_file, num_videos)
+        backends = (
+            ("VideoLibrary", lambda: VideoLibrary(videos_file)),
+            ("Columnar", lambda: ColumnarVideoLibrary(videos_file)),
+            ("SQLite", lambda: SqliteVideoLibrary(
+                Path(tmp) / "videos.db", videos_file)),
+            ("SQLite, reopen", lambda: SqliteVideoLibrary(
+                Path(tmp) / "videos.db", videos_file)),
+        )
+        print(f"{num_videos} videos, ms per operation")
+        print(f"  {'BACKEND':<16}{'LOAD':>10}{'GET':>10}{'PAGE':>10}"
+              f"{'TITLE':>10}{'SHORT':>10}{'TAG':>10}{'RANDOM':>10}")
+        video_id = f"video_{num_videos // 2}"
+        rng = random.Random(0)
+        for name, load in backends:
+            library = None
+
+            def _load():
+                nonlocal library
+                library = load()
+
+            timings = (
+                _timed(_load),
+                _timed(lambda: library.get_video(video_id), 1000),
+                _timed(lambda: list(library.iter_videos_by_title(
+                    num_videos // 2, 20)), 10),
+                _timed(lambda: library.search_titles("science guide"), 10),
+                _timed(lambda: library.search_titles("do"), 10),
+                _timed(lambda: library.search_tags("#cat", "exact"), 10),
+                _timed(lambda: library.random_video_id(rng), 1000),
+            )
+            print(f"  {name:<16}" + "".join(f"{t:>10.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
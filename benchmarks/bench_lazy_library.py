@@ -0,0 +1,46 @@
+"""Compares the startup time and memory of the eager and lazy libraries,
+and the cost of a PLAY-style lookup in each.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_lazy_library [num_videos]
+"""
+
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.lazy_library import LazyVideoLibrary
+from src.video_library import VideoLibrary
+from .catalog import write_catalog
+
+
+def main(num_videos=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "videos.txt"
+        write_catalog(path, num_videos)
+        rng = random.Random(0)
+        video_ids = [f"video_{rng.randrange(num_videos)}"
+                     for _ in range(10_000)]
+        print(f"{num_videos} videos")
+        for name, load in (("VideoLibrary", lambda: VideoLibrary(path)),
+                           ("Lazy", lambda: LazyVideoLibrary(path))):
+            tracemalloc.start()
+            start = time.perf_counter()
+            library = load()
+            elapsed = time.perf_counter() - start
+            used = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            start = time.perf_counter()
+            for video_id in video_ids:
+                library.get_video(video_id)
+            lookup = (time.perf_counter() - start) / len(video_ids)
+            print(f"  {name:<14}{elapsed * 1000:12.2f} ms load"
+                  f"{used / 2 ** 20:10.1f} MiB{lookup * 1e6:10.2f} us/get")
+            del library
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,31 @@
+"""Compares loading the library sequentially and with worker processes.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_parallel_load [num_videos]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.video_library import VideoLibrary
+from .catalog import write_catalog
+
+
+def main(num_videos=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        videos_file = Path(tmp) / "videos.txt"
+        write_catalog(videos_file, num_videos)
+        cores = os.cpu_count() or 1
+        print(f"{num_videos} videos, {cores} cores")
+        for workers in sorted({1, 2, 4, cores}):
+            start = time.perf_counter()
+            VideoLibrary(videos_file, workers=workers)
+            print(f"  {workers:>3} workers "
+                  f"{(time.perf_counter() - start) * 1000:12.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
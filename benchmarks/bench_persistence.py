@@ -0,0 +1,57 @@
+"""Times recording playlist changes with each durability mode, and
+recovering them from the log and from a snapshot.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_persistence [num_changes]
+"""
+
+import sys
+import tempfile
+import time
+
+from src.persistence import DURABILITY_MODES, PlayerStore
+
+
+def _record_changes(store, num_changes):
+    """Creates a playlist and adds num_changes - 1 videos to it."""
+    store.record("create_playlist", "benchmark")
+    for number in range(num_changes - 1):
+        store.record("add_to_playlist", "benchmark", f"video_{number}")
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(num_changes=10_000):
+    print(f"{num_changes} changes recorded")
+    for durability in DURABILITY_MODES:
+        with tempfile.TemporaryDirectory() as directory:
+            store = PlayerStore(directory, durability, snapshot_every=sys.maxsize)
+            store.load()
+            _, elapsed = _timed(_record_changes, store, num_changes)
+            store.close()
+            print(f"  {durability:<8} {elapsed:12.2f} ms"
+                  f"{elapsed * 1000 / num_changes:12.2f} us/change")
+
+    print(f"Recovering {num_changes} changes")
+    with tempfile.TemporaryDirectory() as directory:
+        store = PlayerStore(directory, "none", snapshot_every=sys.maxsize)
+        store.load()
+        _record_changes(store, num_changes)
+        store.close()
+        store = PlayerStore(directory)
+        state, elapsed = _timed(store.load)
+        print(f"  {'log':<8} {elapsed:12.2f} ms")
+        store.compact(state)
+        store.close()
+        store = PlayerStore(directory)
+        _, elapsed = _timed(store.load)
+        store.close()
+        print(f"  {'snapshot':<8} {elapsed:12.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,35 @@
+"""Compares list-backed playlists with the Playlist ordered set.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_playlist [num_videos]
+"""
+
+import sys
+import time
+
+from src.video_playlist import Playlist
+
+
+def _fill_check_empty(playlist, add, video_ids):
+    """Adds every video unless present, then removes them oldest first."""
+    for video_id in video_ids:
+        if video_id not in playlist:
+            add(video_id)
+    for video_id in video_ids:
+        playlist.remove(video_id)
+
+
+def main(num_videos=100_000):
+    video_ids = [f"video_{number}" for number in range(num_videos)]
+    print(f"{num_videos}-entry playlist, add + contains + remove")
+    as_list = []
+    as_playlist = Playlist("benchmark")
+    for name, playlist, add in (("list", as_list, as_list.append),
+                                ("Playlist", as_playlist, as_playlist.add)):
+        start = time.perf_counter()
+        _fill_check_empty(playlist, add, video_ids)
+        print(f"  {name:<10} {(time.perf_counter() - start) * 1000:12.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,49 @@
+"""Times ranked searches on catalogs of growing size, next to substring
+searches for the same words.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_ranked_search [largest_num_videos]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.video_library import VideoLibrary
+from .catalog import vocabulary, write_catalog
+
+_QUERIES = 20
+
+
+def main(largest_num_videos=1_000_000):
+    words, tags = vocabulary()
+    # Frequent, middling and rare words, some with a typo.
+    queries = [f"{words[number]} {tags[number * 3][1:]}"
+               for number in range(0, 2 * _QUERIES, 2)]
+    queries[::2] = [query[:1] + query[2:] for query in queries[::2]]
+    print(f"{'VIDEOS':>10}{'BUILD MS':>12}{'RANKED MS':>12}{'SUBSTRING MS':>14}")
+    num_videos = 10_000
+    while num_videos <= largest_num_videos:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "videos.txt"
+            write_catalog(path, num_videos)
+            library = VideoLibrary(path)
+            start = time.perf_counter()
+            library.ranked_index()
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            for query in queries:
+                library.search_ranked(query, 10)
+            ranked = (time.perf_counter() - start) / len(queries)
+            start = time.perf_counter()
+            for query in queries:
+                library.search_titles(query.split()[0])
+            substring = (time.perf_counter() - start) / len(queries)
+        print(f"{num_videos:>10}{build * 1000:>12.1f}{ranked * 1000:>12.3f}"
+              f"{substring * 1000:>14.3f}")
+        num_videos *= 10
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
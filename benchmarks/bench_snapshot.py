@@ -0,0 +1,42 @@
+"""Compares loading the library from videos.txt and from a snapshot.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_snapshot [num_videos]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.catalog_snapshot import CatalogSnapshot
+from src.video_library import VideoLibrary, _read_catalog
+from .catalog import write_catalog
+
+
+def _timed(name, function):
+    start = time.perf_counter()
+    function()
+    print(f"  {name:<30} {(time.perf_counter() - start) * 1000:10.2f} ms")
+
+
+def main(num_videos=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        videos_file = Path(tmp) / "videos.txt"
+        snapshot_file = Path(tmp) / "videos.snapshot"
+        write_catalog(videos_file, num_videos)
+        print(f"{num_videos} videos")
+        _timed("parse videos.txt", lambda: list(_read_catalog(videos_file)))
+        _timed("library, build snapshot",
+               lambda: VideoLibrary(videos_file, snapshot_file))
+        with CatalogSnapshot(snapshot_file) as snapshot:
+            _timed("decode records + postings",
+                   lambda: (list(snapshot), snapshot.postings()))
+            _timed("open + read one record", lambda: snapshot[num_videos // 2])
+        _timed("library, from videos.txt", lambda: VideoLibrary(videos_file))
+        _timed("library, from snapshot",
+               lambda: VideoLibrary(videos_file, snapshot_file))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
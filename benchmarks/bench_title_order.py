@@ -0,0 +1,52 @@
+"""Compares sorting the library per call against its title-ordered view.
+
+A page of page_size videos from the middle of the listing is what
+SHOW_ALL_VIDEOS LIMIT/OFFSET reads. With the title-ordered view its cost
+depends on page_size only, so it stays flat as num_videos grows.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_title_order [num_videos] [page_size]
+"""
+
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from src.video_library import VideoLibrary
+from .catalog import write_catalog
+
+
+def main(num_videos=100_000, page_size=20, repeat=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "videos.txt"
+        write_catalog(path, num_videos)
+        library = VideoLibrary(path)
+
+    offset = num_videos // 2
+
+    def sort_per_call():
+        return sorted(library.get_all_videos(), key=lambda x: x.title)
+
+    def sort_page_per_call():
+        return sort_per_call()[offset:offset + page_size]
+
+    def sort_search_per_call():
+        return [video for video in sort_per_call()
+                if "guide" in video.title.lower()]
+
+    cases = [
+        ("page, sorted per call", sort_page_per_call),
+        ("page, title-ordered view",
+         lambda: list(library.iter_videos_by_title(offset, page_size))),
+        ("search, sorted per call", sort_search_per_call),
+        ("search, indexed", lambda: library.search_titles("guide")),
+    ]
+    print(f"{num_videos} videos, best of {repeat}")
+    for name, case in cases:
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        print(f"  {name:<30} {best * 1000:10.3f} ms  ({len(case())} results)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,47 @@
+"""Measures the memory used per Video when loading a synthetic catalog.
+
+Run from the root of the repository with
+    python3 -m benchmarks.bench_video_memory [num_videos]
+"""
+
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from src.video import Video
+from src.video_library import _read_catalog
+from .catalog import write_catalog
+
+
+class DictVideo:
+    """The Video layout before it used __slots__ and interned strings."""
+
+    def __init__(self, video_title, video_id, video_tags):
+        self._title = video_title
+        self._video_id = video_id
+        self._tags = tuple(video_tags)
+        self._flagged = None
+
+
+def _bytes_per_video(video_class, path):
+    """Returns the memory kept per video after loading the catalog."""
+    tracemalloc.start()
+    videos = [video_class(*record) for record in _read_catalog(path)]
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / len(videos)
+
+
+def main(num_videos=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "videos.txt"
+        write_catalog(path, num_videos)
+        print(f"{num_videos} videos")
+        for video_class in (DictVideo, Video):
+            print(f"  {video_class.__name__:<10} "
+                  f"{_bytes_per_video(video_class, path):8.1f} bytes/video")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
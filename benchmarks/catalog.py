@@ -0,0 +1,101 @@
+"""Synthetic video catalogs used by the benchmarks.
+
+Words and tags are drawn from Zipf distributions, as on real video sites:
+a handful of tags such as #music are on a large share of the videos while
+most tags are on very few. Run from the root of the repository with
+    python3 -m benchmarks.catalog FILE NUM_VIDEOS [SEED]
+to write a catalog, e.g. 10_000, 1_000_000 or 10_000_000 videos.
+"""
+
+from itertools import accumulate
+import random
+import sys
+
+# The most frequent title words and tags, in order of popularity. The rest
+# of each vocabulary is made of pronounceable made-up words.
+_WORDS = ("amazing", "funny", "cat", "dog", "life", "google", "video",
+          "about", "nothing", "another", "travel", "music", "cooking",
+          "review", "guide", "live", "football", "science", "history", "art")
+_TAGS = ("#animal", "#cat", "#dog", "#google", "#career", "#music",
+         "#food", "#travel", "#sport", "#science", "#funny", "#howto")
+_SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "ta", "zo", "be", "si", "po",
+              "da", "fe", "gu", "hi", "jo", "vy")
+NUM_WORDS = 5000
+NUM_TAGS = 2000
+# Exponent of the Zipf distributions, the larger the more skewed.
+_ZIPF_EXPONENT = 1.1
+_TAGS_PER_VIDEO = (0, 1, 2, 3, 4, 5)
+_TAGS_PER_VIDEO_WEIGHTS = (10, 25, 30, 20, 10, 5)
+
+
+def _made_up_words(count, start, rng):
+    """Returns count distinct made-up words, skipping the first start."""
+    words = []
+    seen = set()
+    while len(words) < count:
+        word = "".join(rng.choices(_SYLLABLES, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words[start:]
+
+
+def vocabulary(num_words=NUM_WORDS, num_tags=NUM_TAGS):
+    """Returns the title words and tags of the catalogs, most frequent
+    first. They only depend on their number, never on the catalog seed."""
+    rng = random.Random("vocabulary")
+    words = list(_WORDS) + _made_up_words(num_words, len(_WORDS), rng)
+    tags = list(_TAGS) + ["#" + word for word in _made_up_words(
+        num_tags, len(_TAGS), rng)]
+    return words[:num_words], tags[:num_tags]
+
+
+def _zipf_cum_weights(count):
+    return list(accumulate(1 / rank ** _ZIPF_EXPONENT
+                           for rank in range(1, count + 1)))
+
+
+def write_catalog(path, num_videos, seed=0, num_words=NUM_WORDS,
+                  num_tags=NUM_TAGS):
+    """Writes a catalog of num_videos random videos in videos.txt format.
+
+    Video number n has the id video_n, and its title ends with n so every
+    title is distinct.
+
+    Args:
+        path: The file to write.
+        num_videos: How many videos the catalog holds.
+        seed: Seed of the random generator, so catalogs are reproducible.
+        num_words: Size of the vocabulary titles are drawn from.
+        num_tags: Number of distinct tags.
+    """
+    rng = random.Random(seed)
+    words, tags = vocabulary(num_words, num_tags)
+    word_weights = _zipf_cum_weights(len(words))
+    tag_weights = _zipf_cum_weights(len(tags))
+    tag_counts = rng.choices(_TAGS_PER_VIDEO, _TAGS_PER_VIDEO_WEIGHTS,
+                             k=num_videos)
+    with open(path, "w") as catalog:
+        lines = []
+        for number, tag_count in enumerate(tag_counts):
+            title = " ".join(rng.choices(words, cum_weights=word_weights,
+                                         k=rng.randint(2, 5)))
+            # Popular tags may be drawn twice, keep each once.
+            video_tags = dict.fromkeys(rng.choices(
+                tags, cum_weights=tag_weights, k=tag_count))
+            lines.append(f"{title.title()} {number} | video_{number} | "
+                         f"{' , '.join(video_tags)}\n")
+            if len(lines) == 10_000:
+                catalog.writelines(lines)
+                lines.clear()
+        catalog.writelines(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path, num_videos, *seed = argv
+    write_catalog(path, int(num_videos), *map(int, seed))
+
+
+if __name__ == "__main__":
+    main()
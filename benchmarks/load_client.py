@@ -0,0 +1,105 @@
+"""Load generator for the video server, reporting command latencies.
+
+Run from the root of the repository with
+    python3 -m benchmarks.load_client [--sessions N] [--commands N]
+        [--host HOST --port PORT]
+
+Without --port, a server is started in the same process on a free port.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from src.server import PROMPT, VideoServer
+from src.video_library import VideoLibrary
+
+_COMMANDS = (
+    "NUMBER_OF_VIDEOS",
+    "SHOW_ALL_VIDEOS LIMIT 10",
+    "PLAY amazing_cats_video_id",
+    "PLAY_RANDOM",
+    "SHOW_PLAYING",
+    "PAUSE",
+    "CONTINUE",
+    "STOP",
+    "SEARCH_VIDEOS cat",
+    "SEARCH_VIDEOS_WITH_TAG #animal",
+    "PLAY_RESULT 1",
+    "CREATE_PLAYLIST my_playlist",
+    "ADD_TO_PLAYLIST my_playlist funny_dogs_video_id",
+    "SHOW_PLAYLIST my_playlist",
+    "FLAG_VIDEO nothing_video_id",
+    "ALLOW_VIDEO nothing_video_id",
+)
+
+
+async def _session(host, port, num_commands, rng, latencies):
+    """Opens one session and times each command until its prompt comes
+    back."""
+    reader, writer = await asyncio.open_connection(host, port)
+    prompt = PROMPT.encode("utf-8")
+    await reader.readuntil(prompt)
+    for _ in range(num_commands):
+        command = rng.choice(_COMMANDS)
+        start = time.perf_counter()
+        writer.write(f"{command}\n".encode("utf-8"))
+        await writer.drain()
+        await reader.readuntil(prompt)
+        latencies.append(time.perf_counter() - start)
+    writer.write(b"EXIT\n")
+    await writer.drain()
+    await reader.read()
+    writer.close()
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(sessions, num_commands, host=None, port=None, seed=0):
+    """Runs the sessions concurrently and returns the latency summary."""
+    server = None
+    if port is None:
+        host = "127.0.0.1"
+        server = await VideoServer(VideoLibrary(), sessions).start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+    rng = random.Random(seed)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _session(host, port, num_commands, random.Random(rng.random()),
+                 latencies)
+        for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "commands": len(latencies),
+        "seconds": round(elapsed, 3),
+        "commands_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--sessions", type=int, default=1000)
+    argument_parser.add_argument("--commands", type=int, default=20)
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument("--port", type=int)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    args = argument_parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args.sessions, args.commands,
+                                     args.host, args.port, args.seed))))
+
+
+if __name__ == "__main__":
+    main()
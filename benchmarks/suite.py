@@ -0,0 +1,135 @@
+"""Times every command of the video player on synthetic catalogs.
+
+Run from the root of the repository with
+    python3 -m benchmarks.suite [--sizes 10000 1000000 10000000]
+        [--output results.json] [--baseline old.json [--tolerance 0.25]]
+
+Catalogs are written by benchmarks.catalog, into --catalog-dir when given
+so the larger ones are only generated once. The playback, search, playlist
+and flag workloads of benchmarks.workloads are then run through a
+CommandParser, and the load time plus count, mean, p50, p99 and max run
+time of each command are printed as JSON. With --baseline, the exit status
+is 1 when a mean grew by more than --tolerance since the baseline results.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.command_parser import _COMMANDS, CommandException, CommandParser
+from src.output import NullWriter
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+from .catalog import write_catalog
+from .load_client import _percentile
+from .workloads import WORKLOADS
+
+
+def _summary(times):
+    """Returns the statistics of a list of run times, in milliseconds."""
+    ordered = sorted(times)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) * 1000 / len(ordered), 4),
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def run_size(videos_file, num_videos, seed=0):
+    """Loads a catalog and runs every workload on it.
+
+    Returns:
+        The results for this catalog size, as included in the JSON output.
+    """
+    start = time.perf_counter()
+    library = VideoLibrary(videos_file)
+    load_ms = (time.perf_counter() - start) * 1000
+    player = VideoPlayer(video_library=library, rng=random.Random(seed),
+                         output=NullWriter(), interactive=False)
+    parser = CommandParser(player)
+    rng = random.Random(seed)
+    timings = {}
+    for workload in WORKLOADS.values():
+        for line in workload(num_videos, rng):
+            command = line.split()
+            start = time.perf_counter()
+            try:
+                parser.execute_command(command)
+            except CommandException:
+                pass
+            timings.setdefault(command[0], []).append(
+                time.perf_counter() - start)
+    return {
+        "num_videos": num_videos,
+        "load_ms": round(load_ms, 3),
+        "commands": {name: _summary(times)
+                     for name, times in sorted(timings.items())},
+        # Commands no workload exercises, e.g. ones added since.
+        "untimed": sorted(_COMMANDS.keys() - timings.keys()),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Returns a description of every mean that grew by more than tolerance
+    (0.25 for 25%) between the baseline results and these."""
+    found = []
+    old_sizes = {size["num_videos"]: size for size in baseline["sizes"]}
+    for size in results["sizes"]:
+        old = old_sizes.get(size["num_videos"])
+        if old is None:
+            continue
+        pairs = [("load", old["load_ms"], size["load_ms"])]
+        pairs += [(name, old["commands"][name]["mean_ms"], stats["mean_ms"])
+                  for name, stats in size["commands"].items()
+                  if name in old["commands"]]
+        for name, before, after in pairs:
+            if after > before * (1 + tolerance):
+                found.append(f"{size['num_videos']} videos, {name}: "
+                             f"{before} ms -> {after} ms")
+    return found
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--sizes", type=int, nargs="+",
+                                 default=[10_000])
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--catalog-dir", metavar="DIR")
+    argument_parser.add_argument("--output", metavar="FILE")
+    argument_parser.add_argument("--baseline", metavar="FILE")
+    argument_parser.add_argument("--tolerance", type=float, default=0.25)
+    args = argument_parser.parse_args(argv)
+
+    results = {"python": platform.python_version(), "sizes": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_dir = Path(args.catalog_dir or tmp)
+        catalog_dir.mkdir(parents=True, exist_ok=True)
+        for num_videos in args.sizes:
+            videos_file = catalog_dir / f"videos_{num_videos}_{args.seed}.txt"
+            if not videos_file.exists():
+                write_catalog(videos_file, num_videos, args.seed)
+            results["sizes"].append(
+                run_size(videos_file, num_videos, args.seed))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            found = regressions(results, json.load(baseline), args.tolerance)
+        for regression in found:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Synthetic command workloads for catalogs written by benchmarks.catalog.
+
+Each workload is a list of command lines, as typed at the YT> prompt.
+"""
+
+from .catalog import vocabulary
+
+
+def _video_id(num_videos, rng):
+    return f"video_{rng.randrange(num_videos)}"
+
+
+def playback_workload(num_videos, rng, num_videos_played=100):
+    """Plays, pauses and stops videos and pages through the listing."""
+    commands = ["HELP", "NUMBER_OF_VIDEOS", "SHOW_PLAYING", "PLAY_RANDOM"]
+    for _ in range(num_videos_played):
+        commands += [f"PLAY {_video_id(num_videos, rng)}", "SHOW_PLAYING",
+                     "PAUSE", "CONTINUE", "STOP", "PLAY_RANDOM"]
+        commands.append(f"SHOW_ALL_VIDEOS LIMIT 20 OFFSET "
+                        f"{rng.randrange(num_videos)}")
+    commands += ["SHOW_ALL_VIDEOS", "STATS", "STATS JSON"]
+    return commands
+
+
+def search_workload(num_videos, rng, num_searches=50):
+    """Searches titles and tags, from the most common terms to the rarest,
+    and plays some of the results."""
+    words, tags = vocabulary()
+    commands = []
+    for _ in range(num_searches):
+        word = rng.choice((words[0], rng.choice(words[:100]),
+                           rng.choice(words)))
+        tag = rng.choice((tags[0], rng.choice(tags[:50]), rng.choice(tags)))
+        commands += [
+            f"SEARCH_VIDEOS {word}",
+            f"SEARCH_VIDEOS {word[:2]} LIMIT 10",
+            f"SEARCH_VIDEOS {rng.randrange(num_videos)} LIMIT 10",
+            f"SEARCH_VIDEOS {word} {tag[1:]} RANKED",
+            f"SEARCH_VIDEOS {word[:1]}{word[2:]} RANKED TOP 5",
+            "PLAY_RESULT 1",
+            f"SEARCH_VIDEOS_WITH_TAG {tag}",
+            f"SEARCH_VIDEOS_WITH_TAG {tag[:3]} LIMIT 10 OFFSET 10",
+        ]
+    return commands
+
+
+def playlist_workload(num_videos, rng, num_playlists=20,
+                      videos_per_playlist=200):
+    """Fills playlists, shows them and empties them again."""
+    commands = []
+    for number in range(num_playlists):
+        name = f"playlist_{number}"
+        video_ids = [_video_id(num_videos, rng)
+                     for _ in range(videos_per_playlist)]
+        commands.append(f"CREATE_PLAYLIST {name}")
+        commands += [f"ADD_TO_PLAYLIST {name} {video_id}"
+                     for video_id in video_ids]
+        commands += [f"SHOW_PLAYLIST {name}", "SHOW_ALL_PLAYLISTS"]
+        commands += [f"REMOVE_FROM_PLAYLIST {name} {video_id}"
+                     for video_id in video_ids[::2]]
+        commands += [f"CLEAR_PLAYLIST {name}", f"DELETE_PLAYLIST {name}"]
+    return commands
+
+
+def flag_workload(num_videos, rng, num_flags=500):
+    """Flags videos, searches and plays around them, then allows them."""
+    video_ids = [_video_id(num_videos, rng) for _ in range(num_flags)]
+    commands = [f"FLAG_VIDEO {video_id} benchmark" for video_id in video_ids]
+    commands += ["PLAY_RANDOM", f"PLAY {video_ids[0]}",
+                 f"SEARCH_VIDEOS {vocabulary()[0][0]} LIMIT 10"]
+    commands += [f"ALLOW_VIDEO {video_id}" for video_id in video_ids]
+    return commands
+
+
+WORKLOADS = {
+    "playback": playback_workload,
+    "search": search_workload,
+    "playlist": playlist_workload,
+    "flag": flag_workload,
+}
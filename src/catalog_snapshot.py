@@ -0,0 +1,221 @@
+"""A compiled, memory-mapped snapshot of the video catalog.
+
+The snapshot starts with a header holding the number of videos, the
+modification time and size of the catalog file it was compiled from and
+the size of the postings section. It is followed by a table with the byte
+offset of every record, then the records themselves. A record is the UTF-8
+encoding of its title, video id and tags joined by control characters,
+which never appear in the catalog, so it is decoded with a few splits
+instead of being parsed as CSV.
+
+The postings section holds lookup tables mapping keys, such as title
+n-grams or tags, to the positions of the records they belong to. Loading
+them saves the reader from rebuilding its indexes one record at a time.
+"""
+
+from array import array
+import mmap
+import os
+import struct
+import sys
+
+_MAGIC = b"YTCAT003"
+_HEADER = struct.Struct("<8sQqQQ")
+_OFFSET = struct.Struct("<Q")
+_TABLE_HEADER = struct.Struct("<QQQ")
+_RECORD_SEPARATOR = "\x1d"
+_FIELD_SEPARATOR = "\x1f"
+_TAG_SEPARATOR = "\x1e"
+
+
+class SnapshotException(Exception):
+    """A class used to represent an unreadable snapshot file."""
+    pass
+
+
+def is_fresh(snapshot_file, videos_file):
+    """Returns True if the snapshot exists and was compiled from the catalog
+    file as it is now, i.e. with the same modification time and size."""
+    try:
+        with open(snapshot_file, "rb") as snapshot:
+            magic, _, mtime_ns, size, _ = _HEADER.unpack(
+                snapshot.read(_HEADER.size))
+        stat = os.stat(videos_file)
+    except (OSError, struct.error):
+        return False
+    return (magic == _MAGIC
+            and (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size))
+
+
+def _encode(title, video_id, tags):
+    """Returns the bytes of a single record."""
+    return (_FIELD_SEPARATOR.join((title, video_id, _TAG_SEPARATOR.join(tags)))
+            + _RECORD_SEPARATOR).encode("utf-8")
+
+
+def _decode(record):
+    """Returns the (title, video_id, tags) tuple of a decoded record."""
+    title, video_id, tags = record.split(_FIELD_SEPARATOR)
+    return title, video_id, tags.split(_TAG_SEPARATOR) if tags else []
+
+
+def _rows_bytes(rows):
+    """Returns the little-endian bytes of an array of record positions."""
+    if sys.byteorder == "big":
+        rows = array("I", rows)
+        rows.byteswap()
+    return rows.tobytes()
+
+
+def _encode_postings(postings):
+    """Returns the bytes of a lookup table.
+
+    The table is a header with its number of keys and the sizes of its
+    keys and positions, the keys joined by a control character, the number
+    of positions of every key and then all the positions, so it is read
+    back with a few array copies.
+    """
+    keys = _FIELD_SEPARATOR.join(postings).encode("utf-8")
+    counts = array("I", map(len, postings.values()))
+    rows = array("I")
+    for positions in postings.values():
+        rows.extend(positions)
+    return b"".join((_TABLE_HEADER.pack(len(counts), len(keys), len(rows)),
+                     keys, _rows_bytes(counts), _rows_bytes(rows)))
+
+
+def write_snapshot(snapshot_file, records, source=(0, 0), postings=()):
+    """Writes a snapshot of the catalog.
+
+    The file is written next to its destination and moved in place, so
+    readers never see a partial snapshot.
+
+    Args:
+        snapshot_file: Path of the snapshot to write.
+        records: (title, video_id, tags) tuples of every video.
+        source: The (mtime_ns, size) of the catalog file the records were
+            read from, taken before reading it. is_fresh() compares them
+            with the catalog file.
+        postings: Lookup tables stored along the records, each a dict
+            mapping a key to the sorted positions in records of the videos
+            it belongs to. CatalogSnapshot.postings() returns them.
+    """
+    data = [_encode(*record) for record in records]
+    offsets = [0]
+    for record in data:
+        offsets.append(offsets[-1] + len(record))
+    tables = b"".join(map(_encode_postings, postings))
+    temp_file = f"{snapshot_file}.tmp"
+    with open(temp_file, "wb") as snapshot:
+        snapshot.write(_HEADER.pack(_MAGIC, len(data), *source, len(tables)))
+        snapshot.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        snapshot.writelines(data)
+        snapshot.write(tables)
+    os.replace(temp_file, snapshot_file)
+
+
+class CatalogSnapshot:
+    """A class used to read a snapshot, decoding records on demand."""
+
+    def __init__(self, snapshot_file):
+        """Memory-maps the snapshot file.
+
+        Raises SnapshotException if the file is not a catalog snapshot or
+        is truncated.
+        """
+        with open(snapshot_file, "rb") as snapshot:
+            try:
+                self._map = mmap.mmap(snapshot.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files cannot be mapped.
+                raise SnapshotException(f"{snapshot_file} is empty")
+        try:
+            magic, self._count, _, _, postings_size = _HEADER.unpack_from(
+                self._map)
+            self._data_start = _HEADER.size + _OFFSET.size * (self._count + 1)
+            self._postings_start = self._data_start + self._offset(self._count)
+            complete = (magic == _MAGIC and self._postings_start
+                        + postings_size == len(self._map))
+        except struct.error:
+            complete = False
+        if not complete:
+            self.close()
+            raise SnapshotException(
+                f"{snapshot_file} is not a complete snapshot")
+
+    def _offset(self, position):
+        """Returns the start of a record in the data section."""
+        return _OFFSET.unpack_from(
+            self._map, _HEADER.size + _OFFSET.size * position)[0]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, position):
+        """Returns the (title, video_id, tags) record at position."""
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        start = self._data_start + self._offset(position)
+        end = self._data_start + self._offset(position + 1)
+        return _decode(str(self._map[start:end - 1], "utf-8"))
+
+    def __iter__(self):
+        """Yields every record, decoding the whole data section at once."""
+        data = str(self._map[self._data_start:self._postings_start], "utf-8")
+        for record in data.split(_RECORD_SEPARATOR)[:-1]:
+            yield _decode(record)
+
+    def _rows(self, start, count):
+        """Returns the array of count positions stored at start."""
+        rows = array("I")
+        rows.frombytes(self._map[start:start + rows.itemsize * count])
+        if sys.byteorder == "big":
+            rows.byteswap()
+        if len(rows) != count:
+            raise SnapshotException("Truncated lookup table")
+        return rows
+
+    def postings(self):
+        """Returns the lookup tables written with the snapshot, as a list of
+        dicts mapping each key to an array of record positions.
+
+        Raises SnapshotException if a table is corrupt.
+        """
+        tables = []
+        start = self._postings_start
+        try:
+            while start < len(self._map):
+                num_keys, keys_size, num_rows = _TABLE_HEADER.unpack_from(
+                    self._map, start)
+                start += _TABLE_HEADER.size
+                keys = str(self._map[start:start + keys_size], "utf-8")
+                keys = keys.split(_FIELD_SEPARATOR) if num_keys else []
+                start += keys_size
+                counts = self._rows(start, num_keys)
+                start += counts.itemsize * num_keys
+                rows = self._rows(start, num_rows)
+                start += rows.itemsize * num_rows
+                if (len(keys) != num_keys or sum(counts) != num_rows
+                        or rows and max(rows) >= self._count):
+                    raise SnapshotException("Corrupt lookup table")
+                table = {}
+                end = 0
+                for key, count in zip(keys, counts):
+                    table[key] = rows[end:end + count]
+                    end += count
+                tables.append(table)
+        except (struct.error, UnicodeDecodeError):
+            raise SnapshotException("Corrupt lookup table")
+        if start != len(self._map):
+            raise SnapshotException("Corrupt lookup table")
+        return tables
+
+    def close(self):
+        """Unmaps the snapshot file."""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,254 @@
+"""A video library class storing the catalog in columns."""
+
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+from .video import Video
+from .video_library import _match_tags, _read_catalog
+from .video_store import VideoStore
+
+# Separates the rows of the title and id columns. It cannot appear in the
+# catalog, since videos.txt holds one video per line.
+_ROW_SEPARATOR = "\n"
+
+
+def _column(values):
+    """Returns a list of strings as one string plus the start of each row.
+
+    The offsets array holds one more entry than there are rows, so row i
+    spans offsets[i] to offsets[i + 1] - 1, the separator being dropped.
+    """
+    offsets = array("q", [0])
+    for value in values:
+        offsets.append(offsets[-1] + len(value) + 1)
+    return "".join(value + _ROW_SEPARATOR for value in values), offsets
+
+
+class ColumnarVideoLibrary(VideoStore):
+    """A class used to represent a Video Library stored in columns.
+
+    Rows are sorted by title once, when the catalog is loaded. Titles and
+    video ids are each kept in a single string, tags as dictionary-encoded
+    ids with an array of rows per tag, and flags as a bitmap, so searches
+    and listings scan contiguous memory instead of following pointers
+    between Video objects. Video objects are only built for the rows a
+    caller asks for.
+
+    The catalog is read-only once loaded, only flags may change.
+    """
+
+    def __init__(self, videos_file=None):
+        """The ColumnarVideoLibrary class is initialized.
+
+        Args:
+            videos_file: Path of the catalog to load. Defaults to the
+                videos.txt file shipped next to this module.
+        """
+        if videos_file is None:
+            videos_file = Path(__file__).parent / "videos.txt"
+        # A video listed twice keeps its last line, as in VideoLibrary.
+        records = sorted(
+            {record[1]: record
+             for record in _read_catalog(videos_file)}.values(),
+            key=lambda record: (record[0], record[1]))
+        self._titles, self._title_offsets = _column(
+            [title for title, _, _ in records])
+        self._lower_titles, self._lower_offsets = _column(
+            [title.lower() for title, _, _ in records])
+        self._ids, self._id_offsets = _column(
+            [video_id for _, video_id, _ in records])
+        self._rows = {video_id: row
+                      for row, (_, video_id, _) in enumerate(records)}
+
+        # Tags are stored as codes into _tag_names. The tags of row i are
+        # _tag_codes[_tag_offsets[i]:_tag_offsets[i + 1]].
+        self._tag_names = []
+        codes = {}
+        self._tag_codes = array("I")
+        self._tag_offsets = array("q", [0])
+        for _, _, tags in records:
+            for tag in tags:
+                if tag not in codes:
+                    codes[tag] = len(self._tag_names)
+                    self._tag_names.append(tag)
+                self._tag_codes.append(codes[tag])
+            self._tag_offsets.append(len(self._tag_codes))
+        # Codes of the tags sharing each lowercased spelling, and those
+        # spellings sorted for prefix lookups.
+        self._lower_tag_codes = {}
+        for code, tag in enumerate(self._tag_names):
+            self._lower_tag_codes.setdefault(tag.lower(), []).append(code)
+        self._tag_vocabulary = sorted(self._lower_tag_codes)
+        # Rows carrying each tag code, in title order since rows are.
+        self._tag_rows = [array("I") for _ in self._tag_names]
+        for row in range(len(records)):
+            for code in set(self._tag_codes[
+                    self._tag_offsets[row]:self._tag_offsets[row + 1]]):
+                self._tag_rows[code].append(row)
+
+        self._flags = bytearray((len(records) + 7) // 8)
+        self._flag_reasons = {}
+        # Rows of the unflagged videos, and the position of every row in
+        # that array (-1 when flagged) so rows can be swapped out.
+        self._playable = array("q", range(len(records)))
+        self._playable_positions = array("q", range(len(records)))
+        # Increases whenever flags change, see VideoLibrary.version.
+        self.version = 0
+
+    def _cell(self, column, offsets, row):
+        """Returns the value of a row in a string column."""
+        return column[offsets[row]:offsets[row + 1] - 1]
+
+    def _is_flagged(self, row):
+        """Returns a truthy value if the bit of a row is set in the bitmap."""
+        return self._flags[row >> 3] & (1 << (row & 7))
+
+    def _video(self, row):
+        """Builds the Video object for a row."""
+        # The cells are sliced inline, searches build thousands of rows.
+        title_offsets, id_offsets = self._title_offsets, self._id_offsets
+        start, end = self._tag_offsets[row], self._tag_offsets[row + 1]
+        video = Video(
+            self._titles[title_offsets[row]:title_offsets[row + 1] - 1],
+            self._ids[id_offsets[row]:id_offsets[row + 1] - 1],
+            map(self._tag_names.__getitem__, self._tag_codes[start:end]),
+        )
+        if self._is_flagged(row):
+            video.flag_video(self._flag_reasons[row])
+        return video
+
+    def video_count(self):
+        """Returns the number of videos in the library."""
+        return len(self._rows)
+
+    def get_all_videos(self):
+        """Returns all available video information from the video library."""
+        return self.get_videos_by_title()
+
+    def get_videos_by_title(self):
+        """Returns all videos from the video library, sorted by title."""
+        return list(self.iter_videos_by_title())
+
+    def iter_videos_by_title(self, offset=0, limit=None):
+        """Yields the videos of the library one at a time, sorted by title.
+
+        Args:
+            offset: Number of videos to skip from the start of the listing.
+            limit: Maximum number of videos to yield. None yields them all.
+        """
+        stop = len(self._rows)
+        if limit is not None:
+            stop = min(stop, offset + limit)
+        for row in range(offset, stop):
+            yield self._video(row)
+
+    def get_video(self, video_id):
+        """Returns the Video object for video_id, None if the video does not
+        exist."""
+        row = self._rows.get(video_id)
+        return None if row is None else self._video(row)
+
+    def playable_video_ids(self):
+        """Returns the ids of all the videos that are not flagged."""
+        ids = self._ids.split(_ROW_SEPARATOR)
+        if not self._flag_reasons:
+            return ids[:-1]
+        return [ids[row] for row in range(len(self._rows))
+                if not self._is_flagged(row)]
+
+    def playable_count(self):
+        """Returns the number of videos that are not flagged."""
+        return len(self._playable)
+
+    def random_video_id(self, rng):
+        """Returns the id of a random unflagged video in constant time.
+
+        Args:
+            rng: The random.Random instance (or random module) to draw with.
+
+        Returns:
+            A video id, None if every video is flagged.
+        """
+        if not self._playable:
+            return None
+        row = rng.choice(self._playable)
+        return self._cell(self._ids, self._id_offsets, row)
+
+    def flag_video(self, video_id, flag_reason):
+        """Flags a video for every user of the library.
+
+        Args:
+            video_id: The video_id to be flagged.
+            flag_reason: Reason for flagging the video, None to allow it.
+        """
+        row = self._rows[video_id]
+        position = self._playable_positions[row]
+        if flag_reason:
+            self._flags[row >> 3] |= 1 << (row & 7)
+            self._flag_reasons[row] = flag_reason
+            if position != -1:
+                last = self._playable.pop()
+                if last != row:
+                    self._playable[position] = last
+                    self._playable_positions[last] = position
+                self._playable_positions[row] = -1
+        else:
+            self._flags[row >> 3] &= ~(1 << (row & 7))
+            self._flag_reasons.pop(row, None)
+            if position == -1:
+                self._playable_positions[row] = len(self._playable)
+                self._playable.append(row)
+        self.version += 1
+
+    def search_titles(self, search_term):
+        """Returns the videos whose title contains the search term.
+
+        Matching ignores case. The lowercased title column is scanned with
+        str.find, which jumps straight from one match to the next.
+
+        Args:
+            search_term: The text to look for in video titles.
+
+        Returns:
+            A list of matching Video objects, sorted by title.
+        """
+        term = search_term.lower()
+        if not term:
+            return self.get_videos_by_title()
+        if _ROW_SEPARATOR in term or not self._rows:
+            return []
+        rows = []
+        position = self._lower_titles.find(term)
+        while position != -1:
+            row = bisect_right(self._lower_offsets, position) - 1
+            rows.append(row)
+            # Skip the rest of the row, it is already a match.
+            position = self._lower_titles.find(term, self._lower_offsets[row + 1])
+        return [self._video(row) for row in rows]
+
+    def search_tags(self, video_tag, match="substring"):
+        """Returns the videos with a tag matching the given tag.
+
+        Matching ignores case. Only the distinct tags are matched, and the
+        rows of the matching tags are read from a list kept per tag.
+        Flagged videos are included, callers decide whether to show them.
+
+        Args:
+            video_tag: The tag to look for.
+            match: "exact" for tags equal to video_tag, "prefix" for tags
+                starting with it and "substring" for tags containing it.
+
+        Returns:
+            A list of matching Video objects, sorted by title.
+        """
+        postings = [self._tag_rows[code]
+                    for tag in _match_tags(self._tag_vocabulary,
+                                           video_tag.lower(), match)
+                    for code in self._lower_tag_codes[tag]]
+        if len(postings) == 1:
+            rows = postings[0]
+        else:
+            # Rows are numbered in title order, sorting them sorts by title.
+            rows = sorted(set().union(*postings))
+        return [self._video(row) for row in rows]
@@ -1,6 +1,8 @@
 """A command parser class."""
 
+import json
 import textwrap
+from collections import namedtuple
 from typing import Sequence
 
 
@@ -9,6 +11,47 @@ class CommandException(Exception):
     pass
 
 
+# A command the parser can execute. The handler is called with the video
+# player followed by the command arguments, once their number is between
+# min_args and max_args (None meaning no upper bound).
+Command = namedtuple("Command", ["handler", "min_args", "max_args", "usage"])
+
+# Commands by upper case name.
+_COMMANDS = {}
+
+
+def register_command(name, handler, min_args=0, max_args=0, usage=None):
+    """Makes a command available to every CommandParser.
+
+    Args:
+        name: The command name, matched regardless of case.
+        handler: Called with the video player followed by the command
+            arguments.
+        min_args: Minimum number of arguments of the command.
+        max_args: Maximum number of arguments, None for no limit.
+        usage: Message of the CommandException raised when the command is
+            given a wrong number of arguments.
+    """
+    _COMMANDS[name.upper()] = Command(handler, min_args, max_args, usage)
+
+
+def _parse_page_options(options: Sequence[str]):
+    """Parses the optional LIMIT <n> and OFFSET <n> of a listing command.
+       Returns a (limit, offset) tuple, limit is None when not given.
+       Raises CommandException if the options cannot be parsed.
+    """
+    page = {"LIMIT": None, "OFFSET": 0}
+    if len(options) % 2:
+        options = list(options) + [""]
+    for name, value in zip(options[::2], options[1::2]):
+        if name.upper() not in page or not value.isdigit():
+            raise CommandException(
+                "Please enter LIMIT and OFFSET options followed by a "
+                "whole number.")
+        page[name.upper()] = int(value)
+    return page["LIMIT"], page["OFFSET"]
+
+
 class CommandParser:
     """A class used to parse and execute a user Command."""
 
@@ -24,140 +67,199 @@ class CommandParser:
                 "Please enter a valid command, "
                 "type HELP for a list of available commands.")
 
-        if command[0].upper() == "NUMBER_OF_VIDEOS":
-            self._player.number_of_videos()
-
-        elif command[0].upper() == "SHOW_ALL_VIDEOS":
-            self._player.show_all_videos()
-
-        elif command[0].upper() == "PLAY":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter PLAY command followed by video_id.")
-            self._player.play_video(command[1])
-
-        elif command[0].upper() == "PLAY_RANDOM":
-            self._player.play_random_video()
-
-        elif command[0].upper() == "STOP":
-            self._player.stop_video()
-
-        elif command[0].upper() == "PAUSE":
-            self._player.pause_video()
-
-        elif command[0].upper() == "CONTINUE":
-            self._player.continue_video()
-
-        elif command[0].upper() == "SHOW_PLAYING":
-            self._player.show_playing()
-
-        elif command[0].upper() == "CREATE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CREATE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.create_playlist(command[1])
-
-        elif command[0].upper() == "ADD_TO_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter ADD_TO_PLAYLIST command followed by a "
-                    "playlist name and video_id to add.")
-            self._player.add_to_playlist(command[1], command[2])
-
-        elif command[0].upper() == "REMOVE_FROM_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter REMOVE_FROM_PLAYLIST command followed by a "
-                    "playlist name and video_id to remove.")
-            self._player.remove_from_playlist(command[1], command[2])
-
-        elif command[0].upper() == "CLEAR_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CLEAR_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.clear_playlist(command[1])
-
-        elif command[0].upper() == "DELETE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter DELETE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.delete_playlist(command[1])
-
-        elif command[0].upper() == "SHOW_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SHOW_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.show_playlist(command[1])
-
-        elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
-            self._player.show_all_playlists()
-
-        elif command[0].upper() == "SEARCH_VIDEOS":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS command followed by a "
-                    "search term.")
-            self._player.search_videos(command[1])
-
-        elif command[0].upper() == "SEARCH_VIDEOS_WITH_TAG":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
-                    "video tag.")
-            self._player.search_videos_tag(command[1])
-
-        elif command[0].upper() == "FLAG_VIDEO":
-            if len(command) == 3:
-                self._player.flag_video(command[1], command[2])
-            elif len(command) == 2:
-                self._player.flag_video(command[1])
-            else:
-                raise CommandException(
-                    "Please enter FLAG_VIDEO command followed by a "
-                    "video_id and an optional flag reason.")
-
-        elif command[0].upper() == "ALLOW_VIDEO":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter ALLOW_VIDEO command followed by a "
-                    "video_id.")
-            self._player.allow_video(command[1])
-
-        elif command[0].upper() == "HELP":
-            self._get_help()
-        else:
-            print(
+        spec = _COMMANDS.get(command[0].upper())
+        if spec is None:
+            self._player.output.write(
                 "Please enter a valid command, type HELP for a list of "
                 "available commands.")
+            return
+        args = command[1:]
+        stats = self._player.stats
+        if len(args) < spec.min_args or (
+                spec.max_args is not None and len(args) > spec.max_args):
+            stats.record_error(command[0].upper())
+            raise CommandException(spec.usage)
+        if not stats.enabled:
+            spec.handler(self._player, *args)
+            return
+        start = stats.start()
+        try:
+            spec.handler(self._player, *args)
+        except CommandException:
+            stats.record_error(command[0].upper())
+            raise
+        finally:
+            stats.stop(command[0].upper(), start)
+
+
+def _get_help(player):
+    """Displays all available commands to the user."""
+    help_text = textwrap.dedent("""
+    Available commands:
+        NUMBER_OF_VIDEOS - Shows how many videos are in the library.
+        SHOW_ALL_VIDEOS [LIMIT <n>] [OFFSET <n>] - Lists all videos from the library, optionally one page at a time.
+        PLAY <video_id> - Plays specified video.
+        PLAY_RANDOM - Plays a random video from the library.
+        STOP - Stop the current video.
+        PAUSE - Pause the current video.
+        CONTINUE - Resume the current paused video.
+        SHOW_PLAYING - Displays the title, url and paused status of the video that is currently playing (or paused).
+        CREATE_PLAYLIST <playlist_name> - Creates a new (empty) playlist with the provided name.
+        ADD_TO_PLAYLIST <playlist_name> <video_id> - Adds the requested video to the playlist.
+        REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes the specified video from the specified playlist
+        CLEAR_PLAYLIST <playlist_name> - Removes all the videos from the playlist.
+        DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
+        SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
+        SHOW_ALL_PLAYLISTS - Display all the available playlists.
+        SEARCH_VIDEOS <search_term> [LIMIT <n>] [OFFSET <n>] - Display all the videos whose titles contain the search_term.
+        SEARCH_VIDEOS <words> RANKED [TOP <n>] - Display the n videos (10 by default) whose titles and tags best match the words, typos allowed.
+        SEARCH_VIDEOS_WITH_TAG <tag_name> [EXACT|PREFIX] [LIMIT <n>] [OFFSET <n>] -Display all videos whose tags contains the provided tag, or whose tags equal or start with it.
+        PLAY_RESULT <number> - Plays the video listed with this number by the latest search.
+        FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
+        ALLOW_VIDEO <video_id> - Removes a flag from a video.
+        STATS [JSON] - Shows how often and how fast each command ran, as a table or as JSON.
+        HELP - Displays help.
+        EXIT - Terminates the program execution.
+    """)
+    player.output.write(help_text)
+
+
+def _show_all_videos(player, *options):
+    player.show_all_videos(*_parse_page_options(options))
+
+
+_RANKED_USAGE = ("Please enter RANKED after the search words, optionally "
+                 "followed by TOP and a whole number.")
+
+
+def _parse_top_option(options: Sequence[str]):
+    """Parses the optional TOP <n> following RANKED, defaulting to 10.
+       Raises CommandException if the option cannot be parsed.
+    """
+    if not options:
+        return 10
+    if (len(options) != 2 or options[0].upper() != "TOP"
+            or not options[1].isdigit()):
+        raise CommandException(_RANKED_USAGE)
+    return int(options[1])
+
+
+def _search_videos(player, search_term, *options):
+    words = [option.upper() for option in options]
+    # RANKED must follow the query words, with nothing after it but TOP <n>.
+    if words[-1:] == ["RANKED"]:
+        ranked = len(words) - 1
+    elif words[-3:-1] == ["RANKED", "TOP"]:
+        ranked = len(words) - 3
+    elif "RANKED" in words:
+        raise CommandException(_RANKED_USAGE)
+    else:
+        player.search_videos(search_term, *_parse_page_options(options))
+        return
+    player.search_videos_ranked(
+        " ".join((search_term,) + options[:ranked]),
+        _parse_top_option(options[ranked + 1:]))
+
+
+def _search_videos_tag(player, video_tag, *options):
+    match = "substring"
+    if options and options[0].upper() in ("EXACT", "PREFIX"):
+        match = options[0].lower()
+        options = options[1:]
+    player.search_videos_tag(
+        video_tag, *_parse_page_options(options), match=match)
+
+
+def _show_stats(player, *options):
+    if [option.upper() for option in options] not in ([], ["JSON"]):
+        raise CommandException(
+            "Please enter STATS command optionally followed by JSON.")
+    if options:
+        player.output.write(json.dumps(player.stats_report()))
+    else:
+        player.show_stats()
+
+
+def _play_result(player, result_number):
+    if not result_number.isdigit():
+        raise CommandException(
+            "Please enter PLAY_RESULT command followed by the number of a "
+            "search result.")
+    player.play_result(int(result_number))
+
 
-    def _get_help(self):
-        """Displays all available commands to the user."""
-        help_text = textwrap.dedent("""
-        Available commands:
-            NUMBER_OF_VIDEOS - Shows how many videos are in the library.
-            SHOW_ALL_VIDEOS - Lists all videos from the library.
-            PLAY <video_id> - Plays specified video.
-            PLAY_RANDOM - Plays a random video from the library.
-            STOP - Stop the current video.
-            PAUSE - Pause the current video.
-            CONTINUE - Resume the current paused video.
-            SHOW_PLAYING - Displays the title, url and paused status of the video that is currently playing (or paused).
-            CREATE_PLAYLIST <playlist_name> - Creates a new (empty) playlist with the provided name.
-            ADD_TO_PLAYLIST <playlist_name> <video_id> - Adds the requested video to the playlist.
-            REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes the specified video from the specified playlist
-            CLEAR_PLAYLIST <playlist_name> - Removes all the videos from the playlist.
-            DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
-            SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
-            SHOW_ALL_PLAYLISTS - Display all the available playlists.
-            SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
-            SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
-            FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
-            ALLOW_VIDEO <video_id> - Removes a flag from a video.
-            HELP - Displays help.
-            EXIT - Terminates the program execution.
-        """)
-        print(help_text)
+register_command(
+    "NUMBER_OF_VIDEOS", lambda player, *_: player.number_of_videos(),
+    max_args=None)
+register_command("SHOW_ALL_VIDEOS", _show_all_videos, max_args=None)
+register_command(
+    "PLAY", lambda player, video_id: player.play_video(video_id), 1, 1,
+    "Please enter PLAY command followed by video_id.")
+register_command(
+    "PLAY_RANDOM", lambda player, *_: player.play_random_video(),
+    max_args=None)
+register_command(
+    "STOP", lambda player, *_: player.stop_video(), max_args=None)
+register_command(
+    "PAUSE", lambda player, *_: player.pause_video(), max_args=None)
+register_command(
+    "CONTINUE", lambda player, *_: player.continue_video(), max_args=None)
+register_command(
+    "SHOW_PLAYING", lambda player, *_: player.show_playing(), max_args=None)
+register_command(
+    "CREATE_PLAYLIST",
+    lambda player, playlist_name: player.create_playlist(playlist_name),
+    1, 1,
+    "Please enter CREATE_PLAYLIST command followed by a playlist name.")
+register_command(
+    "ADD_TO_PLAYLIST",
+    lambda player, playlist_name, video_id: player.add_to_playlist(
+        playlist_name, video_id),
+    2, 2,
+    "Please enter ADD_TO_PLAYLIST command followed by a playlist name and "
+    "video_id to add.")
+register_command(
+    "REMOVE_FROM_PLAYLIST",
+    lambda player, playlist_name, video_id: player.remove_from_playlist(
+        playlist_name, video_id),
+    2, 2,
+    "Please enter REMOVE_FROM_PLAYLIST command followed by a playlist name "
+    "and video_id to remove.")
+register_command(
+    "CLEAR_PLAYLIST",
+    lambda player, playlist_name: player.clear_playlist(playlist_name),
+    1, 1,
+    "Please enter CLEAR_PLAYLIST command followed by a playlist name.")
+register_command(
+    "DELETE_PLAYLIST",
+    lambda player, playlist_name: player.delete_playlist(playlist_name),
+    1, 1,
+    "Please enter DELETE_PLAYLIST command followed by a playlist name.")
+register_command(
+    "SHOW_PLAYLIST",
+    lambda player, playlist_name: player.show_playlist(playlist_name),
+    1, 1,
+    "Please enter SHOW_PLAYLIST command followed by a playlist name.")
+register_command(
+    "SHOW_ALL_PLAYLISTS", lambda player, *_: player.show_all_playlists(),
+    max_args=None)
+register_command(
+    "SEARCH_VIDEOS", _search_videos, 1, None,
+    "Please enter SEARCH_VIDEOS command followed by a search term.")
+register_command(
+    "SEARCH_VIDEOS_WITH_TAG", _search_videos_tag, 1, None,
+    "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a video tag.")
+register_command(
+    "FLAG_VIDEO",
+    lambda player, *args: player.flag_video(*args), 1, 2,
+    "Please enter FLAG_VIDEO command followed by a video_id and an optional "
+    "flag reason.")
+register_command(
+    "ALLOW_VIDEO", lambda player, video_id: player.allow_video(video_id),
+    1, 1, "Please enter ALLOW_VIDEO command followed by a video_id.")
+register_command(
+    "PLAY_RESULT", _play_result, 1, 1,
+    "Please enter PLAY_RESULT command followed by the number of a search "
+    "result.")
+register_command("STATS", _show_stats, max_args=None)
+register_command("HELP", _get_help, max_args=None)
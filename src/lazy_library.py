@@ -0,0 +1,217 @@
+"""A video library class reading videos from the catalog file on demand."""
+
+from array import array
+from pathlib import Path
+
+from .search_cache import LRUCache
+from .video import Video
+from .video_library import _RANDOM_ATTEMPTS, _match_tags, _parse_lines
+from .video_store import VideoStore
+
+
+class LazyVideoLibrary(VideoStore):
+    """A class used to represent a Video Library loaded on demand.
+
+    Loading only scans the catalog for the byte offset of every video id.
+    A video is parsed from its line the first time it is asked for and
+    kept in a bounded cache, so startup time and memory barely depend on
+    the rest of each line. Searches and the first listing by title scan
+    the file instead of keeping indexes in memory.
+
+    The catalog is read-only once loaded, only flags may change. They are
+    kept apart from the cache, so an evicted video keeps its flag.
+    """
+
+    def __init__(self, videos_file=None, cache_size=4096):
+        """The LazyVideoLibrary class is initialized.
+
+        Args:
+            videos_file: Path of the catalog to read. Defaults to the
+                videos.txt file shipped next to this module. It must not
+                change while the library is in use.
+            cache_size: Number of parsed videos kept in memory.
+        """
+        if videos_file is None:
+            videos_file = Path(__file__).parent / "videos.txt"
+        self._file = open(videos_file, "rb")
+        # Maps each video id to the offset of its line, in file order.
+        self._offsets = {}
+        offset = 0
+        for line in self._file:
+            if line.strip():
+                self._offsets[self._line_video_id(line)] = offset
+            offset += len(line)
+        # Offsets of the videos in file order, for random draws, and in
+        # title order once a listing asked for it.
+        self._rows = array("q", self._offsets.values())
+        self._title_rows = None
+        self.cache = LRUCache(cache_size)
+        self._flags = {}
+        # Increases whenever flags change, see VideoStore.
+        self.version = 0
+
+    @staticmethod
+    def _line_video_id(line):
+        """Returns the video id of a catalog line without parsing the rest
+        of it, unless the line uses CSV quoting."""
+        if b'"' in line:
+            return next(_parse_lines([line.decode("utf-8")]))[1]
+        return line.split(b"|", 2)[1].strip().decode("utf-8")
+
+    def _read(self, offset):
+        """Parses the (title, video_id, tags) record of the line at offset."""
+        self._file.seek(offset)
+        return next(_parse_lines([self._file.readline().decode("utf-8")]))
+
+    def _scan(self):
+        """Yields the offset and record of every line, in file order."""
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            if line.strip():
+                yield offset, next(_parse_lines([line.decode("utf-8")]))
+            offset += len(line)
+
+    def _video(self, record):
+        """Returns the cached Video object for a record, building it if
+        needed."""
+        video = self.cache.get(record[1])
+        if video is None:
+            video = Video(*record)
+            video.flag_video(self._flags.get(video.video_id))
+            self.cache.put(video.video_id, video)
+        return video
+
+    def close(self):
+        """Closes the catalog file."""
+        self._file.close()
+
+    def video_count(self):
+        """Returns the number of videos in the library."""
+        return len(self._offsets)
+
+    def iter_videos_by_title(self, offset=0, limit=None):
+        """Yields the videos of the library one at a time, sorted by title.
+
+        The first call scans the catalog and sorts the line offsets by
+        title. Only the offsets are kept.
+
+        Args:
+            offset: Number of videos to skip from the start of the listing.
+            limit: Maximum number of videos to yield. None yields them all.
+        """
+        if self._title_rows is None:
+            self._title_rows = array("q", (
+                row for _, _, row in sorted(
+                    (title, video_id, row)
+                    for row, (title, video_id, _) in self._scan()
+                    if self._offsets[video_id] == row)))
+        stop = len(self._title_rows)
+        if limit is not None:
+            stop = min(stop, offset + limit)
+        for position in range(offset, stop):
+            yield self.get_video_at(self._title_rows[position])
+
+    def get_video_at(self, offset):
+        """Returns the Video object of the line starting at offset."""
+        return self._video(self._read(offset))
+
+    def get_video(self, video_id):
+        """Returns the Video object for video_id, None if the video does not
+        exist. Only reads the catalog file when the video is not cached."""
+        video = self.cache.get(video_id)
+        if video is not None:
+            return video
+        offset = self._offsets.get(video_id)
+        return None if offset is None else self.get_video_at(offset)
+
+    def playable_video_ids(self):
+        """Returns the ids of all the videos that are not flagged."""
+        return [video_id for video_id in self._offsets
+                if video_id not in self._flags]
+
+    def playable_count(self):
+        """Returns the number of videos that are not flagged."""
+        return len(self._offsets) - len(self._flags)
+
+    def random_video_id(self, rng):
+        """Returns the id of a random unflagged video.
+
+        Reads the line of a random offset and redraws when that video is
+        flagged.
+
+        Args:
+            rng: The random.Random instance (or random module) to draw with.
+
+        Returns:
+            A video id, None if every video is flagged.
+        """
+        if not self.playable_count():
+            return None
+        for _ in range(_RANDOM_ATTEMPTS):
+            video_id = self._read(rng.choice(self._rows))[1]
+            if video_id not in self._flags:
+                return video_id
+        return rng.choice(self.playable_video_ids())
+
+    def flag_video(self, video_id, flag_reason):
+        """Flags a video for every user of the library.
+
+        Args:
+            video_id: The video_id to be flagged.
+            flag_reason: Reason for flagging the video, None to allow it.
+        """
+        if video_id not in self._offsets:
+            raise KeyError(video_id)
+        if flag_reason:
+            self._flags[video_id] = flag_reason
+        else:
+            self._flags.pop(video_id, None)
+        video = self.cache.pop(video_id)
+        if video is not None:
+            video.flag_video(flag_reason)
+            self.cache.put(video_id, video)
+        self.version += 1
+
+    def _search(self, matches):
+        """Returns the videos of the records for which matches(record) is
+        true, sorted by title."""
+        return [self._video(record) for record in sorted(
+            (record for row, record in self._scan()
+             if self._offsets[record[1]] == row and matches(record)),
+            key=lambda record: (record[0], record[1]))]
+
+    def search_titles(self, search_term):
+        """Returns the videos whose title contains the search term.
+
+        Matching ignores case. The catalog file is scanned, and only the
+        matching videos are built.
+
+        Args:
+            search_term: The text to look for in video titles.
+
+        Returns:
+            A list of matching Video objects, sorted by title.
+        """
+        term = search_term.lower()
+        return self._search(lambda record: term in record[0].lower())
+
+    def search_tags(self, video_tag, match="substring"):
+        """Returns the videos with a tag matching the given tag.
+
+        Matching ignores case. The catalog file is scanned, and only the
+        matching videos are built. Flagged videos are included, callers
+        decide whether to show them.
+
+        Args:
+            video_tag: The tag to look for.
+            match: "exact" for tags equal to video_tag, "prefix" for tags
+                starting with it and "substring" for tags containing it.
+
+        Returns:
+            A list of matching Video objects, sorted by title.
+        """
+        term = video_tag.lower()
+        _match_tags([], term, match)  # Rejects unknown match modes.
+        return self._search(lambda record: _match_tags(
+            sorted(tag.lower() for tag in record[2]), term, match))
@@ -0,0 +1,79 @@
+"""Output writers the video player prints through."""
+
+from itertools import islice
+import sys
+
+# Lines joined into a single write by write_lines, so a long listing costs
+# few writes while never being held in memory all at once.
+_LINES_PER_WRITE = 1000
+
+
+class StdoutWriter:
+    """A class used to write output lines to standard output.
+
+    Lines are written to sys.stdout in chunks of _LINES_PER_WRITE, whose
+    own buffer then batches them, so a long listing costs a few writes
+    instead of one print per line.
+    """
+
+    def write(self, line):
+        """Writes a single line."""
+        sys.stdout.write(f"{line}\n")
+
+    def write_lines(self, lines):
+        """Writes several lines, _LINES_PER_WRITE at a time."""
+        lines = iter(lines)
+        while True:
+            text = "".join(f"{line}\n"
+                           for line in islice(lines, _LINES_PER_WRITE))
+            if not text:
+                return
+            sys.stdout.write(text)
+
+    def flush(self):
+        """Flushes standard output."""
+        sys.stdout.flush()
+
+
+class MemoryWriter:
+    """A class used to keep output lines in memory."""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, line):
+        """Stores a single line."""
+        self.lines.append(str(line))
+
+    def write_lines(self, lines):
+        """Stores several lines."""
+        self.lines.extend(map(str, lines))
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        """Returns the stored lines as a single string."""
+        return "".join(f"{line}\n" for line in self.lines)
+
+    def clear(self):
+        """Forgets the stored lines."""
+        self.lines.clear()
+
+
+class NullWriter:
+    """A class used to discard output, e.g. when benchmarking.
+
+    Lines are still formatted before being dropped, so a benchmark pays for
+    building them as it would with a real writer.
+    """
+
+    def write(self, line):
+        str(line)
+
+    def write_lines(self, lines):
+        for line in lines:
+            str(line)
+
+    def flush(self):
+        pass
@@ -0,0 +1,168 @@
+"""An append-only store for the playlists and flags of a video player.
+
+Every change is appended to a log as one JSON line. Once the log holds
+enough changes, the whole state is written to a snapshot and the log starts
+over, so loading only replays the changes made since the last snapshot.
+"""
+
+import json
+import os
+from pathlib import Path
+
+# How the log is written to disk.
+DURABILITY_MODES = (
+    "always",  # fsync after every change.
+    "batch",   # fsync every batch_size changes, and when closed.
+    "none",    # leave it to the operating system.
+)
+
+
+def empty_state():
+    """Returns the state of a player without playlists or flags.
+
+    Playlists map their name to a dict whose keys are the video ids, in the
+    order they were added. Flags map a video id to its flag reason, None
+    for a video allowed again.
+    """
+    return {"playlists": {}, "flags": {}}
+
+
+def apply_change(state, operation, args):
+    """Applies one logged change to a state."""
+    playlists = state["playlists"]
+    if operation == "create_playlist":
+        playlists[args[0]] = {}
+    elif operation == "delete_playlist":
+        playlists.pop(args[0], None)
+    elif operation == "add_to_playlist":
+        playlists[args[0]][args[1]] = None
+    elif operation == "remove_from_playlist":
+        playlists[args[0]].pop(args[1], None)
+    elif operation == "clear_playlist":
+        playlists[args[0]].clear()
+    elif operation == "flag_video":
+        state["flags"][args[0]] = args[1]
+    else:
+        raise ValueError(f"Unknown operation: {operation}")
+
+
+class PlayerStore:
+    """A class used to persist the changes made by a video player."""
+
+    def __init__(self, directory, durability="batch", batch_size=64,
+                 snapshot_every=10_000):
+        """PlayerStore constructor.
+
+        Args:
+            directory: Directory holding the log and snapshot files. It is
+                created if needed.
+            durability: One of DURABILITY_MODES.
+            batch_size: Changes written between two fsyncs in batch mode.
+            snapshot_every: Changes logged before needs_compaction() tells
+                the player to write a snapshot.
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._log_file = self._directory / "player.log"
+        self._snapshot_file = self._directory / "player.snapshot.json"
+        self._durability = durability
+        self._batch_size = batch_size
+        self._snapshot_every = snapshot_every
+        self._log = None
+        self._sequence = 0
+        self._logged = 0
+        self._unsynced = 0
+
+    def load(self):
+        """Returns the state saved in the store.
+
+        Reads the snapshot and replays the changes logged after it. A last
+        line cut short by a crash is ignored and removed from the log. Must
+        be called before record().
+        """
+        state = empty_state()
+        if self._snapshot_file.exists():
+            with open(self._snapshot_file) as snapshot:
+                saved = json.load(snapshot)
+            state = saved["state"]
+            self._sequence = saved["sequence"]
+        if self._log_file.exists():
+            # Offset of the end of the last complete change.
+            end = 0
+            with open(self._log_file, "rb") as log:
+                for line in log:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        sequence, operation, args = json.loads(line)
+                    except ValueError:
+                        break
+                    end += len(line)
+                    # The log may still hold changes already in the
+                    # snapshot if the process stopped while compacting.
+                    if sequence > self._sequence:
+                        apply_change(state, operation, args)
+                        self._sequence = sequence
+                        self._logged += 1
+            # Drops the torn line, or new changes would be appended to it
+            # and lost with it on the next load.
+            if end < self._log_file.stat().st_size:
+                with open(self._log_file, "r+b") as log:
+                    log.truncate(end)
+                    log.flush()
+                    os.fsync(log.fileno())
+        self._log = open(self._log_file, "a")
+        return state
+
+    def record(self, operation, *args):
+        """Appends a change to the log."""
+        self._sequence += 1
+        self._log.write(json.dumps([self._sequence, operation, args]) + "\n")
+        self._logged += 1
+        if self._durability == "always":
+            self._sync()
+        elif self._durability == "batch":
+            self._unsynced += 1
+            if self._unsynced >= self._batch_size:
+                self._sync()
+
+    def needs_compaction(self):
+        """Returns True once enough changes were logged since the last
+        snapshot."""
+        return self._logged >= self._snapshot_every
+
+    def compact(self, state):
+        """Writes state as the new snapshot and empties the log.
+
+        Args:
+            state: The current state, as returned by load() with every
+                recorded change applied.
+        """
+        temp_file = self._snapshot_file.with_suffix(".tmp")
+        with open(temp_file, "w") as snapshot:
+            json.dump({"sequence": self._sequence, "state": state}, snapshot)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temp_file, self._snapshot_file)
+        self._log.close()
+        self._log = open(self._log_file, "w")
+        self._logged = 0
+        self._unsynced = 0
+
+    def _sync(self):
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """Writes any pending change to disk and closes the log."""
+        if self._log is None:
+            return
+        if self._durability == "none":
+            self._log.flush()
+        else:
+            self._sync()
+        self._log.close()
+        self._log = None
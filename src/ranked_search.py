@@ -0,0 +1,252 @@
+"""A ranked, typo-tolerant search index over video titles and tags."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+import heapq
+from itertools import islice
+from math import log
+from operator import itemgetter
+import re
+
+# BM25 parameters: how quickly repeated tokens stop adding to the score,
+# and how much long titles are penalized.
+_K1 = 1.2
+_B = 0.75
+# Length of the token substrings used to find tokens close to a misspelled
+# one. Longer grams would leave short tokens with a typo no gram in common
+# with the right spelling.
+_GRAM_SIZE = 2
+# Videos scored per matching token by default. Postings are sorted by
+# their contribution to the score, so only the weakest matches of very
+# common tokens are skipped, and query time stops growing with the catalog.
+MAX_POSTINGS = 2_000
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Returns the lowercased words of text, dropping punctuation such as
+    the # of tags."""
+    return _TOKEN.findall(text.lower())
+
+
+def _grams(token):
+    """Returns the n-grams of a token padded at both ends, so short tokens
+    and their first and last letters get grams too."""
+    padded = f"^{token}$"
+    return [padded[i:i + _GRAM_SIZE]
+            for i in range(len(padded) - _GRAM_SIZE + 1)]
+
+
+def _video_tokens(video):
+    """Returns the tokens of a video's title and tags."""
+    tokens = tokenize(video.title)
+    for tag in video.tags:
+        tokens += tokenize(tag)
+    return tokens
+
+
+def max_typos(token):
+    """Returns the number of typos a query token may contain: none up to
+    three letters, one up to seven and two beyond."""
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 7 else 2
+
+
+def edit_distance(first, second, limit):
+    """Returns the number of insertions, deletions, substitutions and swaps
+    of adjacent letters turning first into second, or limit + 1 as soon as
+    it is known to exceed limit."""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1,
+                           previous[j - 1] + (first_char != second_char))
+            if (i > 1 and j > 1 and first_char == second[j - 2]
+                    and first[i - 2] == second_char):
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class RankedIndex:
+    """A class used to rank videos against free text queries.
+
+    Titles and tags are split into tokens and scored with BM25. A query
+    token missing from the catalog is matched against the catalog tokens
+    within max_typos() edits, found through an n-gram index of the
+    vocabulary rather than by comparing every token. Only the videos
+    sharing a token with the query are scored, at most max_postings of
+    them per token, and the best are picked with a bounded heap instead of
+    sorting them all.
+
+    The index is kept up to date with add() and remove() rather than
+    rebuilt when the catalog changes. The average video length BM25
+    compares lengths with is the one of the videos it was built from, as
+    reloads move it too little to matter.
+    """
+
+    def __init__(self, videos, version=0, max_postings=MAX_POSTINGS):
+        """Indexes videos.
+
+        Args:
+            videos: The Video objects to index.
+            version: The catalog_version of the store the videos come
+                from, so the index can be rebuilt once it changes.
+            max_postings: Videos scored per query token, None for all.
+        """
+        self.version = version
+        self._max_postings = max_postings
+        counts = defaultdict(dict)
+        lengths = {}
+        for video in videos:
+            tokens = _video_tokens(video)
+            lengths[video.video_id] = len(tokens)
+            for token, count in Counter(tokens).items():
+                counts[token][video.video_id] = count
+        self._num_videos = len(lengths)
+        self._average_length = (
+            sum(lengths.values()) / len(lengths) if lengths else 1.0)
+        # Map each token to the negated BM25 term frequency part of the
+        # score of every video containing it, in increasing order so the
+        # largest parts come first, and to the ids of those videos.
+        self._impacts = {}
+        self._postings = {}
+        for token, videos_counts in counts.items():
+            postings = sorted(
+                (-self._impact(count, lengths[video_id]), video_id)
+                for video_id, count in videos_counts.items())
+            self._impacts[token] = array("d", map(itemgetter(0), postings))
+            self._postings[token] = list(map(itemgetter(1), postings))
+        # Maps each (n-gram, token length) pair to the tokens of that
+        # length containing the n-gram.
+        self._vocabulary_grams = defaultdict(set)
+        for token in self._postings:
+            self._add_token(token)
+
+    def _impact(self, count, length):
+        """Returns the BM25 term frequency part of the score of a video
+        holding a token count times among length tokens."""
+        return count * (_K1 + 1) / (count + _K1 * (
+            1 - _B + _B * length / self._average_length))
+
+    def _add_token(self, token):
+        """Adds a new catalog token to the n-gram index of the vocabulary."""
+        for gram in set(_grams(token)):
+            self._vocabulary_grams[gram, len(token)].add(token)
+
+    def add(self, video):
+        """Indexes a video added to the catalog."""
+        tokens = _video_tokens(video)
+        self._num_videos += 1
+        for token, count in Counter(tokens).items():
+            impact = -self._impact(count, len(tokens))
+            if token not in self._postings:
+                self._impacts[token] = array("d")
+                self._postings[token] = []
+                self._add_token(token)
+            position = bisect_right(self._impacts[token], impact)
+            self._impacts[token].insert(position, impact)
+            self._postings[token].insert(position, video.video_id)
+
+    def remove(self, video):
+        """Forgets a video removed from the catalog, as it was added."""
+        tokens = _video_tokens(video)
+        self._num_videos -= 1
+        for token, count in Counter(tokens).items():
+            impacts = self._impacts[token]
+            postings = self._postings[token]
+            position = postings.index(video.video_id, bisect_left(
+                impacts, -self._impact(count, len(tokens))))
+            del impacts[position]
+            del postings[position]
+            if not postings:
+                del self._impacts[token]
+                del self._postings[token]
+                for gram in set(_grams(token)):
+                    self._vocabulary_grams[gram, len(token)].discard(token)
+
+    def _candidates(self, grams, lengths, needed):
+        """Returns the catalog tokens with one of lengths that may share at
+        least needed of grams.
+
+        A token sharing needed grams contains one of any len(grams) -
+        needed + 1 of them, so only the tokens of the rarest ones are
+        looked at.
+        """
+        buckets = sorted(
+            ([self._vocabulary_grams.get((gram, length), ())
+              for length in lengths] for gram in grams),
+            key=lambda bucket: sum(map(len, bucket)))
+        return set().union(*(tokens for bucket
+                             in buckets[:len(grams) - needed + 1]
+                             for tokens in bucket))
+
+    def _expand(self, token):
+        """Returns the catalog tokens a query token matches, with a weight
+        that decreases with the number of typos."""
+        if token in self._postings:
+            return [(token, 1.0)]
+        limit = max_typos(token)
+        if not limit:
+            return []
+        grams = set(_grams(token))
+        # Every edit changes at most _GRAM_SIZE + 1 grams, as when swapping
+        # two letters, so a token within limit edits shares at least this
+        # many grams with the query.
+        needed = max(len(grams) - (_GRAM_SIZE + 1) * limit, 1)
+        lengths = range(len(token) - limit, len(token) + limit + 1)
+        matches = []
+        for candidate in self._candidates(grams, lengths, needed):
+            if len(grams.intersection(_grams(candidate))) >= needed:
+                distance = edit_distance(token, candidate, limit)
+                if distance <= limit:
+                    matches.append((candidate, 1 / (1 + distance)))
+        return matches
+
+    def scores(self, query):
+        """Returns a dict mapping the id of every video matching at least one
+        token of the query to its BM25 score."""
+        scores = defaultdict(float)
+        for query_token in set(tokenize(query)):
+            for token, weight in self._expand(query_token):
+                postings = self._postings[token]
+                idf = log(1 + (self._num_videos - len(postings) + 0.5)
+                          / (len(postings) + 0.5))
+                weight *= idf
+                for video_id, impact in islice(
+                        zip(postings, self._impacts[token]),
+                        self._max_postings):
+                    scores[video_id] -= weight * impact
+        return scores
+
+    def search(self, query, limit, exclude=None):
+        """Returns the (video_id, score) pairs of the best matches, best
+        first.
+
+        Args:
+            query: Free text to look for in titles and tags.
+            limit: Maximum number of results.
+            exclude: Optional function returning True for the ids of videos
+                to leave out, e.g. flagged ones. It is only called on the
+                best candidates, drawing more whenever some are excluded.
+        """
+        scores = self.scores(query)
+        size = limit
+        while True:
+            best = heapq.nlargest(size, scores.items(), key=itemgetter(1))
+            if exclude is not None:
+                best = [(video_id, score) for video_id, score in best
+                        if not exclude(video_id)]
+            if len(best) >= limit or size >= len(scores):
+                return best[:limit]
+            size *= 2
@@ -1,21 +1,152 @@
 """A youtube terminal simulator."""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
 from .video_player import VideoPlayer
 from .command_parser import CommandException
 from .command_parser import CommandParser
+from .persistence import DURABILITY_MODES, PlayerStore
+from .sqlite_library import SqlitePlayerStore, SqliteVideoLibrary
 
+# Batch output is written out once this many characters are buffered.
+_BATCH_FLUSH_SIZE = 1 << 16
 
-if __name__ == "__main__":
+
+def run_interactive(store=None, video_library=None):
+    """Runs the interactive prompt until the user types EXIT.
+
+    Args:
+        store: A PlayerStore keeping the playlists and flags between runs.
+        video_library: The VideoStore to play from, defaults to a
+            VideoLibrary of the bundled videos.txt.
+    """
     print("""Hello and welcome to YouTube, what would you like to do?
     Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
+    video_player = VideoPlayer(video_library=video_library, store=store)
     parser = CommandParser(video_player)
-    while True:
-        command = input("YT> ")
-        if command.upper() == "EXIT":
-            break
-        try:
-            parser.execute_command(command.split())
-        except CommandException as e:
-            print(e)
+    try:
+        while True:
+            command = input("YT> ")
+            if command.upper() == "EXIT":
+                break
+            try:
+                parser.execute_command(command.split())
+            except CommandException as e:
+                print(e)
+    finally:
+        video_player.close()
     print("YouTube has now terminated its execution. "
           "Thank you and goodbye!")
+
+
+def run_batch(commands, output=None, report=None, store=None,
+              video_library=None):
+    """Executes a stream of commands, one per line, without prompting.
+
+    Searches do not ask which result to play, so a batch never waits for
+    input. Use PLAY_RESULT <number> to play one of the results.
+
+    Args:
+        commands: A text stream of commands. Reading stops at EXIT.
+        output: Stream receiving the buffered command output, defaults to
+            standard output.
+        report: Stream receiving the timing report, defaults to standard
+            error.
+        store: A PlayerStore keeping the playlists and flags between runs.
+        video_library: The VideoStore to play from, defaults to a
+            VideoLibrary of the bundled videos.txt.
+
+    Returns:
+        A dict mapping each command name to the list of its run times in
+        seconds.
+    """
+    output = sys.stdout if output is None else output
+    report = sys.stderr if report is None else report
+    video_player = VideoPlayer(video_library=video_library,
+                               interactive=False, store=store)
+    parser = CommandParser(video_player)
+    timings = {}
+    buffer = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(buffer):
+        try:
+            for line in commands:
+                command = line.split()
+                if not command:
+                    continue
+                if command[0].upper() == "EXIT":
+                    break
+                start = time.perf_counter()
+                try:
+                    parser.execute_command(command)
+                except CommandException as e:
+                    print(e)
+                timings.setdefault(command[0].upper(), []).append(
+                    time.perf_counter() - start)
+                if buffer.tell() >= _BATCH_FLUSH_SIZE:
+                    output.write(buffer.getvalue())
+                    buffer.seek(0)
+                    buffer.truncate()
+        finally:
+            video_player.close()
+    output.write(buffer.getvalue())
+    output.flush()
+    _report_timings(timings, time.perf_counter() - started, report)
+    return timings
+
+
+def _report_timings(timings, elapsed, report):
+    """Writes the total and per-command run times of a batch."""
+    total = sum(len(times) for times in timings.values())
+    report.write(f"Executed {total} commands in {elapsed:.3f} s\n")
+    report.write(f"{'COMMAND':<24}{'COUNT':>8}{'TOTAL MS':>12}"
+                 f"{'MEAN MS':>12}{'MAX MS':>12}\n")
+    for name, times in sorted(timings.items()):
+        report.write(f"{name:<24}{len(times):>8}{sum(times) * 1000:>12.3f}"
+                     f"{sum(times) * 1000 / len(times):>12.3f}"
+                     f"{max(times) * 1000:>12.3f}\n")
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument(
+        "--batch", metavar="FILE", nargs="?", const="-",
+        help="execute the commands of FILE (or standard input) without "
+             "prompting, then report their run times")
+    argument_parser.add_argument(
+        "--data", metavar="DIR",
+        help="keep playlists and flags in DIR between runs")
+    argument_parser.add_argument(
+        "--database", metavar="FILE",
+        help="read the catalog from the SQLite database FILE, loading "
+             "videos.txt into it on first use, and keep playlists and "
+             "flags there unless --data is given")
+    argument_parser.add_argument(
+        "--durability", choices=DURABILITY_MODES, default="batch",
+        help="when changes kept with --data are synced to disk")
+    args = argument_parser.parse_args(argv)
+    store = video_library = None
+    if args.database is not None:
+        video_library = SqliteVideoLibrary(args.database)
+    if args.data is not None:
+        store = PlayerStore(args.data, args.durability)
+    elif args.database is not None:
+        store = SqlitePlayerStore(args.database, args.durability)
+    try:
+        if args.batch is None:
+            run_interactive(store, video_library)
+        elif args.batch == "-":
+            run_batch(sys.stdin, store=store, video_library=video_library)
+        else:
+            with open(args.batch) as commands:
+                run_batch(commands, store=store, video_library=video_library)
+    finally:
+        if video_library is not None:
+            video_library.close()
+
+
+if __name__ == "__main__":
+    main()
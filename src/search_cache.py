@@ -0,0 +1,94 @@
+"""A bounded least-recently-used cache, for search results and videos."""
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A class used to represent a cache that evicts the least recently used
+    entry once it holds maxsize entries, or values weighing more than
+    maxweight in total.
+
+    Counts its hits, misses and evictions, so its effectiveness can be
+    checked under real traffic.
+    """
+
+    def __init__(self, maxsize=1024, maxweight=None, weigh=len):
+        """LRUCache constructor.
+
+        Args:
+            maxsize: Maximum number of entries. 0 disables caching.
+            maxweight: Maximum total weight of the cached values, None for
+                no limit. A value heavier than this on its own is not
+                cached.
+            weigh: Returns the weight of a value, used with maxweight.
+        """
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self._weigh = weigh
+        self._weight = 0
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Returns the value cached for key, default if there is none."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Caches value for key, evicting the least recently used entries
+        until the cache is back within its limits."""
+        self.pop(key)
+        if self.maxsize <= 0:
+            return
+        if self.maxweight is not None:
+            weight = self._weigh(value)
+            if weight > self.maxweight:
+                return
+            self._weight += weight
+        self._entries[key] = value
+        while (len(self._entries) > self.maxsize or
+               self.maxweight is not None and self._weight > self.maxweight):
+            self._discard(self._entries.popitem(last=False)[1])
+            self.evictions += 1
+
+    def _discard(self, value):
+        """Takes a value removed from the cache off its total weight."""
+        if self.maxweight is not None:
+            self._weight -= self._weigh(value)
+
+    def pop(self, key, default=None):
+        """Removes the entry for key and returns its value, default if there
+        is none. The counters are left alone."""
+        if key not in self._entries:
+            return default
+        value = self._entries.pop(key)
+        self._discard(value)
+        return value
+
+    def invalidate(self, predicate):
+        """Removes the entries for which predicate(key, value) is true."""
+        for key in [key for key, value in self._entries.items()
+                    if predicate(key, value)]:
+            self.pop(key)
+
+    def clear(self):
+        """Removes every entry, the counters are kept."""
+        self._entries.clear()
+        self._weight = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Returns the counters and size of the cache as a dict."""
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self._entries),
+                "maxsize": self.maxsize}
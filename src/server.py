@@ -0,0 +1,258 @@
+"""A youtube simulator served over TCP to many users at once.
+
+Every connection gets its own VideoPlayer session on top of one shared
+VideoLibrary. The protocol mirrors the terminal simulator: the client sends
+one command per line and the server answers with the command output
+followed by the "YT> " prompt.
+"""
+
+import argparse
+import asyncio
+from collections import deque
+from itertools import islice
+import logging
+
+from .command_parser import CommandException
+from .command_parser import CommandParser
+from .lazy_library import LazyVideoLibrary
+from .stats import NullStats, Stats
+from .video_library import VideoLibrary
+from .video_player import VideoPlayer
+
+logger = logging.getLogger(__name__)
+
+PROMPT = "YT> "
+WELCOME = ("Hello and welcome to YouTube, what would you like to do?\n"
+           "    Enter HELP for list of available commands or EXIT to "
+           "terminate.")
+GOODBYE = "YouTube has now terminated its execution. Thank you and goodbye!"
+
+# Longest command line accepted from a client, in bytes.
+_MAX_LINE = 1 << 12
+# Connections the kernel queues before they are accepted. The default of
+# 100 makes bursts of new clients wait for TCP retransmissions.
+_BACKLOG = 4096
+# Output lines formatted and sent at a time. Other sessions run between two
+# of these, so a long listing neither stalls them nor sits in memory.
+_LINES_PER_SEND = 1000
+_RELOADED = ("The catalog was reloaded while listing, please enter the "
+             "command again.")
+
+
+class _SessionOutput:
+    """A class used to send the output of one session to its client.
+
+    Lines given to write_lines, such as a whole listing, are only formatted
+    when sent, _LINES_PER_SEND at a time. A listing the catalog reload
+    would change halfway through is cut short, so every listing comes from
+    a single version of the catalog.
+    """
+
+    def __init__(self, video_library):
+        self._library = video_library
+        self._pending = deque()
+
+    def write(self, line):
+        """Queues a single line."""
+        self._pending.append(iter([str(line)]))
+
+    def write_lines(self, lines):
+        """Queues several lines, formatted while they are sent."""
+        self._pending.append(iter(lines))
+
+    def flush(self):
+        pass
+
+    async def send(self, writer, prompt=""):
+        """Sends the queued lines followed by prompt.
+
+        Waits until the transport buffer drains, so a client that reads
+        slowly holds up its own session instead of filling memory.
+        """
+        catalog_version = self._library.catalog_version
+        lines = []
+        while self._pending:
+            if self._library.catalog_version != catalog_version:
+                self._pending.clear()
+                lines.append(_RELOADED)
+                break
+            lines += islice(self._pending[0], _LINES_PER_SEND - len(lines))
+            if len(lines) < _LINES_PER_SEND:
+                self._pending.popleft()
+                continue
+            writer.write("".join(f"{line}\n" for line in lines).encode("utf-8"))
+            lines = []
+            await writer.drain()
+            await asyncio.sleep(0)  # lets the other sessions run
+        writer.write(("".join(f"{line}\n" for line in lines) + prompt)
+                     .encode("utf-8"))
+        await writer.drain()
+
+
+async def _skip_line(reader):
+    """Discards the input up to and including the next newline."""
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+
+
+class VideoServer:
+    """A class used to serve video player sessions to TCP clients."""
+
+    def __init__(self, video_library, max_sessions=10_000, stats=None):
+        """The VideoServer class is initialized.
+
+        Args:
+            video_library: The VideoLibrary shared by every session.
+            max_sessions: Connections beyond this many wait until a session
+                ends before they are served.
+            stats: The Stats every session records its commands in, so
+                STATS shows the whole server. Defaults to a new Stats.
+        """
+        self._library = video_library
+        self.stats = Stats() if stats is None else stats
+        self._sessions = asyncio.Semaphore(max_sessions)
+        self.active_sessions = 0
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Starts listening and returns the asyncio Server."""
+        return await asyncio.start_server(
+            self._handle_connection, host, port, limit=_MAX_LINE,
+            backlog=_BACKLOG)
+
+    async def _handle_connection(self, reader, writer):
+        async with self._sessions:
+            self.active_sessions += 1
+            try:
+                await self._serve_session(reader, writer)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                self.active_sessions -= 1
+                writer.close()
+
+    async def _serve_session(self, reader, writer):
+        """Executes the commands of one client until it sends EXIT or
+        disconnects."""
+        output = _SessionOutput(self._library)
+        # Waiting for the answer to a search would stall every other
+        # session, results are played with PLAY_RESULT instead.
+        player = VideoPlayer(video_library=self._library, output=output,
+                             interactive=False, stats=self.stats)
+        parser = CommandParser(player)
+        output.write(WELCOME)
+        await output.send(writer, PROMPT)
+        while True:
+            try:
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                line = e.partial  # The last line, sent without a newline.
+            except asyncio.LimitOverrunError:
+                # The rest of the line must not run as a command of its own.
+                await _skip_line(reader)
+                output.write("Please enter a shorter command.")
+                await output.send(writer, PROMPT)
+                continue
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").split()
+            if command and command[0].upper() == "EXIT":
+                output.write(GOODBYE)
+                await output.send(writer)
+                return
+            try:
+                parser.execute_command(command)
+            except CommandException as e:
+                output.write(e)
+            await output.send(writer, PROMPT)
+
+
+async def reload_periodically(video_library, interval):
+    """Picks up changes to the catalog file every interval seconds.
+
+    The file is read and diffed in a worker thread. The changes are then
+    applied on the event loop between two commands, so every session sees
+    either the old or the new catalog. A failed reload, e.g. while the file
+    is being replaced, is logged and tried again at the next interval.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            changes = await loop.run_in_executor(
+                None, video_library.read_changes)
+            video_library.apply_changes(changes)
+        except Exception:
+            logger.exception("Could not reload the catalog")
+
+
+async def serve(host, port, video_library, max_sessions=10_000,
+                reload_interval=None, stats=None):
+    """Serves sessions forever, reloading the catalog file every
+    reload_interval seconds if given."""
+    server = await VideoServer(video_library, max_sessions, stats).start(
+        host, port)
+    reloader = None
+    if reload_interval:
+        # Keep a reference, the event loop only holds tasks weakly.
+        reloader = asyncio.create_task(
+            reload_periodically(video_library, reload_interval))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if reloader is not None:
+            reloader.cancel()
+            try:
+                await reloader
+            except asyncio.CancelledError:
+                pass
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument("--port", type=int, default=8765)
+    argument_parser.add_argument(
+        "--videos", metavar="FILE", help="catalog to serve instead of "
+                                         "the bundled videos.txt")
+    argument_parser.add_argument("--max-sessions", type=int, default=10_000)
+    argument_parser.add_argument(
+        "--workers", type=int, metavar="N",
+        help="processes parsing the catalog, one by default. Only worth "
+             "raising for large catalogs on machines with several cores")
+    argument_parser.add_argument(
+        "--lazy", type=int, nargs="?", const=4096, metavar="CACHE_SIZE",
+        help="only index video ids at startup and read videos from the "
+             "catalog when asked for, keeping CACHE_SIZE of them in memory")
+    argument_parser.add_argument(
+        "--reload-interval", type=float, metavar="SECONDS",
+        help="check the catalog file for changes this often")
+    argument_parser.add_argument(
+        "--no-stats", action="store_true",
+        help="do not time commands, STATS then only shows cache and catalog "
+             "sizes")
+    args = argument_parser.parse_args(argv)
+    if args.lazy is not None and args.reload_interval:
+        argument_parser.error("--lazy catalogs cannot be reloaded")
+    if args.lazy is not None:
+        library = LazyVideoLibrary(args.videos, args.lazy)
+    else:
+        library = VideoLibrary(args.videos, workers=args.workers)
+        # Built before serving, so no session waits for it.
+        library.ranked_index()
+    print(f"Serving {library.video_count()} videos on "
+          f"{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port, library, args.max_sessions,
+                          args.reload_interval,
+                          NullStats() if args.no_stats else None))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""A video library and a playlist store kept in an SQLite database."""
+
+from pathlib import Path
+import sqlite3
+
+from .persistence import DURABILITY_MODES, empty_state
+from .video import Video
+from .video_library import _RANDOM_ATTEMPTS, _read_catalog
+from .video_store import VideoStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    lower_title TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    flag TEXT
+);
+CREATE INDEX IF NOT EXISTS videos_by_title ON videos (title, video_id);
+CREATE TABLE IF NOT EXISTS tags (
+    video INTEGER NOT NULL REFERENCES videos (id),
+    lower_tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tags_by_name ON tags (lower_tag, video);
+"""
+
+# Indexes the lowercased titles by trigram, which lets FTS5 answer
+# substring queries of three characters or more. Needs SQLite 3.34.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    lower_title, content='videos', content_rowid='id', tokenize='trigram')
+"""
+
+_VIDEO_COLUMNS = "title, video_id, tags, flag"
+
+_TAG_CONDITIONS = {
+    "exact": "lower_tag = ?",
+    "prefix": "lower_tag >= ? AND lower_tag < ? || char(1114111)",
+    "substring": "instr(lower_tag, ?) > 0",
+}
+
+_PLAYER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlists (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS playlist_videos (
+    playlist TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    PRIMARY KEY (playlist, video_id)
+);
+CREATE TABLE IF NOT EXISTS player_flags (
+    video_id TEXT PRIMARY KEY,
+    reason TEXT
+);
+"""
+
+# SQL run for each change a video player records.
+_PLAYER_CHANGES = {
+    "create_playlist": ("INSERT INTO playlists VALUES (?)",),
+    "delete_playlist": ("DELETE FROM playlist_videos WHERE playlist = ?",
+                        "DELETE FROM playlists WHERE name = ?"),
+    "add_to_playlist": ("INSERT INTO playlist_videos VALUES (?, ?)",),
+    "remove_from_playlist": ("DELETE FROM playlist_videos "
+                             "WHERE playlist = ? AND video_id = ?",),
+    "clear_playlist": ("DELETE FROM playlist_videos WHERE playlist = ?",),
+    "flag_video": ("INSERT OR REPLACE INTO player_flags VALUES (?, ?)",),
+}
+
+
+def _video(row):
+    """Builds the Video object for a row of _VIDEO_COLUMNS."""
+    title, video_id, tags, flag = row
+    video = Video(title, video_id, tags.split(",") if tags else [])
+    video.flag_video(flag)
+    return video
+
+
+class SqliteVideoLibrary(VideoStore):
+    """A class used to represent a Video Library stored in SQLite.
+
+    Only the rows a caller asks for are read into memory, so the catalog
+    may be larger than RAM. Title searches go through an FTS5 trigram index
+    when SQLite provides one, and scan the titles otherwise. Flags are
+    stored in the database and shared by every user of the library.
+    """
+
+    def __init__(self, database=":memory:", videos_file=None):
+        """The SqliteVideoLibrary class is initialized.
+
+        Args:
+            database: Path of the SQLite database file.
+            videos_file: Path of the catalog loaded into the database when
+                it holds no videos yet. Defaults to the videos.txt file
+                shipped next to this module.
+        """
+        self._connection = sqlite3.connect(database)
+        self._connection.executescript(_SCHEMA)
+        try:
+            self._connection.execute(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        # See VideoStore. The catalog never changes, only flags do.
+        self.version = 0
+        if self._connection.execute("SELECT 1 FROM videos").fetchone() is None:
+            if videos_file is None:
+                videos_file = Path(__file__).parent / "videos.txt"
+            self._load(videos_file)
+
+    def _load(self, videos_file):
+        """Inserts the videos of a catalog file in a single transaction."""
+        with self._connection:
+            for title, video_id, tags in _read_catalog(videos_file):
+                rowid = self._connection.execute(
+                    "INSERT INTO videos (video_id, title, lower_title, tags) "
+                    "VALUES (?, ?, ?, ?)",
+                    (video_id, title, title.lower(), ",".join(tags)),
+                ).lastrowid
+                self._connection.executemany(
+                    "INSERT INTO tags VALUES (?, ?)",
+                    ((rowid, tag.lower()) for tag in tags))
+            if self.has_fts:
+                self._connection.execute(
+                    "INSERT INTO videos_fts (videos_fts) VALUES ('rebuild')")
+
+    def close(self):
+        """Closes the database connection."""
+        self._connection.close()
+
+    def _videos(self, sql, parameters=()):
+        return [_video(row)
+                for row in self._connection.execute(sql, parameters)]
+
+    def video_count(self):
+        """Returns the number of videos in the library."""
+        return self._connection.execute(
+            "SELECT count(*) FROM videos").fetchone()[0]
+
+    def iter_videos_by_title(self, offset=0, limit=None):
+        """Yields the videos of the library one at a time, sorted by title.
+
+        Args:
+            offset: Number of videos to skip from the start of the listing.
+            limit: Maximum number of videos to yield. None yields them all.
+        """
+        rows = self._connection.execute(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos ORDER BY title, video_id "
+            "LIMIT ? OFFSET ?", (-1 if limit is None else limit, offset))
+        for row in rows:
+            yield _video(row)
+
+    def get_video(self, video_id):
+        """Returns the Video object for video_id, None if the video does not
+        exist."""
+        row = self._connection.execute(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos WHERE video_id = ?",
+            (video_id,)).fetchone()
+        return None if row is None else _video(row)
+
+    def playable_video_ids(self):
+        """Returns the ids of all the videos that are not flagged."""
+        return [video_id for video_id, in self._connection.execute(
+            "SELECT video_id FROM videos WHERE flag IS NULL ORDER BY id")]
+
+    def playable_count(self):
+        """Returns the number of videos that are not flagged."""
+        return self._connection.execute(
+            "SELECT count(*) FROM videos WHERE flag IS NULL").fetchone()[0]
+
+    def random_video_id(self, rng):
+        """Returns the id of a random unflagged video.
+
+        Draws random row ids, which are dense since the catalog is only
+        loaded once, and falls back to counting rows when most videos are
+        flagged.
+
+        Args:
+            rng: The random.Random instance (or random module) to draw with.
+
+        Returns:
+            A video id, None if every video is flagged.
+        """
+        last_id = self._connection.execute(
+            "SELECT max(id) FROM videos").fetchone()[0]
+        if last_id is None:
+            return None
+        for _ in range(_RANDOM_ATTEMPTS):
+            row = self._connection.execute(
+                "SELECT video_id FROM videos WHERE id = ? AND flag IS NULL",
+                (rng.randint(1, last_id),)).fetchone()
+            if row is not None:
+                return row[0]
+        count = self.playable_count()
+        if not count:
+            return None
+        return self._connection.execute(
+            "SELECT video_id FROM videos WHERE flag IS NULL ORDER BY id "
+            "LIMIT 1 OFFSET ?", (rng.randrange(count),)).fetchone()[0]
+
+    def flag_video(self, video_id, flag_reason):
+        """Flags a video for every user of the library.
+
+        Args:
+            video_id: The video_id to be flagged.
+            flag_reason: Reason for flagging the video, None to allow it.
+        """
+        with self._connection:
+            updated = self._connection.execute(
+                "UPDATE videos SET flag = ? WHERE video_id = ?",
+                (flag_reason or None, video_id)).rowcount
+        if not updated:
+            raise KeyError(video_id)
+        self.version += 1
+
+    def search_titles(self, search_term):
+        """Returns the videos whose title contains the search term.
+
+        Matching ignores case. Terms of three characters or more are looked
+        up in the FTS5 index when there is one, shorter ones scan the
+        titles.
+
+        Args:
+            search_term: The text to look for in video titles.
+
+        Returns:
+            A list of matching Video objects, sorted by title.
+        """
+        term = search_term.lower()
+        if self.has_fts and len(term) >= 3:
+            # The phrase is quoted so FTS5 syntax in the term is matched
+            # literally. instr() then drops the candidates that only match
+            # once case folding is applied.
+            phrase = '"' + term.replace('"', '""') + '"'
+            return self._videos(
+                f"SELECT {_VIDEO_COLUMNS} FROM videos WHERE id IN ("
+                "SELECT rowid FROM videos_fts WHERE videos_fts MATCH ?) "
+                "AND instr(lower_title, ?) > 0 ORDER BY title, video_id",
+                (phrase, term))
+        return self._videos(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos "
+            "WHERE instr(lower_title, ?) > 0 ORDER BY title, video_id",
+            (term,))
+
+    def search_tags(self, video_tag, match="substring"):
+        """Returns the videos with a tag matching the given tag.
+
+        Matching ignores case. Exact and prefix matches use the tag index.
+        Flagged videos are included, callers decide whether to show them.
+
+        Args:
+            video_tag: The tag to look for.
+            match: "exact" for tags equal to video_tag, "prefix" for tags
+                starting with it and "substring" for tags containing it.
+
+        Returns:
+            A list of matching Video objects, sorted by title.
+        """
+        if match not in _TAG_CONDITIONS:
+            raise ValueError(f"Unknown tag match mode: {match}")
+        term = video_tag.lower()
+        parameters = (term, term) if match == "prefix" else (term,)
+        return self._videos(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos WHERE id IN ("
+            f"SELECT video FROM tags WHERE {_TAG_CONDITIONS[match]}) "
+            "ORDER BY title, video_id", parameters)
+
+
+class SqlitePlayerStore:
+    """A class used to persist the changes made by a video player in SQLite.
+
+    It can be passed to VideoPlayer in place of a PlayerStore. Every change
+    is applied to the playlist and flag tables straight away, so there is
+    no log to replay and nothing to compact.
+    """
+
+    def __init__(self, database, durability="batch", batch_size=64):
+        """SqlitePlayerStore constructor.
+
+        Args:
+            database: Path of the SQLite database file, which may also hold
+                a SqliteVideoLibrary.
+            durability: One of DURABILITY_MODES. "always" commits every
+                change, "batch" every batch_size changes and when closed,
+                "none" commits every change without waiting for the disk.
+            batch_size: Changes made between two commits in batch mode.
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self._connection = sqlite3.connect(database)
+        self._connection.executescript(_PLAYER_SCHEMA)
+        if durability == "none":
+            self._connection.execute("PRAGMA synchronous = OFF")
+        self._batch_size = 1 if durability != "batch" else batch_size
+        self._uncommitted = 0
+
+    def load(self):
+        """Returns the state saved in the store, see PlayerStore.load."""
+        state = empty_state()
+        playlists = state["playlists"]
+        for name, in self._connection.execute(
+                "SELECT name FROM playlists ORDER BY rowid"):
+            playlists[name] = {}
+        for playlist, video_id in self._connection.execute(
+                "SELECT playlist, video_id FROM playlist_videos ORDER BY rowid"):
+            playlists[playlist][video_id] = None
+        state["flags"].update(self._connection.execute(
+            "SELECT video_id, reason FROM player_flags"))
+        return state
+
+    def record(self, operation, *args):
+        """Applies a change to the tables."""
+        for statement in _PLAYER_CHANGES[operation]:
+            self._connection.execute(
+                statement, args[:statement.count("?")])
+        self._uncommitted += 1
+        if self._uncommitted >= self._batch_size:
+            self._connection.commit()
+            self._uncommitted = 0
+
+    def needs_compaction(self):
+        """Returns False, the tables never need compacting."""
+        return False
+
+    def compact(self, state):
+        pass
+
+    def close(self):
+        """Commits any pending change and closes the database."""
+        self._connection.commit()
+        self._connection.close()
@@ -0,0 +1,167 @@
+"""Counters and latency histograms of the commands a player executes."""
+
+from bisect import bisect_left
+import functools
+import time
+
+# Upper bounds of the latency buckets in seconds: 1 us, 2 us, 4 us... up to
+# about 17 s, plus a last bucket for anything slower.
+_BUCKET_BOUNDS = tuple(1e-6 * 2 ** power for power in range(25))
+
+
+class Histogram:
+    """A class used to count latencies in exponentially growing buckets.
+
+    Recording is a bisect and an increment, and the memory used does not
+    grow with the number of values. Percentiles are only known up to the
+    bucket they fall in.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """Adds a latency to the histogram."""
+        self.counts[bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Returns the upper bound of the bucket holding the given fraction
+        of the latencies, capped by the largest latency seen."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(_BUCKET_BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        """Returns the histogram as a dict of milliseconds and counts."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+            # Number of latencies up to each bound, empty buckets left out.
+            "buckets_ms": {f"{bound * 1000:g}": count
+                           for bound, count in zip(
+                               _BUCKET_BOUNDS + (float("inf"),), self.counts)
+                           if count},
+        }
+
+
+class Stats:
+    """A class used to collect per-command counters and latencies.
+
+    One instance may be shared by many players, e.g. by every session of
+    the server, to see the whole process at once.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        # Whether an operation is being timed, so the operations it runs
+        # are counted in it rather than on their own.
+        self._timing = False
+        # Seconds of the timed operation spent waiting for the user.
+        self._waited = 0.0
+
+    def start(self):
+        """Returns the time an operation started, None when it runs within
+        another timed operation."""
+        if self._timing:
+            return None
+        self._timing = True
+        self._waited = 0.0
+        return time.perf_counter()
+
+    def exclude(self, seconds):
+        """Leaves time spent waiting for the user, such as for the answer
+        to a search, out of the operation being timed."""
+        if self._timing:
+            self._waited += seconds
+
+    def stop(self, command_name, start):
+        """Records an operation begun with start()."""
+        if start is None:
+            return
+        self._timing = False
+        self.record(command_name,
+                    time.perf_counter() - start - self._waited)
+
+    def record(self, command_name, seconds):
+        """Records that a command ran in the given number of seconds."""
+        histogram = self.latencies.get(command_name)
+        if histogram is None:
+            histogram = self.latencies[command_name] = Histogram()
+        histogram.record(seconds)
+
+    def record_error(self, command_name):
+        """Records that a command was rejected with a CommandException."""
+        self.errors[command_name] = self.errors.get(command_name, 0) + 1
+
+    def dump(self):
+        """Returns the counters and histograms of every command as a dict
+        that can be serialized to JSON."""
+        names = sorted(self.latencies.keys() | self.errors.keys())
+        commands = {}
+        for name in names:
+            histogram = self.latencies.get(name, Histogram())
+            commands[name] = dict(histogram.to_dict(),
+                                  errors=self.errors.get(name, 0))
+        return commands
+
+
+class NullStats(Stats):
+    """A class used to turn instrumentation off.
+
+    The command parser and timed player methods check enabled and skip
+    timing altogether, so commands run exactly as without instrumentation.
+    """
+
+    enabled = False
+
+    def start(self):
+        return None
+
+    def record(self, command_name, seconds):
+        pass
+
+    def record_error(self, command_name):
+        pass
+
+
+def timed(command_name):
+    """Returns a decorator recording every call of a VideoPlayer method in
+    the player's stats under command_name.
+
+    Callers using the player directly are measured like commands run
+    through the parser. A call made while another operation is timed, such
+    as the parser's command or PLAY_RANDOM playing a video, is counted in
+    that operation only.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def timed_method(player, *args, **kwargs):
+            stats = player.stats
+            if stats._timing or not stats.enabled:
+                return method(player, *args, **kwargs)
+            start = stats.start()
+            try:
+                return method(player, *args, **kwargs)
+            finally:
+                stats.stop(command_name, start)
+        return timed_method
+    return decorator
@@ -1,19 +1,26 @@
 """A video class."""
 
+from sys import intern
 from typing import Sequence
 
 
 class Video:
     """A class used to represent a Video."""
 
+    # Videos are created by the million, so they skip the per-instance
+    # __dict__ and only reserve room for these attributes.
+    __slots__ = ("_title", "_video_id", "_tags", "_flagged")
+
     def __init__(self, video_title: str, video_id: str, video_tags: Sequence[str]):
         """Video constructor."""
         self._title = video_title
-        self._video_id = video_id
+        self._video_id = intern(video_id)
 
         # Turn the tags into a tuple here so it's unmodifiable,
-        # in case the caller changes the 'video_tags' they passed to us
-        self._tags = tuple(video_tags)
+        # in case the caller changes the 'video_tags' they passed to us.
+        # Tags repeat across many videos, so every video shares one copy
+        # of each tag string.
+        self._tags = tuple(intern(tag) for tag in video_tags)
         self._flagged = None
 
     @property
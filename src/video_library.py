@@ -1,8 +1,35 @@
 """A video library class."""
 
+from .catalog_snapshot import CatalogSnapshot, SnapshotException
+from .catalog_snapshot import is_fresh, write_snapshot
+from .catalog_snapshot import _RECORD_SEPARATOR, _decode, _encode
+from .ranked_search import RankedIndex
 from .video import Video
+from .video_store import VideoStore
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import csv
+import hashlib
+import io
+import os
+
+
+# Length of the title substrings stored in the search index. Search terms
+# shorter than this cannot be looked up and fall back to a scan of the
+# lowercased titles in title order.
+_NGRAM_SIZE = 3
+
+
+# Size in bytes of the digest identifying a catalog line, see _line_key.
+_LINE_KEY_SIZE = 16
+
+
+# Number of random draws a session makes from the library's playable videos
+# before giving up on skipping its own flagged videos that way.
+_RANDOM_ATTEMPTS = 32
 
 
 # Helper Wrapper around CSV reader to strip whitespace from around
@@ -11,27 +38,475 @@ def _csv_reader_with_strip(reader):
     yield from ((item.strip() for item in line) for line in reader)
 
 
-class VideoLibrary:
+def _parse_lines(lines):
+    """Yields the (title, video_id, tags) record of every catalog line."""
+    reader = _csv_reader_with_strip(csv.reader(lines, delimiter="|"))
+    for video_info in reader:
+        title, url, tags = video_info
+        yield (
+            title,
+            url,
+            [tag.strip() for tag in tags.split(",")] if tags else [],
+        )
+
+
+def _read_catalog(videos_file):
+    """Yields the (title, video_id, tags) record of every video in a file."""
+    with open(videos_file) as video_file:
+        yield from _parse_lines(line for line in video_file if line.strip())
+
+
+def _chunk_ranges(path, num_chunks):
+    """Splits a file into at most num_chunks (start, end) byte ranges, each
+    starting at the beginning of a line."""
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, "rb") as video_file:
+        for chunk in range(1, num_chunks):
+            video_file.seek(max(size * chunk // num_chunks, starts[-1]))
+            if video_file.tell():
+                video_file.readline()  # Move on to the next line start.
+            if video_file.tell() >= size:
+                break
+            if video_file.tell() > starts[-1]:
+                starts.append(video_file.tell())
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _parse_chunk(path, start, end):
+    """Parses the lines of a byte range of a catalog file and indexes them.
+
+    Runs in a worker process of the parallel loader.
+
+    Returns:
+        The records of the range in file order, encoded as in a catalog
+        snapshot, the _line_key of every line joined into one bytes
+        object, and the title n-gram and lowercased tag postings of those
+        videos. Postings hold row numbers within the range, in arrays, so
+        the results cross back to the parent process as a few large
+        objects rather than millions of small ones.
+    """
+    with open(path, "rb") as video_file:
+        video_file.seek(start)
+        data = video_file.read(end - start)
+    # Decoded like open() in text mode would, newlines included.
+    lines = [line for line in io.TextIOWrapper(io.BytesIO(data))
+             if line.strip()]
+    records = []
+    title_postings = defaultdict(lambda: array("I"))
+    tag_postings = defaultdict(lambda: array("I"))
+    for row, (title, video_id, tags) in enumerate(_parse_lines(lines)):
+        records.append(_encode(title, video_id, tags))
+        for gram in _ngrams(title.lower()):
+            title_postings[gram].append(row)
+        for tag in tags:
+            tag_postings[tag.lower()].append(row)
+    line_keys = b"".join(map(_line_key, lines))
+    return (b"".join(records).decode("utf-8"), line_keys,
+            dict(title_postings), dict(tag_postings))
+
+
+def _file_state(path):
+    """Returns what tells whether a file changed: its mtime and size."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _line_key(line):
+    """Returns the value identifying a catalog line between two reloads.
+
+    A 128-bit digest rather than hash(), whose collisions would make a
+    changed line look unchanged and drop the change. Digests are the same
+    in every process, so worker processes can compute them.
+    """
+    return hashlib.blake2b(line.strip().encode("utf-8"),
+                           digest_size=_LINE_KEY_SIZE).digest()
+
+
+def _ngrams(text):
+    """Returns the set of overlapping n-grams contained in text."""
+    return {text[i:i + _NGRAM_SIZE]
+            for i in range(len(text) - _NGRAM_SIZE + 1)}
+
+
+def _match_tags(vocabulary, term, match):
+    """Returns the tags of a sorted, lowercased vocabulary matching term.
+
+    Args:
+        vocabulary: Sorted list of distinct lowercased tags.
+        term: The lowercased tag to look for.
+        match: "exact", "prefix" or "substring".
+    """
+    if match == "exact":
+        start = bisect_left(vocabulary, term)
+        matches = vocabulary[start:start + 1]
+        return matches if matches == [term] else []
+    if match == "prefix":
+        start = bisect_left(vocabulary, term)
+        end = bisect_left(vocabulary, term + "\U0010ffff")
+        return vocabulary[start:end]
+    if match == "substring":
+        return [tag for tag in vocabulary if term in tag]
+    raise ValueError(f"Unknown tag match mode: {match}")
+
+
+def _title_order(video):
+    """Sort key used to list videos alphabetically by title."""
+    return video.title, video.video_id
+
+
+def _title_entry(video):
+    """Returns the entry of a video in the list of videos sorted by title.
+
+    Entries sort in _title_order and carry the lowercased title, so short
+    title searches can scan them without lowercasing every title again.
+    """
+    return video.title, video.video_id, video.title.lower()
+
+
+class VideoLibrary(VideoStore):
     """A class used to represent a Video Library."""
 
-    def __init__(self):
-        """The VideoLibrary class is initialized."""
+    def __init__(self, videos_file=None, snapshot_file=None, workers=1):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            videos_file: Path of the catalog to load. Defaults to the
+                videos.txt file shipped next to this module.
+            snapshot_file: Optional path of a compiled snapshot of the
+                catalog. It is loaded instead of videos_file when it is up
+                to date, and rewritten from videos_file when it is out of
+                date, truncated or corrupt.
+            workers: Number of processes parsing videos_file when there is
+                no snapshot_file. 1 parses it in this process. None uses
+                every core.
+        """
+        if videos_file is None:
+            videos_file = Path(__file__).parent / "videos.txt"
+        self._videos_file = videos_file
+        self._file_state = _file_state(videos_file)
+        # Maps a key of every line of the catalog file to the id of the
+        # video read from it, so a reload only parses lines that changed.
+        # None when the library was loaded from a snapshot.
+        self._line_keys = None
         self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(
-                csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+        # _title_entry of every video, kept sorted so listings never need
+        # to sort the whole library.
+        self._sorted_titles = []
+        # Maps each lowercased title n-gram to the ids of the videos
+        # whose title contains it.
+        self._title_index = defaultdict(set)
+        # Maps each lowercased tag to the ids of the videos carrying it,
+        # alongside the sorted list of known tags for prefix lookups.
+        self._tag_index = defaultdict(set)
+        self._tag_vocabulary = []
+        # Ids of the unflagged videos and the position of each of them in
+        # the list, so a video can be swapped out in constant time.
+        self._playable = []
+        self._playable_positions = {}
+        # Built on first use by ranked_index, then kept up to date.
+        self._ranked_index = None
+        # Increases whenever the set of visible videos changes for every
+        # user of the library, so caches built on top know to start over.
+        self.version = 0
+        # Increases whenever videos are added or removed, see VideoStore.
+        self.catalog_version = 0
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if snapshot_file is None and workers > 1:
+            self._load_parallel(videos_file, workers)
+        elif snapshot_file is None:
+            self._line_keys = {}
+            with open(videos_file) as video_file:
+                lines = [line for line in video_file if line.strip()]
+            for line, record in zip(lines, _parse_lines(lines)):
+                self._line_keys[_line_key(line)] = record[1]
+                self._index_video(Video(*record))
+        else:
+            snapshot = None
+            if is_fresh(snapshot_file, videos_file):
+                try:
+                    with CatalogSnapshot(snapshot_file) as compiled:
+                        records = list(compiled)
+                        title_postings, tag_postings = compiled.postings()
+                    snapshot = records, title_postings, tag_postings
+                except (SnapshotException, ValueError):
+                    pass  # Corrupt, rebuilt from the catalog below.
+            if snapshot is None:
+                for record in _read_catalog(videos_file):
+                    self._index_video(Video(*record))
+            else:
+                self._load_snapshot(*snapshot)
+        # Sorting once is much cheaper than inserting every row in order.
+        self._sorted_titles = sorted(
+            _title_entry(video) for video in self._videos.values())
+        if snapshot_file is not None and snapshot is None:
+            self._write_snapshot(snapshot_file)
+
+    def _load_snapshot(self, records, title_postings, tag_postings):
+        """Loads the videos and index postings read from a snapshot.
+
+        The postings are merged with set updates rather than by indexing
+        every video again. Snapshots hold every video once, in title order,
+        so sorting them afterwards takes a single pass.
+        """
+        videos = [Video(*record) for record in records]
+        video_ids = [video.video_id for video in videos]
+        self._videos = dict(zip(video_ids, videos))
+        self._add_postings(video_ids, title_postings, tag_postings)
+        self._tag_vocabulary = sorted(self._tag_index)
+        self._playable_positions = {video_id: position for position, video_id
+                                    in enumerate(video_ids)}
+        self._playable = video_ids
+
+    def _write_snapshot(self, snapshot_file):
+        """Writes the videos and index postings of the library to a
+        snapshot, for _load_snapshot to read back."""
+        rows = {entry[1]: row for row, entry in enumerate(self._sorted_titles)}
+
+        def positions(index):
+            return {key: sorted(map(rows.__getitem__, video_ids))
+                    for key, video_ids in index.items()}
+
+        records = [(video.title, video.video_id, video.tags)
+                   for video in self.iter_videos_by_title()]
+        write_snapshot(snapshot_file, records, self._file_state,
+                       (positions(self._title_index), positions(self._tag_index)))
+
+    def _add_postings(self, video_ids, title_postings, tag_postings):
+        """Adds index postings holding positions in video_ids."""
+        row_id = video_ids.__getitem__
+        for gram, rows in title_postings.items():
+            self._title_index[gram].update(map(row_id, rows))
+        for tag, rows in tag_postings.items():
+            self._tag_index[tag].update(map(row_id, rows))
+
+    def _load_parallel(self, videos_file, workers):
+        """Loads a catalog file split into one byte range per worker process.
+
+        The workers parse their range, hash its lines and build its index
+        postings, which are merged here with set updates rather than one
+        video at a time. Only the Video objects are built here, one per
+        line, since they have to live in this process.
+        """
+        ranges = _chunk_ranges(videos_file, workers)
+        line_keys = []
+        video_ids = []
+        replaced = []
+        with ProcessPoolExecutor(min(workers, len(ranges))) as executor:
+            chunks = [executor.submit(_parse_chunk, videos_file, start, end)
+                      for start, end in ranges]
+            for chunk in chunks:
+                records, keys, title_postings, tag_postings = chunk.result()
+                chunk_ids = []
+                for record in records.split(_RECORD_SEPARATOR)[:-1]:
+                    video = Video(*_decode(record))
+                    previous = self._videos.get(video.video_id)
+                    if previous is not None:
+                        replaced.append(previous)
+                    self._videos[video.video_id] = video
+                    chunk_ids.append(video.video_id)
+                self._add_postings(chunk_ids, title_postings, tag_postings)
+                line_keys += (keys[start:start + _LINE_KEY_SIZE] for start
+                              in range(0, len(keys), _LINE_KEY_SIZE))
+                video_ids += chunk_ids
+        if replaced:
+            # A video listed twice keeps the postings of its last line only.
+            for previous in replaced:
+                for gram in _ngrams(previous.title.lower()):
+                    self._title_index[gram].discard(previous.video_id)
+                for tag in previous.tags:
+                    self._tag_index[tag.lower()].discard(previous.video_id)
+            for video_id in {previous.video_id for previous in replaced}:
+                self._index_postings(self._videos[video_id])
+            for index in (self._title_index, self._tag_index):
+                for key in [key for key, postings in index.items()
+                            if not postings]:
+                    del index[key]
+        self._line_keys = dict(zip(line_keys, video_ids))
+        self._tag_vocabulary = sorted(self._tag_index)
+        # A video listed twice is only playable once.
+        self._playable_positions = {video_id: position for position, video_id
+                                    in enumerate(dict.fromkeys(video_ids))}
+        self._playable = list(self._playable_positions)
+
+    def add_video(self, video):
+        """Adds a video to the library and to its search indexes.
+
+        A video already in the library under the same id is removed first,
+        so none of its title, tag or playable entries are left behind.
+
+        Args:
+            video: The Video object to be added.
+        """
+        if video.video_id in self._videos:
+            self.remove_video(video.video_id)
+        self._index_video(video)
+        insort(self._sorted_titles, _title_entry(video))
+        if self._ranked_index is not None:
+            self._ranked_index.add(video)
+        self.version += 1
+        self.catalog_version += 1
+
+    def remove_video(self, video_id):
+        """Removes a video from the library and from its search indexes.
+
+        Args:
+            video_id: The video_id to be removed.
+        """
+        video = self._videos.pop(video_id)
+        del self._sorted_titles[
+            bisect_left(self._sorted_titles, _title_entry(video))]
+        self._unindex_video(video)
+        if self._ranked_index is not None:
+            self._ranked_index.remove(video)
+        self.version += 1
+        self.catalog_version += 1
+
+    def _unindex_video(self, video):
+        """Removes a video from the lookup indexes."""
+        video_id = video.video_id
+        if video_id in self._playable_positions:
+            self._remove_playable(video_id)
+        for gram in _ngrams(video.title.lower()):
+            postings = self._title_index[gram]
+            postings.discard(video_id)
+            if not postings:
+                del self._title_index[gram]
+        for tag in {tag.lower() for tag in video.tags}:
+            postings = self._tag_index[tag]
+            postings.discard(video_id)
+            if not postings:
+                del self._tag_index[tag]
+                del self._tag_vocabulary[
+                    bisect_left(self._tag_vocabulary, tag)]
+
+    def read_changes(self):
+        """Reads the changes made to the catalog file since it was loaded.
+
+        Only the lines that were not in the file before are parsed. This
+        does not modify the library, so it can run in a background thread
+        while sessions keep using it.
+
+        Returns:
+            The changes to pass to apply_changes, None if the file did not
+            change.
+        """
+        state = _file_state(self._videos_file)
+        if state == self._file_state:
+            return None
+        with open(self._videos_file) as video_file:
+            lines = {_line_key(line): line
+                     for line in video_file if line.strip()}
+        if self._line_keys is None:
+            # Loaded from a snapshot: every line is compared with its video.
+            old_keys = {}
+            removed = set(self._videos)
+        else:
+            old_keys = self._line_keys
+            removed = {old_keys[key] for key in old_keys.keys() - lines.keys()}
+        line_keys = {key: old_keys[key]
+                     for key in lines.keys() & old_keys.keys()}
+        added = [lines[key] for key in lines.keys() - old_keys.keys()]
+        records = []
+        for line, record in zip(added, _parse_lines(added)):
+            line_keys[_line_key(line)] = record[1]
+            records.append(record)
+        return state, line_keys, removed, records
+
+    def apply_changes(self, changes):
+        """Applies changes returned by read_changes.
+
+        Videos whose line did not change keep their Video object, indexes
+        and flag. Changed videos keep their flag. The work done only
+        depends on the number of changed lines.
+        """
+        if changes is None:
+            return
+        state, line_keys, removed, records = changes
+        changed = {video_id for _, video_id, _ in records}
+        for video_id in removed - changed:
+            self.remove_video(video_id)
+        for title, video_id, tags in records:
+            flag_reason = None
+            current = self._videos.get(video_id)
+            if current is not None:
+                if current.title == title and current.tags == tuple(tags):
+                    continue
+                flag_reason = current.flags
+                self.remove_video(video_id)
+            video = Video(title, video_id, tags)
+            video.flag_video(flag_reason)
+            self.add_video(video)
+        self._file_state = state
+        self._line_keys = line_keys
+
+    def reload(self):
+        """Picks up the changes made to the catalog file since it was
+        loaded. Returns True if the file had changed."""
+        changes = self.read_changes()
+        self.apply_changes(changes)
+        return changes is not None
+
+    def _index_video(self, video):
+        """Stores a video and adds it to the lookup indexes, replacing a
+        video listed earlier under the same id."""
+        video_id = video.video_id
+        previous = self._videos.get(video_id)
+        if previous is not None:
+            self._unindex_video(previous)
+        self._videos[video_id] = video
+        if not video.flags:
+            self._add_playable(video_id)
+        self._index_postings(video)
+
+    def _index_postings(self, video):
+        """Adds a video to the title and tag postings."""
+        video_id = video.video_id
+        for gram in _ngrams(video.title.lower()):
+            self._title_index[gram].add(video_id)
+        for tag in video.tags:
+            tag = tag.lower()
+            if tag not in self._tag_index:
+                insort(self._tag_vocabulary, tag)
+            self._tag_index[tag].add(video_id)
+
+    def video_count(self):
+        """Returns the number of videos in the library."""
+        return len(self._videos)
+
+    def ranked_index(self):
+        """Returns the RankedIndex of the library's titles and tags.
+
+        It is built on first use. From then on add_video and remove_video
+        keep it up to date, so reloading the catalog never rebuilds it.
+        """
+        if self._ranked_index is None:
+            self._ranked_index = RankedIndex(
+                self.iter_videos_by_title(), self.catalog_version)
+        return self._ranked_index
 
     def get_all_videos(self):
         """Returns all available video information from the video library."""
         return list(self._videos.values())
 
+    def get_videos_by_title(self):
+        """Returns all videos from the video library, sorted by title."""
+        return list(self.iter_videos_by_title())
+
+    def iter_videos_by_title(self, offset=0, limit=None):
+        """Yields the videos of the library one at a time, sorted by title.
+
+        Args:
+            offset: Number of videos to skip from the start of the listing.
+            limit: Maximum number of videos to yield. None yields them all.
+        """
+        stop = len(self._sorted_titles)
+        if limit is not None:
+            stop = min(stop, offset + limit)
+        for position in range(offset, stop):
+            yield self._videos[self._sorted_titles[position][1]]
+
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the video library.
 
@@ -43,3 +518,294 @@ class VideoLibrary:
             does not exist.
         """
         return self._videos.get(video_id, None)
+
+    def _add_playable(self, video_id):
+        """Adds a video to the playable videos."""
+        self._playable_positions[video_id] = len(self._playable)
+        self._playable.append(video_id)
+
+    def _remove_playable(self, video_id):
+        """Removes a video from the playable videos by moving the last
+        playable video into its place."""
+        position = self._playable_positions.pop(video_id)
+        last = self._playable.pop()
+        if last != video_id:
+            self._playable[position] = last
+            self._playable_positions[last] = position
+
+    def playable_video_ids(self):
+        """Returns the ids of all the videos that are not flagged."""
+        return list(self._playable)
+
+    def playable_count(self):
+        """Returns the number of videos that are not flagged."""
+        return len(self._playable)
+
+    def random_video_id(self, rng):
+        """Returns the id of a random unflagged video in constant time.
+
+        Args:
+            rng: The random.Random instance (or random module) to draw with.
+
+        Returns:
+            A video id, None if every video is flagged.
+        """
+        return rng.choice(self._playable) if self._playable else None
+
+    def flag_video(self, video_id, flag_reason):
+        """Flags a video for every user of the library.
+
+        Args:
+            video_id: The video_id to be flagged.
+            flag_reason: Reason for flagging the video, None to allow it.
+        """
+        video = self._videos[video_id]
+        if flag_reason and not video.flags:
+            self._remove_playable(video_id)
+        elif not flag_reason and video.flags:
+            self._add_playable(video_id)
+        video.flag_video(flag_reason)
+        self.version += 1
+
+    def search_titles(self, search_term):
+        """Returns the videos whose title contains the search term.
+
+        Matching ignores case. Only the videos listed under every n-gram of
+        the search term are checked, so the cost depends on the number of
+        candidates rather than the size of the library. Terms too short to
+        have an n-gram scan the lowercased titles in title order, so their
+        matches need no sorting.
+
+        Args:
+            search_term: The text to look for in video titles.
+
+        Returns:
+            A list of matching Video objects, sorted by title.
+        """
+        term = search_term.lower()
+        grams = _ngrams(term)
+        if not grams:
+            return [self._videos[video_id]
+                    for _, video_id, lower_title in self._sorted_titles
+                    if term in lower_title]
+        postings = sorted(
+            (self._title_index.get(gram, set()) for gram in grams), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        matches = [self._videos[video_id] for video_id in candidates
+                   if term in self._videos[video_id].title.lower()]
+        return sorted(matches, key=_title_order)
+
+    def search_tags(self, video_tag, match="substring"):
+        """Returns the videos with a tag matching the given tag.
+
+        Matching ignores case. Only the distinct tags of the library are
+        looked at, never the videos themselves. Flagged videos are included,
+        callers decide whether to show them.
+
+        Args:
+            video_tag: The tag to look for.
+            match: "exact" for tags equal to video_tag, "prefix" for tags
+                starting with it and "substring" for tags containing it.
+
+        Returns:
+            A list of matching Video objects, sorted by title.
+        """
+        tags = _match_tags(self._tag_vocabulary, video_tag.lower(), match)
+        video_ids = set().union(*(self._tag_index[tag] for tag in tags))
+        return sorted((self._videos[video_id] for video_id in video_ids),
+                      key=_title_order)
+
+
+class VideoLibraryOverlay(VideoStore):
+    """A class used to represent one session's view of a shared library.
+
+    The shared VideoLibrary is never modified. Flags set during the session
+    are kept on private copies of the flagged videos, so the memory used by
+    a session only grows with the number of videos it flags.
+    """
+
+    def __init__(self, library):
+        """The VideoLibraryOverlay class is initialized.
+
+        Args:
+            library: The shared VideoLibrary to read the catalog from.
+        """
+        self._library = library
+        # Session copies of the videos whose flag differs from the library.
+        self._overrides = {}
+        self._reset_playable()
+        self._synced_version = library.version
+
+    def _reset_playable(self):
+        """Forgets how the session's flags change the playable videos."""
+        # Number of playable library videos flagged in this session.
+        self._hidden_count = 0
+        # Ids of the flagged library videos allowed in this session, with
+        # the position of each of them in the list.
+        self._allowed = []
+        self._allowed_positions = {}
+
+    @property
+    def version(self):
+        """Returns the version of the shared library."""
+        return self._library.version
+
+    @property
+    def catalog_version(self):
+        """Returns the catalog version of the shared library."""
+        return self._library.catalog_version
+
+    def _sync(self):
+        """Rebuilds the session copies once the shared library changed, so
+        they follow updated videos and forget removed ones."""
+        if self._synced_version == self._library.version:
+            return
+        self._synced_version = self._library.version
+        overrides, self._overrides = self._overrides, {}
+        self._reset_playable()
+        for video_id, video in overrides.items():
+            if self._library.get_video(video_id) is not None:
+                self.flag_video(video_id, video.flags)
+
+    def _view(self, video):
+        """Returns the session's version of a library video."""
+        return self._overrides.get(video.video_id, video)
+
+    def video_count(self):
+        """Returns the number of videos in the shared library."""
+        return self._library.video_count()
+
+    def get_all_videos(self):
+        """Returns all available video information from the video library."""
+        self._sync()
+        return [self._view(video) for video in self._library.get_all_videos()]
+
+    def get_videos_by_title(self):
+        """Returns all videos from the video library, sorted by title."""
+        return list(self.iter_videos_by_title())
+
+    def iter_videos_by_title(self, offset=0, limit=None):
+        """Yields the videos of the library one at a time, sorted by title."""
+        self._sync()
+        for video in self._library.iter_videos_by_title(offset, limit):
+            yield self._view(video)
+
+    def get_video(self, video_id):
+        """Returns the session's Video object for video_id, None if the video
+        does not exist."""
+        self._sync()
+        video = self._library.get_video(video_id)
+        return None if video is None else self._view(video)
+
+    def playable_video_ids(self):
+        """Returns the ids of the videos that are not flagged in this
+        session."""
+        # Overrides only exist where the session disagrees with the library,
+        # so allowed ones are never in the library's playable list.
+        self._sync()
+        flagged = {video_id for video_id, video in self._overrides.items()
+                   if video.flags}
+        allowed = [video_id for video_id, video in self._overrides.items()
+                   if not video.flags]
+        return [video_id for video_id in self._library.playable_video_ids()
+                if video_id not in flagged] + allowed
+
+    def playable_count(self):
+        """Returns the number of videos that are not flagged in this
+        session."""
+        self._sync()
+        return (self._library.playable_count() - self._hidden_count
+                + len(self._allowed))
+
+    def random_video_id(self, rng):
+        """Returns the id of a random video that is not flagged in this
+        session.
+
+        Draws from the library's playable videos and redraws when the video
+        was flagged in this session, so the cost does not depend on the
+        size of the library unless the session flagged most of it.
+
+        Args:
+            rng: The random.Random instance (or random module) to draw with.
+
+        Returns:
+            A video id, None if every video is flagged.
+        """
+        total = self.playable_count()
+        if total <= 0:
+            return None
+        if rng.random() * total < len(self._allowed):
+            return rng.choice(self._allowed)
+        for _ in range(_RANDOM_ATTEMPTS):
+            video_id = self._library.random_video_id(rng)
+            if video_id not in self._overrides:
+                return video_id
+        return rng.choice([video_id
+                           for video_id in self._library.playable_video_ids()
+                           if video_id not in self._overrides])
+
+    def ranked_index(self):
+        """Returns the ranked index of the shared library, so sessions
+        share one."""
+        return self._library.ranked_index()
+
+    def search_titles(self, search_term):
+        """Returns the videos whose title contains the search term."""
+        self._sync()
+        return [self._view(video)
+                for video in self._library.search_titles(search_term)]
+
+    def search_tags(self, video_tag, match="substring"):
+        """Returns the videos with a tag matching the given tag."""
+        self._sync()
+        return [self._view(video)
+                for video in self._library.search_tags(video_tag, match)]
+
+    def session_flags(self):
+        """Returns the flag reason of every video whose flag was changed in
+        this session, None for the videos allowed again."""
+        self._sync()
+        return {video_id: video.flags
+                for video_id, video in self._overrides.items()}
+
+    def flag_video(self, video_id, flag_reason):
+        """Flags a video for this session only.
+
+        Args:
+            video_id: The video_id to be flagged.
+            flag_reason: Reason for flagging the video, None to allow it.
+        """
+        self._sync()
+        video = self._library.get_video(video_id)
+        previous = self._overrides.pop(video_id, None)
+        if previous is not None:
+            self._count_override(video, previous, -1)
+        if video.flags != flag_reason:
+            flagged = Video(video.title, video.video_id, video.tags)
+            flagged.flag_video(flag_reason)
+            self._overrides[video_id] = flagged
+            self._count_override(video, flagged, 1)
+
+    def _count_override(self, video, override, change):
+        """Adds (change 1) or removes (change -1) a session copy from the
+        playable counts, in constant time.
+
+        Args:
+            video: The library's version of the video.
+            override: The session's copy of it.
+            change: 1 when the copy is added, -1 when it is removed.
+        """
+        video_id = video.video_id
+        if override.flags:
+            if not video.flags:
+                self._hidden_count += change
+        elif change > 0:
+            self._allowed_positions[video_id] = len(self._allowed)
+            self._allowed.append(video_id)
+        else:
+            # Moves the last allowed video into the freed position.
+            position = self._allowed_positions.pop(video_id)
+            last = self._allowed.pop()
+            if last != video_id:
+                self._allowed[position] = last
+                self._allowed_positions[last] = position
@@ -1,28 +1,131 @@
 """A video player class."""
 
-from random import choice
-from .video_library import VideoLibrary
+from itertools import chain, islice
+import random
+import time
+from .output import StdoutWriter
+from .search_cache import LRUCache
+from .stats import Stats, timed
+from .video_library import VideoLibrary, VideoLibraryOverlay
+from .video_playlist import Playlist
+
+def _search_matches(key, video):
+    """Returns True if a video belongs in the results of a cached search."""
+    kind, term = key
+    if kind == "title":
+        return term in video.title.lower()
+    tags = [tag.lower() for tag in video.tags]
+    if kind == "exact tag":
+        return term in tags
+    if kind == "prefix tag":
+        return any(tag.startswith(term) for tag in tags)
+    return any(term in tag for tag in tags)
+
 
 class VideoPlayer:
     """A class used to represent a Video Player."""
 
-    def __init__(self, currently_playing = None):
-        self._video_library = VideoLibrary()
+    def __init__(self, currently_playing = None, video_library = None, rng = None,
+                 output = None, interactive = True, search_cache_size = 1024,
+                 store = None, stats = None, search_cache_ids = 100_000):
+        """Video player constructor.
+
+        Args:
+            currently_playing: The video to start the session with.
+            video_library: A VideoStore, such as a VideoLibrary or a
+                SqliteVideoLibrary, shared with other players. A new
+                VideoLibrary is loaded when it is not given. Flags only
+                apply to this player either way.
+            rng: A random.Random instance used by PLAY_RANDOM, seed it for
+                reproducible runs. Defaults to the random module.
+            output: The writer all output goes through, such as a
+                MemoryWriter or NullWriter. Defaults to standard output.
+            interactive: Whether searches ask which result to play and wait
+                for the answer on standard input. When False, results are
+                played with play_result instead, so nothing ever blocks.
+            search_cache_size: Number of search results kept in the search
+                cache, 0 disables it.
+            search_cache_ids: Total number of video ids the search cache
+                holds at most, so broad searches cannot grow it with the
+                catalog. A result with more ids than this is not cached.
+            store: A PlayerStore the playlists and flags are loaded from
+                and every change to them is recorded in. Without it they
+                only live in memory.
+            stats: The Stats this player's commands are recorded in, both
+                when run through the command parser and when its methods
+                are called directly. It may be shared with other players.
+                Pass a NullStats to turn instrumentation off. Defaults to a
+                new Stats.
+        """
+        if video_library is None:
+            video_library = VideoLibrary()
+        self._video_library = VideoLibraryOverlay(video_library)
+        self._rng = random if rng is None else rng
+        self.output = StdoutWriter() if output is None else output
+        self._interactive = interactive
+        self._last_results = [] #video IDs found by the latest search
+        self.search_cache = LRUCache(search_cache_size, search_cache_ids) #video IDs by (kind, lowercased term)
+        self._cache_version = self._video_library.version
         self.currently_playing = currently_playing #Stores details of currently playing video
         self.video_status = None #stores if video has been paused
         self.playlists = {}
-
+        self._playlist_names = {} #maps lowercased playlist names to their actual names
+        self.stats = Stats() if stats is None else stats
+        self._store = store
+        if store is not None:
+            self._restore(store.load())
+
+    def _restore(self, state):
+        """Recreates the playlists and flags of a saved state."""
+        for playlist_name, video_ids in state["playlists"].items():
+            playlist = Playlist(playlist_name)
+            for video_id in video_ids:
+                if self._video_library.get_video(video_id) is not None: #skip videos gone from the catalog
+                    playlist.add(video_id)
+            self.playlists[playlist_name] = playlist
+            self._playlist_names[playlist_name.lower()] = playlist_name
+        for video_id, flag_reason in state["flags"].items():
+            if self._video_library.get_video(video_id) is not None: #skip videos gone from the catalog
+                self._video_library.flag_video(video_id, flag_reason)
+
+    def _record(self, operation, *args):
+        """Records a change to the playlists or flags in the store, writing
+        a snapshot once the store asks for one."""
+        if self._store is None:
+            return
+        self._store.record(operation, *args)
+        if self._store.needs_compaction():
+            self._store.compact({
+                "playlists": {playlist_name: dict.fromkeys(playlist)
+                              for playlist_name, playlist in self.playlists.items()},
+                "flags": self._video_library.session_flags(),
+            })
+
+    def close(self):
+        """Writes pending changes to the store, if there is one."""
+        if self._store is not None:
+            self._store.close()
+
+    @timed("NUMBER_OF_VIDEOS")
     def number_of_videos(self):
         """Returns total number of videos"""
-        num_videos = len(self._video_library.get_all_videos())
-        print(f"{num_videos} videos in the library")
+        num_videos = self._video_library.video_count()
+        self.output.write(f"{num_videos} videos in the library")
 
-    def show_all_videos(self):
-        """Returns all videos."""
-        print("Here's a list of all available videos:")
-        for video_details in sorted(self._video_library.get_all_videos(), key=lambda x: x.title):
-            print(" ", video_details)
+    @timed("SHOW_ALL_VIDEOS")
+    def show_all_videos(self, limit=None, offset=0):
+        """Returns all videos.
 
+        Args:
+            limit: Maximum number of videos to list. None lists them all.
+            offset: Number of videos to skip before listing.
+        """
+        self.output.write_lines(chain(
+            ["Here's a list of all available videos:"],
+            (f"  {video_details}" for video_details
+             in self._video_library.iter_videos_by_title(offset, limit))))
+
+    @timed("PLAY")
     def play_video(self, video_id):
         """Plays the respective video.
 
@@ -34,66 +137,68 @@ class VideoPlayer:
             if self.currently_playing is not None: #If something is playing
                 self.stop_video()
             if video_details.flags:
-                print(f"Cannot play video: Video is currently flagged"
+                self.output.write(f"Cannot play video: Video is currently flagged"
                 f" (reason: {video_details.flags})")
                 return
-            print("Playing video:", video_details.title) #start new video
+            self.output.write(f"Playing video: {video_details.title}") #start new video
             self.currently_playing = video_details #save in currently playing
             self.video_status = "play" #sets video in playing mode
         else:
-            print("Cannot play video: Video does not exist")
+            self.output.write("Cannot play video: Video does not exist")
 
+    @timed("STOP")
     def stop_video(self):
         """Stops the current video."""
         if self.currently_playing is None:
-            print("Cannot stop video: No video is currently playing")
+            self.output.write("Cannot stop video: No video is currently playing")
         else:
-            print("Stopping video:",self.currently_playing.title)
+            self.output.write(f"Stopping video: {self.currently_playing.title}")
             self.currently_playing = None #reset player
             self.video_status = None
 
+    @timed("PLAY_RANDOM")
     def play_random_video(self):
         """Plays a random video from the video library."""
-        video_choices = []
-        for video in self._video_library.get_all_videos():
-            if video.flags:
-                continue #if a video is flagged, skip it
-            video_choices.append(video.video_id) #store all video ID in tuple
-
-        if video_choices:
-            self.play_video(choice(video_choices)) #pick a random one
+        video_id = self._video_library.random_video_id(self._rng) #flagged videos are skipped
+
+        if video_id:
+            self.play_video(video_id)
         else:
-            print("No videos available")
+            self.output.write("No videos available")
 
+    @timed("PAUSE")
     def pause_video(self):
         """Pauses the current video."""
         if self.video_status is None:
-            print("Cannot pause video: No video is currently playing")
+            self.output.write("Cannot pause video: No video is currently playing")
         elif self.video_status == "play":
-            print("Pausing video:", self.currently_playing.title)
+            self.output.write(f"Pausing video: {self.currently_playing.title}")
             self.video_status = "pause"
         else:
-            print("Video already paused:", self.currently_playing.title)
+            self.output.write(f"Video already paused: {self.currently_playing.title}")
 
+    @timed("CONTINUE")
     def continue_video(self):
         """Resumes playing the current video."""
         if self.video_status is None:
-            print("Cannot continue video: No video is currently playing")
+            self.output.write("Cannot continue video: No video is currently playing")
         elif self.video_status == "play":
-            print("Cannot continue video: Video is not paused")
+            self.output.write("Cannot continue video: Video is not paused")
         else:
-            print("Continuing video:", self.currently_playing.title)
+            self.output.write(f"Continuing video: {self.currently_playing.title}")
             self.video_status = "play"
 
+    @timed("SHOW_PLAYING")
     def show_playing(self):
         """Displays video currently playing."""
         if self.currently_playing is None:
-            print("No video is currently playing")
+            self.output.write("No video is currently playing")
         elif self.video_status == "pause":
-            print(f'Currently playing: {self.currently_playing} - PAUSED')
+            self.output.write(f'Currently playing: {self.currently_playing} - PAUSED')
         else:
-            print("Currently playing:",self.currently_playing)
+            self.output.write(f"Currently playing: {self.currently_playing}")
 
+    @timed("CREATE_PLAYLIST")
     def create_playlist(self, playlist_name):
         """Creates a playlist with a given name.
 
@@ -101,13 +206,16 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
         if " " in playlist_name:
-            print("Cannot create playlist: no whitespace allowed")
-        elif playlist_name.lower() in [key.lower() for key in self.playlists]:
-            print("Cannot create playlist: A playlist with the same name already exists")
+            self.output.write("Cannot create playlist: no whitespace allowed")
+        elif playlist_name.lower() in self._playlist_names:
+            self.output.write("Cannot create playlist: A playlist with the same name already exists")
         else:
-            print("Successfully created new playlist:", playlist_name)
-            self.playlists[playlist_name] = []
+            self.output.write(f"Successfully created new playlist: {playlist_name}")
+            self.playlists[playlist_name] = Playlist(playlist_name)
+            self._playlist_names[playlist_name.lower()] = playlist_name
+            self._record("create_playlist", playlist_name)
 
+    @timed("ADD_TO_PLAYLIST")
     def add_to_playlist(self, playlist_name, video_id):
         """Adds a video to a playlist with a given name.
 
@@ -121,27 +229,29 @@ class VideoPlayer:
             if video_title:
                 #valid video ID
                 if video_title.flags:
-                    print(f"Cannot add video to {playlist_name}: "
+                    self.output.write(f"Cannot add video to {playlist_name}: "
                     f"Video is currently flagged (reason: {video_title.flags})")
                 elif video_id in self.playlists[valid_playlist_name]:
-                    print(f"Cannot add video to {playlist_name}: Video already added")
+                    self.output.write(f"Cannot add video to {playlist_name}: Video already added")
                 else:
-                    print(f"Added video to {playlist_name}: {video_title.title}")
-                    self.playlists[valid_playlist_name].append(video_id)
+                    self.output.write(f"Added video to {playlist_name}: {video_title.title}")
+                    self.playlists[valid_playlist_name].add(video_id)
+                    self._record("add_to_playlist", valid_playlist_name, video_id)
             else:
-                print(f"Cannot add video to {playlist_name}: Video does not exist")
+                self.output.write(f"Cannot add video to {playlist_name}: Video does not exist")
             return
-        print(f"Cannot add video to {playlist_name}: Playlist does not exist")
+        self.output.write(f"Cannot add video to {playlist_name}: Playlist does not exist")
 
+    @timed("SHOW_ALL_PLAYLISTS")
     def show_all_playlists(self):
         """Display all playlists."""
         if self.playlists:
-            print("Showing all playlists:")
-            for title in sorted(self.playlists.keys()):
-                print(title)
+            self.output.write_lines(
+                ["Showing all playlists:", *sorted(self.playlists.keys())])
         else:
-            print("No playlists exist yet")
+            self.output.write("No playlists exist yet")
 
+    @timed("SHOW_PLAYLIST")
     def show_playlist(self, playlist_name):
         """Display all videos in a playlist with a given name.
 
@@ -150,16 +260,19 @@ class VideoPlayer:
         """
         valid_playlist_name = self.find_playlist_name(playlist_name)
         if valid_playlist_name:
-            print(f"Showing playlist: {playlist_name}")
+            self.output.write(f"Showing playlist: {playlist_name}")
             videos = self.playlists[valid_playlist_name]
-            if videos == []:
-                print("No videos here yet")
+            if not videos:
+                self.output.write("No videos here yet")
             else:
-                for video_info in videos:
-                    print(self._video_library.get_video(video_info))
+                self.output.write_lines(
+                    self._video_library.get_video(video_info)
+                    or f"{video_info} (no longer in the library)" #removed by a reload
+                    for video_info in videos)
         else:
-            print(f"Cannot show playlist {playlist_name}: Playlist does not exist")
+            self.output.write(f"Cannot show playlist {playlist_name}: Playlist does not exist")
 
+    @timed("REMOVE_FROM_PLAYLIST")
     def remove_from_playlist(self, playlist_name, video_id):
         """Removes a video to a playlist with a given name.
 
@@ -169,18 +282,21 @@ class VideoPlayer:
         """
         valid_playlist_name = self.find_playlist_name(playlist_name)
         if valid_playlist_name:
-            if self._video_library.get_video(video_id):
-                if video_id in self.playlists[valid_playlist_name]:
-                    self.playlists[valid_playlist_name].remove(video_id)
-                    print(f"Removed video from {playlist_name}: "
-                    f"{self._video_library.get_video(video_id).title}")
-                else:
-                    print(f"Cannot remove video from {playlist_name}: Video is not in playlist")
+            video_details = self._video_library.get_video(video_id)
+            if video_id in self.playlists[valid_playlist_name]:
+                #checked first, so videos removed by a reload can still be removed
+                self.playlists[valid_playlist_name].remove(video_id)
+                self._record("remove_from_playlist", valid_playlist_name, video_id)
+                self.output.write(f"Removed video from {playlist_name}: "
+                f"{video_details.title if video_details else video_id}")
+            elif video_details:
+                self.output.write(f"Cannot remove video from {playlist_name}: Video is not in playlist")
             else:
-                print(f"Cannot remove video from {playlist_name}: Video does not exist")
+                self.output.write(f"Cannot remove video from {playlist_name}: Video does not exist")
         else:
-            print(f"Cannot remove video from {playlist_name}: Playlist does not exist")
+            self.output.write(f"Cannot remove video from {playlist_name}: Playlist does not exist")
 
+    @timed("CLEAR_PLAYLIST")
     def clear_playlist(self, playlist_name):
         """Removes all videos from a playlist with a given name.
 
@@ -189,15 +305,17 @@ class VideoPlayer:
         """
         valid_playlist_name = self.find_playlist_name(playlist_name)
         if valid_playlist_name:
-            if self.playlists[valid_playlist_name] == []:
-                print(f"Showing playlist: {playlist_name}")
-                print("No videos here yet.")
+            if not self.playlists[valid_playlist_name]:
+                self.output.write(f"Showing playlist: {playlist_name}")
+                self.output.write("No videos here yet.")
             else:
                 self.playlists[valid_playlist_name].clear()
-                print(f"Successfully removed all videos from {playlist_name}")
+                self._record("clear_playlist", valid_playlist_name)
+                self.output.write(f"Successfully removed all videos from {playlist_name}")
         else:
-            print(f"Cannot clear playlist {playlist_name}: Playlist does not exist")
+            self.output.write(f"Cannot clear playlist {playlist_name}: Playlist does not exist")
 
+    @timed("DELETE_PLAYLIST")
     def delete_playlist(self, playlist_name):
         """Deletes a playlist with a given name.
 
@@ -207,37 +325,122 @@ class VideoPlayer:
         valid_playlist_name = self.find_playlist_name(playlist_name)
         if valid_playlist_name:
             self.playlists.pop(valid_playlist_name)
-            print(f"Deleted playlist: {playlist_name}")
+            self._playlist_names.pop(valid_playlist_name.lower())
+            self._record("delete_playlist", valid_playlist_name)
+            self.output.write(f"Deleted playlist: {playlist_name}")
         else:
-            print(f"Cannot delete playlist {playlist_name}: Playlist does not exist")
+            self.output.write(f"Cannot delete playlist {playlist_name}: Playlist does not exist")
 
 
-    def search_videos(self, search_term):
+    @timed("SEARCH_VIDEOS")
+    def search_videos(self, search_term, limit=None, offset=0):
         """Display all the videos whose titles contain the search_term.
 
         Args:
             search_term: The query to be used in search.
+            limit: Maximum number of results to display. None displays all.
+            offset: Number of results to skip before displaying.
+        """
+        matched_results = [video_details.video_id
+                           for video_details in self.find_videos(search_term)]
+        self.search_output(search_term, matched_results, limit, offset)
+
+    @timed("SEARCH_VIDEOS")
+    def search_videos_ranked(self, query, top=10):
+        """Display the videos best matching the query, best match first.
+
+        Titles and tags are matched word by word and typos are tolerated,
+        see RankedIndex.
+
+        Args:
+            query: The words to be used in search.
+            top: Maximum number of results to display.
         """
-        matched_results = []
-        for video_details in sorted(self._video_library.get_all_videos(), key=lambda x: x.title):
-            if search_term.lower() in video_details.title.lower() and not video_details.flags:
-                matched_results.append(video_details.video_id)
-        self.search_output(search_term, matched_results)
+        matched_results = [video_details.video_id for video_details, _
+                           in self._video_library.search_ranked(query, top)]
+        self.search_output(query, matched_results)
 
-    def search_videos_tag(self, video_tag):
+    @timed("SEARCH_VIDEOS_WITH_TAG")
+    def search_videos_tag(self, video_tag, limit=None, offset=0,
+                          match="substring"):
         """Display all videos whose tags contains the provided tag.
 
         Args:
             video_tag: The video tag to be used in search.
+            limit: Maximum number of results to display. None displays all.
+            offset: Number of results to skip before displaying.
+            match: "exact", "prefix" or "substring", see find_videos_tag.
         """
-        matched_results = []
-        for video_details in sorted(self._video_library.get_all_videos(), key=lambda x: x.title):
-            for tags in video_details.tags:
-                if video_tag.lower() in tags.lower()  and not video_details.flags:
-                    matched_results.append(video_details.video_id)
-                    break
-        self.search_output(video_tag, matched_results)
+        matched_results = [video_details.video_id for video_details
+                           in self.find_videos_tag(video_tag, match)]
+        self.search_output(video_tag, matched_results, limit, offset)
+
+    @timed("FIND_VIDEOS")
+    def find_videos(self, search_term):
+        """Returns the unflagged videos whose titles contain the search_term,
+        sorted by title. Nothing is displayed.
 
+        Args:
+            search_term: The query to be used in search.
+        """
+        return self._cached_search(
+            "title", search_term, self._video_library.search_titles)
+
+    @timed("FIND_VIDEOS_WITH_TAG")
+    def find_videos_tag(self, video_tag, match="substring"):
+        """Returns the unflagged videos whose tags contains the provided tag,
+        sorted by title. Nothing is displayed.
+
+        Args:
+            video_tag: The video tag to be used in search.
+            match: "exact" for tags equal to video_tag and "prefix" for tags
+                starting with it, which only look up the matching tags.
+                "substring" for tags containing it, which checks every
+                distinct tag of the library.
+        """
+        kind = "tag" if match == "substring" else f"{match} tag"
+        return self._cached_search(
+            kind, video_tag,
+            lambda term: self._video_library.search_tags(term, match))
+
+    def _cached_search(self, kind, term, search):
+        """Returns the unflagged results of a search, from the search cache
+        when it has them.
+
+        Args:
+            kind: "title", "tag", "exact tag" or "prefix tag", the kind
+                of search.
+            term: The search term.
+            search: The library method running the search.
+        """
+        if self._cache_version != self._video_library.version:
+            self.search_cache.clear() #the catalog changed under us
+            self._cache_version = self._video_library.version
+        key = (kind, term.lower())
+        video_ids = self.search_cache.get(key)
+        if video_ids is None:
+            video_ids = tuple(video_details.video_id
+                              for video_details in search(term)
+                              if not video_details.flags)
+            self.search_cache.put(key, video_ids)
+        return [self._video_library.get_video(video_id) for video_id in video_ids]
+
+    @timed("PLAY_RESULT")
+    def play_result(self, result_number):
+        """Plays a video from the results of the latest search.
+
+        Args:
+            result_number: The number the video was listed with.
+        """
+        if not self._last_results:
+            self.output.write("Cannot play result: No search results to choose from")
+        elif not 0 < result_number <= len(self._last_results):
+            self.output.write("Cannot play result: Please enter a number from "
+            "the search results")
+        else:
+            self.play_video(self._last_results[result_number-1])
+
+    @timed("FLAG_VIDEO")
     def flag_video(self, video_id, flag_reason="Not supplied"):
         """Mark a video as flagged.
 
@@ -248,16 +451,20 @@ class VideoPlayer:
         video_details = self._video_library.get_video(video_id) #Attempts to fetch video info
         if video_details:
             if video_details.flags:
-                print("Cannot flag video: Video is already flagged")
+                self.output.write("Cannot flag video: Video is already flagged")
             else:
-                if self.currently_playing == video_details:
+                if (self.currently_playing is not None
+                        and self.currently_playing.video_id == video_id):
                     self.stop_video()
-                video_details.flag_video(flag_reason)
-                print(f"Successfully flagged video: {video_details.title} "
-                f"(reason: {video_details.flags})")
+                self._video_library.flag_video(video_id, flag_reason)
+                self._record("flag_video", video_id, flag_reason)
+                self.search_cache.invalidate(lambda key, video_ids: video_id in video_ids)
+                self.output.write(f"Successfully flagged video: {video_details.title} "
+                f"(reason: {flag_reason})")
         else:
-            print("Cannot flag video: Video does not exist")
+            self.output.write("Cannot flag video: Video does not exist")
 
+    @timed("ALLOW_VIDEO")
     def allow_video(self, video_id):
         """Removes a flag from a video.
 
@@ -267,41 +474,87 @@ class VideoPlayer:
         video_details = self._video_library.get_video(video_id) #Attempts to fetch video info
         if video_details:
             if video_details.flags:
-                video_details.flag_video(None)
-                print(f"Successfully removed flag from video: {video_details.title}")
+                self._video_library.flag_video(video_id, None)
+                self._record("flag_video", video_id, None)
+                self.search_cache.invalidate(
+                    lambda key, video_ids: _search_matches(key, video_details))
+                self.output.write(f"Successfully removed flag from video: {video_details.title}")
             else:
-                print("Cannot remove flag from video: Video is not flagged")
+                self.output.write("Cannot remove flag from video: Video is not flagged")
 
         else:
-            print("Cannot remove flag from video: Video does not exist")
+            self.output.write("Cannot remove flag from video: Video does not exist")
+
+    def stats_report(self):
+        """Returns the command statistics, search cache counters and catalog
+        sizes as a dict that can be serialized to JSON."""
+        cache = self.search_cache.stats()
+        lookups = cache["hits"] + cache["misses"]
+        cache["hit_rate"] = cache["hits"] / lookups if lookups else 0.0
+        return {
+            "commands": self.stats.dump(),
+            "search_cache": cache,
+            "catalog": {
+                "videos": self._video_library.video_count(),
+                "playable_videos": self._video_library.playable_count(),
+                "playlists": len(self.playlists),
+            },
+        }
+
+    @timed("STATS")
+    def show_stats(self):
+        """Displays the command statistics, search cache counters and catalog
+        sizes."""
+        report = self.stats_report()
+        if not self.stats.enabled:
+            self.output.write("Command statistics are disabled")
+        elif report["commands"]:
+            self.output.write(f"{'COMMAND':<24}{'COUNT':>8}{'ERRORS':>8}"
+                              f"{'MEAN MS':>10}{'P50 MS':>10}{'P99 MS':>10}{'MAX MS':>10}")
+            self.output.write_lines(
+                f"{name:<24}{command['count']:>8}{command['errors']:>8}"
+                f"{command['mean_ms']:>10.3f}{command['p50_ms']:>10.3f}"
+                f"{command['p99_ms']:>10.3f}{command['max_ms']:>10.3f}"
+                for name, command in report["commands"].items())
+        cache = report["search_cache"]
+        catalog = report["catalog"]
+        self.output.write_lines([
+            f"Search cache: {cache['hits']} hits, {cache['misses']} misses "
+            f"({cache['hit_rate']:.1%} hit rate), {cache['size']}/{cache['maxsize']} entries",
+            f"Catalog: {catalog['videos']} videos, {catalog['playable_videos']} playable, "
+            f"{catalog['playlists']} playlists"])
 
     def find_playlist_name(self, playlist_input):
         """Given a playlist name, checks validity and returns correct playlist name"""
-        actual_playlist_names = list(self.playlists.keys())
-        position = 0
-        for list_name in actual_playlist_names:
-            if list_name.lower() == playlist_input.lower():
-                return actual_playlist_names[position]
-            position += 1
-        return None
-
-    def search_output(self, search_term, matched_results):
-        """Prints search results"""
-        position = 1
-        if matched_results != []:
-            print(f"Here are the results for {search_term}:")
-            for video_id in matched_results:
-                print(f"{position}) {self._video_library.get_video(video_id)}")
-                position += 1
-            print("Would you like to play any of the above? "
-            "If yes, specify the number of the video.")
-            print("If your answer is not a valid number, we will assume it's a no.")
-            try:
-                play = int(input())
-                if play > len(matched_results):
-                    raise ValueError #number is too high
-            except ValueError:
-                return
-            self.play_video(matched_results[play-1])
-        else:
-            print(f"No search results for {search_term}")
+        return self._playlist_names.get(playlist_input.lower())
+
+    def search_output(self, search_term, matched_results, limit=None, offset=0):
+        """Prints search results, numbered from offset + 1"""
+        self._last_results = matched_results
+        end = None if limit is None else offset + limit
+        matched_results = list(islice(matched_results, offset, end))
+        if matched_results == []:
+            self.output.write(f"No search results for {search_term}")
+            return
+        self.output.write_lines(chain(
+            [f"Here are the results for {search_term}:"],
+            (f"{position}) {self._video_library.get_video(video_id)}"
+             for position, video_id in enumerate(matched_results, offset + 1))))
+        if not self._interactive:
+            self.output.write("Enter PLAY_RESULT <number> to play any of the above.")
+            return
+        self.output.write_lines([
+            "Would you like to play any of the above? "
+            "If yes, specify the number of the video.",
+            "If your answer is not a valid number, we will assume it's a no."])
+        self.output.flush()
+        waiting = time.perf_counter()
+        answer = input()
+        self.stats.exclude(time.perf_counter() - waiting) #not part of the search
+        try:
+            play = int(answer)
+            if not offset < play <= offset + len(matched_results):
+                raise ValueError #number is not in the list
+        except ValueError:
+            return
+        self.play_video(matched_results[play-offset-1])
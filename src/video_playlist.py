@@ -2,4 +2,43 @@
 
 
 class Playlist:
-    """A class used to represent a Playlist."""
+    """A class used to represent a Playlist.
+
+    The video ids are kept in the keys of a dict, which remembers insertion
+    order, so checking, adding and removing a video all take constant time.
+    """
+
+    def __init__(self, name: str):
+        """Playlist constructor."""
+        self._name = name
+        self._video_ids = {}
+
+    @property
+    def name(self) -> str:
+        """Returns the name of the playlist."""
+        return self._name
+
+    def add(self, video_id):
+        """Adds a video at the end of the playlist, unless already there."""
+        self._video_ids[video_id] = None
+
+    def remove(self, video_id):
+        """Removes a video from the playlist.
+
+        Raises KeyError if the video is not in the playlist.
+        """
+        del self._video_ids[video_id]
+
+    def clear(self):
+        """Removes all the videos from the playlist."""
+        self._video_ids.clear()
+
+    def __contains__(self, video_id):
+        return video_id in self._video_ids
+
+    def __iter__(self):
+        """Iterates over the video ids in the order they were added."""
+        return iter(self._video_ids)
+
+    def __len__(self):
+        return len(self._video_ids)
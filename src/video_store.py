@@ -0,0 +1,119 @@
+"""The interface shared by the video library backends."""
+
+from abc import ABC, abstractmethod
+
+from .ranked_search import RankedIndex
+
+
+class VideoStore(ABC):
+    """A class used to represent where the video player reads videos from.
+
+    VideoLibrary, ColumnarVideoLibrary and SqliteVideoLibrary implement it,
+    so a player can run on any of them. Every implementation also has a
+    version attribute that increases whenever the visible videos change for
+    every user of the store, so caches built on top know to start over.
+    Flagging a video changes the version. Only adding or removing videos
+    changes the catalog_version, which stores whose videos never change
+    leave at 0.
+    """
+
+    catalog_version = 0
+
+    @abstractmethod
+    def get_video(self, video_id):
+        """Returns the Video object for video_id, None if the video does not
+        exist."""
+
+    @abstractmethod
+    def iter_videos_by_title(self, offset=0, limit=None):
+        """Yields the videos of the store one at a time, sorted by title.
+
+        Args:
+            offset: Number of videos to skip from the start of the listing.
+            limit: Maximum number of videos to yield. None yields them all.
+        """
+
+    def video_count(self):
+        """Returns the number of videos in the store."""
+        return len(self.get_all_videos())
+
+    def get_all_videos(self):
+        """Returns all available video information from the store."""
+        return self.get_videos_by_title()
+
+    def get_videos_by_title(self):
+        """Returns all videos from the store, sorted by title."""
+        return list(self.iter_videos_by_title())
+
+    @abstractmethod
+    def playable_video_ids(self):
+        """Returns the ids of all the videos that are not flagged."""
+
+    @abstractmethod
+    def playable_count(self):
+        """Returns the number of videos that are not flagged."""
+
+    @abstractmethod
+    def random_video_id(self, rng):
+        """Returns the id of a random unflagged video, None if every video
+        is flagged.
+
+        Args:
+            rng: The random.Random instance (or random module) to draw with.
+        """
+
+    @abstractmethod
+    def flag_video(self, video_id, flag_reason):
+        """Flags a video.
+
+        Args:
+            video_id: The video_id to be flagged.
+            flag_reason: Reason for flagging the video, None to allow it.
+        """
+
+    @abstractmethod
+    def search_titles(self, search_term):
+        """Returns the videos whose title contains the search term, ignoring
+        case, sorted by title."""
+
+    def ranked_index(self):
+        """Returns the RankedIndex of the store's titles and tags.
+
+        It is built on first use and rebuilt once the catalog_version
+        changed, so stores that are never searched this way pay nothing for
+        it. Flags do not rebuild it, search_ranked() leaves flagged videos
+        out when querying.
+        """
+        index = getattr(self, "_ranked_index", None)
+        if index is None or index.version != self.catalog_version:
+            index = self._ranked_index = RankedIndex(
+                self.iter_videos_by_title(), self.catalog_version)
+        return index
+
+    def search_ranked(self, query, limit=10):
+        """Returns the unflagged videos best matching a free text query.
+
+        Args:
+            query: Words to look for in titles and tags, typos allowed.
+            limit: Maximum number of results.
+
+        Returns:
+            A list of (Video, score) pairs, best match first.
+        """
+        def flagged(video_id):
+            video = self.get_video(video_id)
+            return video is None or bool(video.flags)
+
+        return [(self.get_video(video_id), score) for video_id, score
+                in self.ranked_index().search(query, limit, flagged)]
+
+    @abstractmethod
+    def search_tags(self, video_tag, match="substring"):
+        """Returns the videos with a tag matching the given tag, ignoring
+        case, sorted by title. Flagged videos are included.
+
+        Args:
+            video_tag: The tag to look for.
+            match: "exact" for tags equal to video_tag, "prefix" for tags
+                starting with it and "substring" for tags containing it.
+        """
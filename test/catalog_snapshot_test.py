@@ -0,0 +1,117 @@
+import os
+from pathlib import Path
+
+from src.catalog_snapshot import CatalogSnapshot, is_fresh, write_snapshot
+from src.video_library import VideoLibrary
+
+VIDEOS_FILE = Path(__file__).parent.parent / "src" / "videos.txt"
+
+
+def test_snapshot_round_trip(tmp_path):
+    snapshot_file = tmp_path / "videos.snapshot"
+    write_snapshot(snapshot_file, [
+        ("Amazing Cats", "amazing_cats_video_id", ["#cat", "#animal"]),
+        ("Video about nothing", "nothing_video_id", []),
+    ])
+
+    with CatalogSnapshot(snapshot_file) as snapshot:
+        assert len(snapshot) == 2
+        assert snapshot[1] == ("Video about nothing", "nothing_video_id", [])
+        assert list(snapshot)[0] == (
+            "Amazing Cats", "amazing_cats_video_id", ["#cat", "#animal"])
+
+
+def test_snapshot_round_trip_postings(tmp_path):
+    snapshot_file = tmp_path / "videos.snapshot"
+    write_snapshot(snapshot_file, [("A", "a", []), ("B", "b", [])],
+                   postings=({"x": [0, 1], "y": [1]}, {}))
+
+    with CatalogSnapshot(snapshot_file) as snapshot:
+        title_postings, tag_postings = snapshot.postings()
+    assert {key: list(rows) for key, rows in title_postings.items()} == {
+        "x": [0, 1], "y": [1]}
+    assert tag_postings == {}
+
+
+def test_library_writes_then_loads_snapshot(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text(VIDEOS_FILE.read_text())
+    snapshot_file = tmp_path / "videos.snapshot"
+
+    VideoLibrary(videos_file, snapshot_file)
+    assert is_fresh(snapshot_file, videos_file)
+
+    library = VideoLibrary(videos_file, snapshot_file)
+    assert len(library.get_all_videos()) == 5
+    assert library.get_video("nothing_video_id").tags == ()
+
+    def ids(videos):
+        return [video.video_id for video in videos]
+
+    parsed = VideoLibrary(videos_file)
+    for term in ("cat", "at", "Video about"):
+        assert ids(library.search_titles(term)) == ids(
+            parsed.search_titles(term))
+    assert ids(library.search_tags("#ca", "prefix")) == ids(
+        parsed.search_tags("#ca", "prefix"))
+    assert sorted(library.playable_video_ids()) == sorted(
+        parsed.playable_video_ids())
+    library.remove_video("amazing_cats_video_id")
+    assert ids(library.search_tags("#cat")) == ["another_cat_video_id"]
+
+
+def test_library_rebuilds_stale_snapshot(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    snapshot_file = tmp_path / "videos.snapshot"
+    write_snapshot(snapshot_file, [])
+    videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n")
+    os.utime(snapshot_file, (0, 0))
+
+    library = VideoLibrary(videos_file, snapshot_file)
+
+    assert library.get_video("funny_dogs_video_id").tags == ("#dog",)
+    with CatalogSnapshot(snapshot_file) as snapshot:
+        assert len(snapshot) == 1
+
+
+def test_snapshot_is_stale_once_catalog_size_changes(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    snapshot_file = tmp_path / "videos.snapshot"
+    videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n")
+    VideoLibrary(videos_file, snapshot_file)
+    mtime_ns = videos_file.stat().st_mtime_ns
+
+    # Replaced with its modification time preserved.
+    videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n"
+                           "Cat Nap | cat_nap_video_id | #cat\n")
+    os.utime(videos_file, ns=(mtime_ns, mtime_ns))
+    assert not is_fresh(snapshot_file, videos_file)
+
+    library = VideoLibrary(videos_file, snapshot_file)
+    assert library.video_count() == 2
+    assert is_fresh(snapshot_file, videos_file)
+
+
+def test_library_rebuilds_truncated_snapshot(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text(VIDEOS_FILE.read_text())
+    snapshot_file = tmp_path / "videos.snapshot"
+    VideoLibrary(videos_file, snapshot_file)
+    data = snapshot_file.read_bytes()
+
+    for corrupt in (data[:-10], data[:20], b"", data[:-1] + b"\xff"):
+        snapshot_file.write_bytes(corrupt)
+        library = VideoLibrary(videos_file, snapshot_file)
+        assert library.video_count() == 5
+        with CatalogSnapshot(snapshot_file) as snapshot:
+            assert len(snapshot) == 5
+
+
+def test_library_snapshot_skips_blank_lines(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n\n"
+                           "Cat Nap | cat_nap_video_id | #cat\n")
+    snapshot_file = tmp_path / "videos.snapshot"
+
+    assert VideoLibrary(videos_file, snapshot_file).video_count() == 2
+    assert VideoLibrary(videos_file, snapshot_file).video_count() == 2
@@ -0,0 +1,86 @@
+import random
+
+from src.columnar_library import ColumnarVideoLibrary
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def ids(videos):
+    return [video.video_id for video in videos]
+
+
+def test_matches_video_library():
+    columnar = ColumnarVideoLibrary()
+    library = VideoLibrary()
+
+    assert ids(columnar.get_videos_by_title()) == ids(
+        library.get_videos_by_title())
+    for term in ("cat", "A", "video", "blah"):
+        assert ids(columnar.search_titles(term)) == ids(
+            library.search_titles(term))
+    for tag, match in (("#cat", "substring"), ("#ca", "prefix"),
+                       ("#ANIMAL", "exact"), ("#blah", "substring")):
+        assert ids(columnar.search_tags(tag, match)) == ids(
+            library.search_tags(tag, match))
+
+
+def test_builds_videos_on_demand():
+    library = ColumnarVideoLibrary()
+    video = library.get_video("amazing_cats_video_id")
+
+    assert video.title == "Amazing Cats"
+    assert video.tags == ("#cat", "#animal")
+    assert library.get_video("nothing_video_id").tags == ()
+    assert library.get_video("does_not_exist") is None
+
+
+def test_flag_bitmap():
+    library = ColumnarVideoLibrary()
+    library.flag_video("funny_dogs_video_id", "dont_like_dogs")
+
+    assert library.get_video("funny_dogs_video_id").flags == "dont_like_dogs"
+    assert "funny_dogs_video_id" not in library.playable_video_ids()
+    assert len(library.playable_video_ids()) == 4
+
+    library.flag_video("funny_dogs_video_id", None)
+    assert library.get_video("funny_dogs_video_id").flags is None
+    assert len(library.playable_video_ids()) == 5
+
+
+def test_player_with_columnar_library(capfd):
+    player = VideoPlayer(video_library=ColumnarVideoLibrary())
+    player.show_all_videos()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 6
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+
+
+def test_random_video_id_skips_flagged():
+    library = ColumnarVideoLibrary()
+    rng = random.Random(0)
+    for video_id in library.playable_video_ids()[1:]:
+        library.flag_video(video_id, "flagged")
+
+    assert library.playable_count() == 1
+    assert library.random_video_id(rng) == "amazing_cats_video_id"
+
+    library.flag_video("amazing_cats_video_id", "flagged")
+    assert library.random_video_id(rng) is None
+
+
+def test_empty_term_and_duplicate_ids(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text("Funny Dogs | dogs_video_id | #dog\n"
+                           "Cat Nap | cat_nap_video_id | #cat , #animal\n"
+                           "Funny Puppies | dogs_video_id | #pup , #animal\n")
+    library = ColumnarVideoLibrary(videos_file)
+
+    assert ids(library.search_titles("")) == [
+        "cat_nap_video_id", "dogs_video_id"]
+    assert library.video_count() == library.playable_count() == 2
+    assert library.search_tags("#dog") == []
+    assert ids(library.search_tags("#animal", "exact")) == [
+        "cat_nap_video_id", "dogs_video_id"]
+    assert ids(library.search_tags("#")) == [
+        "cat_nap_video_id", "dogs_video_id"]
@@ -0,0 +1,78 @@
+import pytest
+from src import command_parser
+from src.command_parser import CommandException
+from src.command_parser import CommandParser
+from src.command_parser import register_command
+from src.video_player import VideoPlayer
+
+
+def test_show_all_videos_limit_offset(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SHOW_ALL_VIDEOS", "LIMIT", "1", "OFFSET", "4"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Video about nothing (nothing_video_id) []" in lines[1]
+
+
+def test_page_options_must_be_numbers():
+    parser = CommandParser(VideoPlayer())
+    with pytest.raises(CommandException):
+        parser.execute_command(["SHOW_ALL_VIDEOS", "LIMIT", "ten"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["SEARCH_VIDEOS", "cat", "OFFSET"])
+
+
+def test_search_videos_with_tag_match_modes(capfd):
+    parser = CommandParser(VideoPlayer(interactive=False))
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#ca", "EXACT"])
+    parser.execute_command(
+        ["SEARCH_VIDEOS_WITH_TAG", "#ca", "prefix", "LIMIT", "1"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[0] == "No search results for #ca"
+    assert "Amazing Cats (amazing_cats_video_id)" in lines[2]
+    assert "another_cat_video_id" not in out
+
+
+def test_commands_are_case_insensitive(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["number_of_videos"])
+    parser.execute_command(["NOT_A_COMMAND"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "5 videos in the library" in lines[0]
+    assert "Please enter a valid command" in lines[1]
+
+
+def test_wrong_number_of_arguments():
+    parser = CommandParser(VideoPlayer())
+    with pytest.raises(CommandException, match="ALLOW_VIDEO"):
+        parser.execute_command(["ALLOW_VIDEO"])
+    with pytest.raises(CommandException, match="FLAG_VIDEO"):
+        parser.execute_command(["FLAG_VIDEO", "a", "b", "c"])
+
+
+def test_register_command(capfd, monkeypatch):
+    # Registers into a copy, so later tests see the usual commands only.
+    monkeypatch.setattr(command_parser, "_COMMANDS",
+                        dict(command_parser._COMMANDS))
+    register_command(
+        "SHOW_PLAYLIST_COUNT",
+        lambda player: print(f"{len(player.playlists)} playlists"))
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SHOW_PLAYLIST_COUNT"])
+    out, err = capfd.readouterr()
+    assert "0 playlists" in out
+
+
+def test_help_lists_commands_aligned(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["HELP"])
+    out, err = capfd.readouterr()
+    lines = [line for line in out.splitlines() if line.strip()]
+    assert lines[0] == "Available commands:"
+    assert ("    PLAY_RESULT <number> - Plays the video listed with this "
+            "number by the latest search.") in lines
+    for line in lines[1:]:
+        assert line.startswith("    ") and not line.startswith("     ")
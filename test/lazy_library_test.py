@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from src.lazy_library import LazyVideoLibrary
+from src.output import MemoryWriter
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def _ids(videos):
+    return [video.video_id for video in videos]
+
+
+def test_lazy_library_matches_video_library():
+    library = VideoLibrary()
+    lazy_library = LazyVideoLibrary()
+    assert lazy_library.video_count() == 5
+    assert len(lazy_library.cache) == 0
+    assert str(lazy_library.get_video("amazing_cats_video_id")) == str(
+        library.get_video("amazing_cats_video_id"))
+    assert lazy_library.get_video("missing") is None
+    assert ([str(video) for video in lazy_library.get_videos_by_title()]
+            == [str(video) for video in library.get_videos_by_title()])
+    assert (_ids(lazy_library.iter_videos_by_title(1, 2))
+            == _ids(library.iter_videos_by_title(1, 2)))
+    for term in ("", "CAT", "video", "nothing"):
+        assert (_ids(lazy_library.search_titles(term))
+                == _ids(library.search_titles(term)))
+    for match in ("exact", "prefix", "substring"):
+        for tag in ("#cat", "#DOG", "#", "dog"):
+            assert (_ids(lazy_library.search_tags(tag, match))
+                    == _ids(library.search_tags(tag, match)))
+    with pytest.raises(ValueError):
+        lazy_library.search_tags("#cat", "regex")
+
+
+def test_lazy_library_cache_is_bounded_and_keeps_flags(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text(
+        "\n".join(f"Video {number} | video_{number} | #tag{number}"
+                  for number in range(10)) + "\n\n")
+    library = LazyVideoLibrary(videos_file, cache_size=3)
+    library.flag_video("video_0", "dont_like")
+    for number in range(10):
+        assert library.get_video(f"video_{number}").tags == (f"#tag{number}",)
+    assert len(library.cache) == 3
+    assert library.get_video("video_0").flags == "dont_like"
+    library.flag_video("video_0", None)
+    assert library.get_video("video_0").flags is None
+    library.flag_video("video_9", "dont_like")
+    assert library.get_video("video_9").flags == "dont_like"
+    assert library.playable_count() == 9
+    assert "video_9" not in library.playable_video_ids()
+    with pytest.raises(KeyError):
+        library.flag_video("missing", "dont_like")
+
+
+def test_lazy_random_video_id_skips_flagged():
+    library = LazyVideoLibrary()
+    for video_id in library.playable_video_ids()[1:]:
+        library.flag_video(video_id, "dont_like")
+    rng = random.Random(0)
+    assert library.random_video_id(rng) == "funny_dogs_video_id"
+    library.flag_video("funny_dogs_video_id", "dont_like")
+    assert library.random_video_id(rng) is None
+
+
+def test_player_on_lazy_library():
+    player = VideoPlayer(video_library=LazyVideoLibrary(),
+                         output=MemoryWriter(), interactive=False)
+    player.flag_video("amazing_cats_video_id")
+    player.search_videos("cat")
+    player.play_result(1)
+    assert player.output.getvalue().splitlines()[-1] == (
+        "Playing video: Another Cat Video")
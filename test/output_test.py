@@ -0,0 +1,46 @@
+from src.output import MemoryWriter, NullWriter, StdoutWriter
+from src.video_player import VideoPlayer
+
+
+def test_memory_writer_captures_player_output(capfd):
+    output = MemoryWriter()
+    player = VideoPlayer(output=output)
+    player.show_all_videos(limit=1)
+    player.play_video("does_not_exist")
+    out, err = capfd.readouterr()
+
+    assert out == ""
+    assert output.lines == [
+        "Here's a list of all available videos:",
+        "  Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "Cannot play video: Video does not exist",
+    ]
+    assert output.getvalue().count("\n") == 3
+    output.clear()
+    assert output.lines == []
+
+
+def test_null_writer_discards_output(capfd):
+    player = VideoPlayer(output=NullWriter())
+    player.show_all_videos()
+    out, err = capfd.readouterr()
+    assert out == ""
+
+
+def test_stdout_writer(capfd):
+    output = StdoutWriter()
+    output.write("one")
+    output.write_lines(["two", "three"])
+    output.write_lines([])
+    out, err = capfd.readouterr()
+    assert out == "one\ntwo\nthree\n"
+
+
+def test_stdout_writer_writes_long_listings_in_chunks(monkeypatch):
+    writes = []
+    monkeypatch.setattr("sys.stdout", type("Stdout", (), {
+        "write": lambda self, text: writes.append(text)})())
+    StdoutWriter().write_lines(str(number) for number in range(2500))
+
+    assert [text.count("\n") for text in writes] == [1000, 1000, 500]
+    assert "".join(writes).split() == [str(number) for number in range(2500)]
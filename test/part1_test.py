@@ -1,3 +1,4 @@
+import random
 import re
 from src.video_player import VideoPlayer
 
@@ -236,3 +237,25 @@ def test_continue_none_playing(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "Cannot continue video: No video is currently playing" in lines[0]
+
+
+def test_show_all_videos_page(capfd):
+    player = VideoPlayer()
+    player.show_all_videos(limit=2, offset=1)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 3
+    assert "Here's a list of all available videos:" in lines[0]
+    assert "Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[1]
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[2]
+
+
+def test_play_random_video_seeded(capfd):
+    outputs = []
+    for _ in range(2):
+        player = VideoPlayer(rng=random.Random(42))
+        for _ in range(5):
+            player.play_random_video()
+        out, err = capfd.readouterr()
+        outputs.append(out)
+    assert outputs[0] == outputs[1]
@@ -235,3 +235,16 @@ def test_delete_playlist_nonexistent(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "Cannot delete playlist my_cool_playlist: Playlist does not exist" in lines[0]
+
+
+def test_delete_playlist_then_recreate_other_case(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_PLAYlist")
+    player.delete_playlist("MY_playlist")
+    player.create_playlist("My_Playlist")
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Successfully created new playlist: My_Playlist" in lines[2]
+    assert "Showing playlist: my_playlist" in lines[3]
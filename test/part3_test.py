@@ -140,3 +140,41 @@ def test_search_videos_tag_no_results(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "No search results for #blah" in lines[0]
+
+
+@mock.patch('builtins.input', lambda *args: '2')
+def test_search_videos_page_keeps_numbering(capfd):
+    player = VideoPlayer()
+    player.search_videos("cat", limit=1, offset=1)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Here are the results for cat:" in lines[0]
+    assert "2) Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[1]
+    assert "Playing video: Another Cat Video" in lines[4]
+
+
+def test_search_videos_not_interactive_then_play_result(capfd):
+    player = VideoPlayer(interactive=False)
+    player.play_result(1)
+    player.search_videos("cat")
+    player.play_result(3)
+    player.play_result(2)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 7
+    assert "Cannot play result: No search results to choose from" in lines[0]
+    assert "Here are the results for cat:" in lines[1]
+    assert "Enter PLAY_RESULT <number> to play any of the above." in lines[4]
+    assert ("Cannot play result: Please enter a number from the search "
+            "results") in lines[5]
+    assert "Playing video: Another Cat Video" in lines[6]
+
+
+def test_find_videos_skips_flagged():
+    player = VideoPlayer()
+    player.flag_video("amazing_cats_video_id")
+    assert [video.video_id for video in player.find_videos("cat")] == [
+        "another_cat_video_id"]
+    assert [video.video_id for video in player.find_videos_tag("#animal")] == [
+        "another_cat_video_id", "funny_dogs_video_id"]
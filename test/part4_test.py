@@ -1,6 +1,7 @@
 from unittest import mock
 
 from src.video_player import VideoPlayer
+from src.video_library import VideoLibrary
 
 
 def test_flag_video_with_reason(capfd):
@@ -269,3 +270,15 @@ def test_allow_video_show_playlist(capfd):
     assert "Successfully removed flag from video: Amazing Cats" in lines[5]
     assert "Showing playlist: my_playlist" in lines[6]
     assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[7]
+
+
+def test_flag_video_shared_library(capfd):
+    library = VideoLibrary()
+    player = VideoPlayer(video_library=library)
+    other_player = VideoPlayer(video_library=library)
+    player.flag_video("amazing_cats_video_id")
+    other_player.play_video("amazing_cats_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Playing video: Amazing Cats" in lines[1]
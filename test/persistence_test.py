@@ -0,0 +1,115 @@
+from src.output import MemoryWriter
+from src.persistence import PlayerStore
+from src.video_player import VideoPlayer
+
+
+def _player(directory, **store_options):
+    return VideoPlayer(output=MemoryWriter(),
+                       store=PlayerStore(directory, **store_options))
+
+
+def _make_changes(player):
+    player.create_playlist("my_PLAYlist")
+    player.create_playlist("gone")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.add_to_playlist("my_playlist", "life_at_google_video_id")
+    player.remove_from_playlist("my_playlist", "funny_dogs_video_id")
+    player.delete_playlist("GONE")
+    player.flag_video("nothing_video_id", "dont_like")
+    player.flag_video("another_cat_video_id")
+    player.allow_video("another_cat_video_id")
+
+
+def _assert_restored(player):
+    assert list(player.playlists) == ["my_PLAYlist"]
+    assert list(player.playlists["my_PLAYlist"]) == [
+        "amazing_cats_video_id", "life_at_google_video_id"]
+    assert player.find_playlist_name("MY_playlist") == "my_PLAYlist"
+    player.play_video("nothing_video_id")
+    player.play_video("another_cat_video_id")
+    assert player.output.getvalue().splitlines()[-2:] == [
+        "Cannot play video: Video is currently flagged (reason: dont_like)",
+        "Playing video: Another Cat Video"]
+
+
+def test_player_replays_log(tmp_path):
+    player = _player(tmp_path, durability="always")
+    _make_changes(player)
+    player.close()
+
+    _assert_restored(_player(tmp_path))
+
+
+def test_player_restores_compacted_snapshot(tmp_path):
+    player = _player(tmp_path, durability="none", snapshot_every=4)
+    _make_changes(player)
+    player.close()
+    assert (tmp_path / "player.snapshot.json").exists()
+    assert len((tmp_path / "player.log").read_text().splitlines()) == 2
+
+    _assert_restored(_player(tmp_path))
+
+
+def test_store_ignores_torn_last_line(tmp_path):
+    player = _player(tmp_path)
+    player.create_playlist("kept")
+    player.close()
+    with open(tmp_path / "player.log", "a") as log:
+        log.write('[2, "create_playlist", ["to')
+
+    store = PlayerStore(tmp_path)
+    assert store.load()["playlists"] == {"kept": {}}
+    store.close()
+
+
+def test_store_keeps_changes_made_after_torn_line(tmp_path):
+    player = _player(tmp_path)
+    player.create_playlist("kept")
+    player.close()
+    with open(tmp_path / "player.log", "a") as log:
+        log.write('[2, "create_playlist", ["to')
+
+    player = _player(tmp_path)
+    player.create_playlist("after_crash")
+    player.add_to_playlist("after_crash", "amazing_cats_video_id")
+    player.close()
+
+    store = PlayerStore(tmp_path)
+    assert store.load()["playlists"] == {
+        "kept": {}, "after_crash": {"amazing_cats_video_id": None}}
+    store.close()
+
+
+def test_store_skips_changes_already_in_snapshot(tmp_path):
+    store = PlayerStore(tmp_path)
+    store.load()
+    store.record("create_playlist", "a")
+    store.close()
+    logged = (tmp_path / "player.log").read_text()
+    store = PlayerStore(tmp_path)
+    store.compact(store.load())
+    store.close()
+    # The process stopped before the log was emptied.
+    (tmp_path / "player.log").write_text(logged)
+
+    store = PlayerStore(tmp_path)
+    assert store.load()["playlists"] == {"a": {}}
+    store.record("add_to_playlist", "a", "video")
+    store.close()
+    store = PlayerStore(tmp_path)
+    assert store.load()["playlists"] == {"a": {"video": None}}
+    store.close()
+
+
+def test_player_skips_playlist_videos_gone_from_catalog(tmp_path):
+    store = PlayerStore(tmp_path)
+    store.load()
+    store.record("create_playlist", "mine")
+    store.record("add_to_playlist", "mine", "removed_video_id")
+    store.record("add_to_playlist", "mine", "amazing_cats_video_id")
+    store.close()
+
+    player = _player(tmp_path)
+    assert list(player.playlists["mine"]) == ["amazing_cats_video_id"]
+    player.close()
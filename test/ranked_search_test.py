@@ -0,0 +1,106 @@
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.output import MemoryWriter
+from src.ranked_search import RankedIndex, edit_distance, tokenize
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_tokenize_and_edit_distance():
+    assert tokenize("Amazing Cats, #Animal") == ["amazing", "cats", "animal"]
+    assert edit_distance("googel", "google", 1) == 1
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("kitten", "sitting", 1) == 2
+    assert edit_distance("cat", "cat", 0) == 0
+
+
+def test_ranked_index_scores_and_tolerates_typos():
+    videos = [Video("Funny Dogs", "dogs", ["#dog", "#animal"]),
+              Video("Funny Cats", "cats", ["#cat", "#animal"]),
+              Video("Dog Training Guide", "training", ["#dog", "#howto"]),
+              Video("Cooking Show", "cooking", ["#food"])]
+    index = RankedIndex(videos)
+    assert [video_id for video_id, _ in index.search("funny dog", 10)] == [
+        "dogs", "training", "cats"]
+    assert [video_id for video_id, _ in index.search("funy dgos", 3)] == [
+        "dogs", "cats"]
+    assert [video_id for video_id, _ in index.search("traning", 3)] == [
+        "training"]
+    assert [video_id for video_id, _ in index.search(
+        "funny dog", 2, lambda video_id: video_id == "dogs")] == [
+        "training", "cats"]
+    assert index.search("cta", 10) == []  # too short for typos
+    assert index.search("", 10) == []
+
+
+def test_ranked_index_caps_postings_per_token():
+    videos = [Video(f"Cat {number}", f"cat_{number}", [])
+              for number in range(10)]
+    videos.append(Video("Cat", "short_cat", []))
+    index = RankedIndex(videos, max_postings=3)
+    assert len(index.scores("cat")) == 3
+    assert index.search("cat", 1)[0][0] == "short_cat"
+
+
+def test_ranked_index_follows_library_version():
+    library = VideoLibrary()
+    index = library.ranked_index()
+    assert library.ranked_index() is index
+    library.flag_video("amazing_cats_video_id", "dont_like_cats")
+    assert library.ranked_index() is index
+    assert "amazing_cats_video_id" not in [
+        video.video_id for video, _ in library.search_ranked("amazing cat")]
+    library.add_video(Video("Surfing Lessons", "surfing_video_id", []))
+    assert [video.video_id for video, _
+            in library.search_ranked("surfng")] == ["surfing_video_id"]
+    library.remove_video("surfing_video_id")
+    assert library.search_ranked("surfng") == []
+    assert library.ranked_index() is index
+
+
+def test_ranked_index_updates_match_a_rebuild():
+    # Videos of four tokens each, so the average length stays the same.
+    videos = [Video("Funny Dogs", "dogs", ["#dog", "#animal"]),
+              Video("Funny Cats", "cats", ["#cat", "#animal"]),
+              Video("Dog Training", "training", ["#dog", "#howto"])]
+    cooking = Video("Cooking Show", "cooking", ["#food", "#funny"])
+    cats = Video("Funny Cats", "cats", ["#cat", "#pet"])
+    index = RankedIndex(videos)
+    index.add(cooking)
+    index.remove(videos[1])
+    index.add(cats)
+    rebuilt = RankedIndex([videos[0], videos[2], cooking, cats])
+    for query in ("funny", "dog animal", "cokking", "traning cat pet"):
+        assert index.scores(query) == rebuilt.scores(query)
+    index.remove(cooking)
+    assert index.search("cooking", 10) == []
+
+
+def test_search_videos_ranked_command():
+    player = VideoPlayer(output=MemoryWriter(), interactive=False)
+    parser = CommandParser(player)
+    player.flag_video("funny_dogs_video_id")
+    player.output.clear()
+    parser.execute_command(["SEARCH_VIDEOS", "amazng", "cat", "ranked",
+                            "TOP", "2"])
+    parser.execute_command(["PLAY_RESULT", "2"])
+    parser.execute_command(["SEARCH_VIDEOS", "funny", "dog", "RANKED"])
+    assert player.output.getvalue().splitlines() == [
+        "Here are the results for amazng cat:",
+        "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "2) Another Cat Video (another_cat_video_id) [#cat #animal]",
+        "Enter PLAY_RESULT <number> to play any of the above.",
+        "Playing video: Another Cat Video",
+        "No search results for funny dog"]
+    for options in (["TOP"], ["TOP", "x"], ["LIMIT", "2"], ["dog"],
+                    ["TOP", "2", "dog"]):
+        with pytest.raises(CommandException):
+            parser.execute_command(["SEARCH_VIDEOS", "cat", "RANKED",
+                                    *options])
+    player.output.clear()
+    parser.execute_command(["SEARCH_VIDEOS", "ranked", "RANKED"])
+    parser.execute_command(["SEARCH_VIDEOS", "ranked"])
+    assert player.output.getvalue().splitlines() == [
+        "No search results for ranked", "No search results for ranked"]
@@ -0,0 +1,59 @@
+import io
+import sqlite3
+
+from src.run import main, run_batch
+
+
+def test_run_batch_buffers_output_and_times_commands():
+    commands = io.StringIO(
+        "PLAY amazing_cats_video_id\n"
+        "\n"
+        "SEARCH_VIDEOS dog\n"
+        "PLAY_RESULT 1\n"
+        "PLAY\n"
+        "EXIT\n"
+        "STOP\n")
+    output = io.StringIO()
+    report = io.StringIO()
+
+    timings = run_batch(commands, output, report)
+
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 7
+    assert "Playing video: Amazing Cats" in lines[0]
+    assert "Here are the results for dog:" in lines[1]
+    assert "Enter PLAY_RESULT <number>" in lines[3]
+    assert "Stopping video: Amazing Cats" in lines[4]
+    assert "Playing video: Funny Dogs" in lines[5]
+    assert "Please enter PLAY command followed by video_id." in lines[6]
+    assert sorted(timings) == ["PLAY", "PLAY_RESULT", "SEARCH_VIDEOS"]
+    assert len(timings["PLAY"]) == 2
+    assert "Executed 4 commands" in report.getvalue()
+
+
+def test_run_batch_ending_with_search_does_not_wait_for_input():
+    commands = io.StringIO("PLAY amazing_cats_video_id\nSEARCH_VIDEOS dog\n")
+    output = io.StringIO()
+
+    run_batch(commands, output, io.StringIO())
+
+    lines = output.getvalue().splitlines()
+    assert "Playing video: Amazing Cats" in lines[0]
+    assert "Here are the results for dog:" in lines[1]
+    assert lines[-1] == "Enter PLAY_RESULT <number> to play any of the above."
+
+
+def test_main_keeps_changes_in_data_dir_over_database(tmp_path, capsys):
+    database = tmp_path / "videos.db"
+    commands = tmp_path / "commands.txt"
+    commands.write_text("CREATE_PLAYLIST mine\n")
+
+    main(["--database", str(database), "--data", str(tmp_path / "data"),
+          "--batch", str(commands)])
+
+    assert (tmp_path / "data" / "player.log").read_text().count("mine") == 1
+    connection = sqlite3.connect(database)
+    tables = {name for name, in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")}
+    connection.close()
+    assert "videos" in tables and "playlists" not in tables
@@ -0,0 +1,85 @@
+from src.search_cache import LRUCache
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 1,
+                             "size": 2, "maxsize": 2}
+
+
+def test_lru_cache_bounds_total_weight():
+    cache = LRUCache(10, maxweight=4)
+    cache.put("a", (1, 2))
+    cache.put("b", (3, 4))
+    cache.put("c", (5,))
+
+    assert cache.get("a") is None
+    assert cache.get("b") == (3, 4)
+    cache.put("d", (1, 2, 3, 4, 5))
+    assert cache.get("d") is None
+    cache.put("b", (3,))
+    cache.put("e", (6, 7))
+    assert len(cache) == 3
+
+
+def test_player_does_not_cache_searches_above_the_id_limit():
+    player = VideoPlayer(search_cache_ids=2)
+    player.find_videos("a")
+    player.find_videos("cat")
+    assert len(player.search_cache) == 1
+
+
+def test_lru_cache_invalidate():
+    cache = LRUCache()
+    cache.put("a", (1, 2))
+    cache.put("b", (3,))
+    cache.invalidate(lambda key, value: 2 in value)
+    assert len(cache) == 1
+    assert cache.get("b") == (3,)
+
+
+def test_player_caches_searches_until_flags_change():
+    player = VideoPlayer()
+    player.find_videos("CAT")
+    player.find_videos("cat")
+    player.find_videos_tag("#dog")
+    assert (player.search_cache.hits, player.search_cache.misses) == (1, 2)
+
+    player.flag_video("amazing_cats_video_id")
+    assert len(player.search_cache) == 1
+    assert [video.video_id for video in player.find_videos("cat")] == [
+        "another_cat_video_id"]
+
+    player.allow_video("amazing_cats_video_id")
+    assert len(player.search_cache) == 1
+    assert len(player.find_videos("cat")) == 2
+
+
+def test_player_cache_cleared_when_catalog_changes():
+    library = VideoLibrary()
+    player = VideoPlayer(video_library=library)
+    assert len(player.find_videos("cat")) == 2
+
+    library.add_video(Video("Cat Nap", "cat_nap_video_id", ["#cat"]))
+    assert len(player.find_videos("cat")) == 3
+
+
+def test_player_tag_match_modes_follow_flags():
+    player = VideoPlayer()
+    assert len(player.find_videos_tag("#cat", "exact")) == 2
+    assert len(player.find_videos_tag("#ca", "prefix")) == 3
+
+    player.flag_video("amazing_cats_video_id")
+    assert len(player.find_videos_tag("#cat", "exact")) == 1
+    assert len(player.find_videos_tag("#ca", "prefix")) == 2
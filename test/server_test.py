@@ -0,0 +1,130 @@
+import asyncio
+import os
+
+from src.server import GOODBYE, PROMPT, VideoServer, reload_periodically
+from src.server import _SessionOutput
+from src.video import Video
+from src.video_library import VideoLibrary
+
+
+async def _talk(port, commands):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port,
+                                                   limit=1 << 20)
+    replies = [await reader.readuntil(PROMPT.encode())]
+    for command in commands:
+        writer.write(f"{command}\n".encode())
+        await writer.drain()
+        replies.append(await reader.readuntil(PROMPT.encode()))
+    writer.write(b"EXIT\n")
+    replies.append(await reader.read())
+    writer.close()
+    return [reply.decode() for reply in replies]
+
+
+def test_sessions_share_library_but_not_flags():
+    async def scenario():
+        library = VideoLibrary()
+        server = await VideoServer(library).start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        first, second = await asyncio.gather(
+            _talk(port, ["FLAG_VIDEO funny_dogs_video_id", "PLAY",
+                         "SEARCH_VIDEOS dogs"]),
+            _talk(port, ["PLAY funny_dogs_video_id"]))
+        server.close()
+        await server.wait_closed()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert "Hello and welcome to YouTube" in first[0]
+    assert "Successfully flagged video: Funny Dogs" in first[1]
+    assert "Please enter PLAY command followed by video_id." in first[2]
+    assert first[3] == "No search results for dogs\n" + PROMPT
+    assert GOODBYE in first[4]
+    assert second[1] == "Playing video: Funny Dogs\n" + PROMPT
+
+
+def test_rest_of_an_over_long_line_is_not_run():
+    async def scenario():
+        library = VideoLibrary()
+        server = await VideoServer(library).start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        replies = await _talk(port, [
+            "x" * 9000 + " FLAG_VIDEO amazing_cats_video_id",
+            "PLAY amazing_cats_video_id"])
+        server.close()
+        await server.wait_closed()
+        return replies
+
+    replies = asyncio.run(scenario())
+
+    assert replies[1] == "Please enter a shorter command.\n" + PROMPT
+    assert replies[2] == "Playing video: Amazing Cats\n" + PROMPT
+
+
+def test_long_listing_is_sent_in_full(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text("".join(f"Video {i:04} | video_{i} | #tag\n"
+                                   for i in range(2500)))
+
+    async def scenario():
+        library = VideoLibrary(videos_file)
+        server = await VideoServer(library).start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        replies = await _talk(port, ["SHOW_ALL_VIDEOS"])
+        server.close()
+        await server.wait_closed()
+        return replies
+
+    lines = asyncio.run(scenario())[1].splitlines()
+
+    assert len(lines) == 2502
+    assert lines[1] == "  Video 0000 (video_0) [#tag]"
+    assert lines[-2] == "  Video 2499 (video_2499) [#tag]"
+    assert lines[-1] == PROMPT
+
+
+def test_listing_stops_when_the_catalog_is_reloaded_while_sending():
+    library = VideoLibrary()
+    sent = []
+
+    class Writer:
+        def write(self, data):
+            sent.append(data.decode())
+
+        async def drain(self):
+            library.add_video(Video("Cat Nap", "cat_nap_video_id", []))
+
+    output = _SessionOutput(library)
+    output.write_lines(str(i) for i in range(5000))
+    output.write("Done")
+    asyncio.run(output.send(Writer(), PROMPT))
+
+    assert len(sent[0].splitlines()) == 1000
+    assert sent[1] == ("The catalog was reloaded while listing, please "
+                       "enter the command again.\n" + PROMPT)
+
+
+def test_reload_keeps_running_after_a_failed_reload(tmp_path, caplog):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n")
+    library = VideoLibrary(videos_file)
+
+    async def scenario():
+        reloader = asyncio.create_task(reload_periodically(library, 0.01))
+        # The file is missing for a while, as during an atomic replace.
+        videos_file.unlink()
+        await asyncio.sleep(0.05)
+        videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n"
+                               "Cat Nap | cat_nap_video_id | #cat\n")
+        os.utime(videos_file, ns=(0, 0))
+        for _ in range(100):
+            if library.video_count() == 2:
+                break
+            await asyncio.sleep(0.01)
+        reloader.cancel()
+
+    asyncio.run(scenario())
+
+    assert library.video_count() == 2
+    assert "Could not reload the catalog" in caplog.text
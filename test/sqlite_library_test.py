@@ -0,0 +1,102 @@
+import random
+import sqlite3
+
+from src.output import MemoryWriter
+from src.sqlite_library import SqlitePlayerStore, SqliteVideoLibrary
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def _ids(videos):
+    return [video.video_id for video in videos]
+
+
+def _has_trigram_tokenizer():
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute(
+            "CREATE VIRTUAL TABLE t USING fts5(x, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+def test_sqlite_library_matches_video_library():
+    library = VideoLibrary()
+    sqlite_library = SqliteVideoLibrary()
+    # Older SQLite builds lack the tokenizer, and the library scans instead.
+    assert sqlite_library.has_fts == _has_trigram_tokenizer()
+    assert ([str(video) for video in sqlite_library.get_videos_by_title()]
+            == [str(video) for video in library.get_videos_by_title()])
+    assert (_ids(sqlite_library.iter_videos_by_title(1, 2))
+            == _ids(library.iter_videos_by_title(1, 2)))
+    assert str(sqlite_library.get_video("amazing_cats_video_id")) == str(
+        library.get_video("amazing_cats_video_id"))
+    assert sqlite_library.get_video("missing") is None
+    for term in ("", "CAT", "video", "o", "nothing", '"'):
+        assert (_ids(sqlite_library.search_titles(term))
+                == _ids(library.search_titles(term)))
+    for match in ("exact", "prefix", "substring"):
+        for tag in ("#cat", "#DOG", "#", "dog"):
+            assert (_ids(sqlite_library.search_tags(tag, match))
+                    == _ids(library.search_tags(tag, match)))
+
+
+def test_sqlite_library_searches_without_fts():
+    library = SqliteVideoLibrary()
+    library.has_fts = False
+    assert _ids(library.search_titles("CAT")) == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+
+
+def test_sqlite_library_flags(tmp_path):
+    database = tmp_path / "videos.db"
+    library = SqliteVideoLibrary(database)
+    library.flag_video("amazing_cats_video_id", "dont_like")
+    assert library.version == 1
+    assert library.playable_count() == 4
+    assert "amazing_cats_video_id" not in library.playable_video_ids()
+    library.close()
+
+    library = SqliteVideoLibrary(database)
+    assert library.get_video("amazing_cats_video_id").flags == "dont_like"
+    library.flag_video("amazing_cats_video_id", None)
+    assert library.playable_count() == 5
+
+
+def test_sqlite_random_video_id_skips_flagged():
+    library = SqliteVideoLibrary()
+    for video_id in library.playable_video_ids()[1:]:
+        library.flag_video(video_id, "dont_like")
+    assert library.random_video_id(random) == (
+        "funny_dogs_video_id")
+    library.flag_video("funny_dogs_video_id", "dont_like")
+    assert library.random_video_id(random) is None
+
+
+def test_player_on_sqlite_library_and_store(tmp_path):
+    database = tmp_path / "youtube.db"
+    player = VideoPlayer(video_library=SqliteVideoLibrary(database),
+                         output=MemoryWriter(),
+                         store=SqlitePlayerStore(database, "always"))
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.remove_from_playlist("my_playlist", "amazing_cats_video_id")
+    player.flag_video("life_at_google_video_id", "dont_like")
+    player.close()
+
+    player = VideoPlayer(video_library=SqliteVideoLibrary(database),
+                         output=MemoryWriter(),
+                         store=SqlitePlayerStore(database))
+    assert list(player.playlists["my_playlist"]) == ["funny_dogs_video_id"]
+    player.search_videos("google")
+    player.delete_playlist("MY_PLAYLIST")
+    player.close()
+    assert player.output.getvalue().splitlines() == [
+        "No search results for google", "Deleted playlist: MY_PLAYLIST"]
+    store = SqlitePlayerStore(database)
+    assert store.load()["playlists"] == {}
+    store.close()
@@ -0,0 +1,112 @@
+import json
+import time
+
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.output import MemoryWriter
+from src.stats import Histogram, NullStats, Stats
+from src.video_player import VideoPlayer
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for _ in range(98):
+        histogram.record(0.000_003)
+    histogram.record(0.010)
+    histogram.record(0.020)
+
+    summary = histogram.to_dict()
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 0.004
+    assert summary["p99_ms"] == pytest.approx(16.384)
+    assert summary["max_ms"] == 20
+    assert summary["buckets_ms"] == {"0.004": 98, "16.384": 1, "32.768": 1}
+
+
+def test_parser_records_commands_and_errors():
+    player = VideoPlayer(output=MemoryWriter())
+    parser = CommandParser(player)
+    parser.execute_command(["play", "amazing_cats_video_id"])
+    parser.execute_command(["PLAY", "funny_dogs_video_id"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["PLAY"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["PLAY_RESULT", "one"])
+
+    commands = player.stats.dump()
+    assert list(commands) == ["PLAY", "PLAY_RESULT"]
+    assert (commands["PLAY"]["count"], commands["PLAY"]["errors"]) == (2, 1)
+    assert (commands["PLAY_RESULT"]["count"],
+            commands["PLAY_RESULT"]["errors"]) == (1, 1)
+
+
+def test_player_records_direct_calls_once():
+    player = VideoPlayer(output=MemoryWriter(), interactive=False)
+    player.play_video("amazing_cats_video_id")
+    player.play_random_video()
+    player.find_videos("cat")
+    CommandParser(player).execute_command(["PLAY", "funny_dogs_video_id"])
+
+    commands = player.stats.dump()
+    # Stopping the playing video and playing the random one are counted in
+    # the operation that did it.
+    assert {name: summary["count"] for name, summary in commands.items()} == {
+        "PLAY": 2, "PLAY_RANDOM": 1, "FIND_VIDEOS": 1}
+
+
+def test_search_latency_leaves_out_the_answer_wait(monkeypatch):
+    def slow_answer():
+        time.sleep(0.2)
+        return "1"
+
+    monkeypatch.setattr("builtins.input", slow_answer)
+    player = VideoPlayer(output=MemoryWriter())
+    CommandParser(player).execute_command(["SEARCH_VIDEOS", "cat"])
+
+    assert player.currently_playing.video_id == "amazing_cats_video_id"
+    assert player.stats.dump()["SEARCH_VIDEOS"]["max_ms"] < 100
+
+
+def test_stats_command():
+    stats = Stats()
+    player = VideoPlayer(output=MemoryWriter(), interactive=False,
+                         stats=stats)
+    parser = CommandParser(player)
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["CREATE_PLAYLIST", "my_playlist"])
+    player.output.clear()
+
+    parser.execute_command(["STATS", "json"])
+    report = json.loads(player.output.getvalue())
+    assert report["commands"]["SEARCH_VIDEOS"]["count"] == 2
+    assert report["search_cache"]["hit_rate"] == 0.5
+    assert report["catalog"] == {"videos": 5, "playable_videos": 5,
+                                 "playlists": 1}
+    player.output.clear()
+
+    parser.execute_command(["STATS"])
+    lines = player.output.getvalue().splitlines()
+    assert lines[0].split() == ["COMMAND", "COUNT", "ERRORS", "MEAN", "MS",
+                                "P50", "MS", "P99", "MS", "MAX", "MS"]
+    assert [line.split()[:3] for line in lines[1:4]] == [
+        ["CREATE_PLAYLIST", "1", "0"], ["SEARCH_VIDEOS", "2", "0"],
+        ["STATS", "1", "0"]]
+    assert lines[4:] == [
+        "Search cache: 1 hits, 1 misses (50.0% hit rate), 1/1024 entries",
+        "Catalog: 5 videos, 5 playable, 1 playlists"]
+    with pytest.raises(CommandException):
+        parser.execute_command(["STATS", "XML"])
+
+
+def test_null_stats_records_nothing():
+    player = VideoPlayer(output=MemoryWriter(), stats=NullStats())
+    parser = CommandParser(player)
+    parser.execute_command(["PLAY", "amazing_cats_video_id"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["PLAY"])
+    assert player.stats.dump() == {}
+    parser.execute_command(["STATS"])
+    assert player.output.getvalue().splitlines()[1] == (
+        "Command statistics are disabled")
@@ -0,0 +1,26 @@
+import pytest
+from src.video_playlist import Playlist
+
+
+def test_playlist_keeps_insertion_order():
+    playlist = Playlist("my_playlist")
+    for video_id in ("b", "a", "c", "a"):
+        playlist.add(video_id)
+    playlist.remove("b")
+    playlist.add("b")
+
+    assert playlist.name == "my_playlist"
+    assert list(playlist) == ["a", "c", "b"]
+    assert len(playlist) == 3
+    assert "c" in playlist
+
+
+def test_playlist_remove_missing_and_clear():
+    playlist = Playlist("my_playlist")
+    playlist.add("a")
+    with pytest.raises(KeyError):
+        playlist.remove("b")
+
+    playlist.clear()
+    assert not playlist
+    assert "a" not in playlist
@@ -1,4 +1,10 @@
-from src.video_library import VideoLibrary
+import os
+import random
+
+from src.output import MemoryWriter
+from src.video import Video
+from src.video_library import VideoLibrary, VideoLibraryOverlay, _chunk_ranges
+from src.video_player import VideoPlayer
 
 
 def test_library_has_all_videos():
@@ -24,3 +30,279 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_search_titles_ignores_case_and_sorts_by_title():
+    library = VideoLibrary()
+    videos = library.search_titles("CAT")
+
+    assert [video.video_id for video in videos] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+
+
+def test_search_titles_short_and_missing_terms():
+    library = VideoLibrary()
+
+    assert [video.video_id for video in library.search_titles("at")] == [
+        "amazing_cats_video_id", "another_cat_video_id",
+        "life_at_google_video_id"]
+    assert library.search_titles("blah") == []
+
+
+def test_search_titles_with_terms_shorter_than_ngrams():
+    library = VideoLibrary()
+    library.add_video(Video("A Nap", "nap_video_id", []))
+    library.remove_video("funny_dogs_video_id")
+
+    for term in ("", "a", "N", "go", "ap"):
+        assert library.search_titles(term) == [
+            video for video in library.get_videos_by_title()
+            if term.lower() in video.title.lower()]
+
+
+def test_search_tags_match_modes():
+    library = VideoLibrary()
+
+    def ids(videos):
+        return [video.video_id for video in videos]
+
+    assert ids(library.search_tags("#CAT", match="exact")) == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert ids(library.search_tags("#ca", match="exact")) == []
+    assert ids(library.search_tags("#ca", match="prefix")) == [
+        "amazing_cats_video_id", "another_cat_video_id",
+        "life_at_google_video_id"]
+    assert ids(library.search_tags("og")) == [
+        "funny_dogs_video_id", "life_at_google_video_id"]
+
+
+def test_search_tags_includes_added_videos():
+    library = VideoLibrary()
+    library.add_video(Video("Cat Nap", "cat_nap_video_id", ["#cat"]))
+
+    assert [video.video_id for video in library.search_tags("#cat")] == [
+        "amazing_cats_video_id", "another_cat_video_id", "cat_nap_video_id"]
+    assert [video.video_id for video in library.search_titles("nap")] == [
+        "cat_nap_video_id"]
+
+
+def test_add_video_replaces_existing_id():
+    library = VideoLibrary()
+    library.add_video(Video("Funny Puppies", "funny_dogs_video_id", ["#pup"]))
+
+    assert library.video_count() == 5
+    assert library.search_titles("dogs") == []
+    assert library.search_tags("#dog") == []
+    assert [video.video_id for video in library.search_tags("#pup")] == [
+        "funny_dogs_video_id"]
+    assert [video.title for video in library.get_videos_by_title()].count(
+        "Funny Puppies") == 1
+    assert sorted(library.playable_video_ids()).count(
+        "funny_dogs_video_id") == 1
+    assert library.playable_count() == 5
+
+
+def test_catalog_listing_a_video_twice_keeps_the_last_line(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text("Funny Dogs | dogs_video_id | #dog\n"
+                           "Cat Nap | cat_nap_video_id | #cat\n"
+                           "Funny Puppies | dogs_video_id | #pup\n")
+    for library in (VideoLibrary(videos_file),
+                    VideoLibrary(videos_file, tmp_path / "videos.snapshot")):
+        assert sorted(library.playable_video_ids()) == [
+            "cat_nap_video_id", "dogs_video_id"]
+        assert library.search_tags("#dog") == []
+        assert library.search_titles("dogs") == []
+        assert [video.title for video in library.get_videos_by_title()] == [
+            "Cat Nap", "Funny Puppies"]
+        library.flag_video("dogs_video_id", "dont_like_dogs")
+        assert library.playable_video_ids() == ["cat_nap_video_id"]
+
+
+def test_videos_by_title_stays_sorted_after_add():
+    library = VideoLibrary()
+    library.add_video(Video("Cat Nap", "cat_nap_video_id", ["#cat"]))
+
+    titles = [video.title for video in library.get_videos_by_title()]
+    assert titles == sorted(titles)
+    assert titles[2] == "Cat Nap"
+
+
+def test_overlay_flags_do_not_leak_between_sessions():
+    library = VideoLibrary()
+    first = VideoLibraryOverlay(library)
+    second = VideoLibraryOverlay(library)
+
+    first.flag_video("amazing_cats_video_id", "dont_like_cats")
+
+    assert first.get_video("amazing_cats_video_id").flags == "dont_like_cats"
+    assert first.search_titles("cats")[0].flags == "dont_like_cats"
+    assert second.get_video("amazing_cats_video_id").flags is None
+    assert library.get_video("amazing_cats_video_id").flags is None
+
+    first.flag_video("amazing_cats_video_id", None)
+    assert first.get_video("amazing_cats_video_id") is library.get_video(
+        "amazing_cats_video_id")
+
+
+def test_videos_share_tag_strings():
+    library = VideoLibrary()
+    dogs = library.get_video("funny_dogs_video_id")
+    cats = library.get_video("amazing_cats_video_id")
+
+    assert dogs.tags[1] is cats.tags[1]
+    assert not hasattr(dogs, "__dict__")
+
+
+def test_random_video_id_skips_flagged():
+    library = VideoLibrary()
+    rng = random.Random(0)
+    library.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    session = VideoLibraryOverlay(library)
+    session.flag_video("amazing_cats_video_id", "dont_like_cats")
+    session.flag_video("funny_dogs_video_id", None)
+
+    drawn = {session.random_video_id(rng) for _ in range(200)}
+    assert drawn == {"funny_dogs_video_id", "another_cat_video_id",
+                     "life_at_google_video_id", "nothing_video_id"}
+    assert library.playable_count() == 4
+    assert "funny_dogs_video_id" not in {
+        library.random_video_id(rng) for _ in range(200)}
+
+
+def test_overlay_playable_count_follows_session_flags():
+    library = VideoLibrary()
+    library.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    session = VideoLibraryOverlay(library)
+    assert session.playable_count() == 4
+
+    session.flag_video("amazing_cats_video_id", "dont_like_cats")
+    session.flag_video("funny_dogs_video_id", "still_dont_like_dogs")
+    assert session.playable_count() == 3
+    session.flag_video("funny_dogs_video_id", None)
+    session.flag_video("nothing_video_id", None)
+    assert session.playable_count() == 4
+    session.flag_video("amazing_cats_video_id", None)
+    assert session.playable_count() == 5
+
+    library.flag_video("life_at_google_video_id", "dont_like_google")
+    session.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    assert session.playable_count() == 3
+    assert session.playable_count() == len(session.playable_video_ids())
+
+
+def test_reload_applies_changed_lines_only(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text(
+        "Funny Dogs | funny_dogs_video_id | #dog , #animal\n"
+        "Amazing Cats | amazing_cats_video_id | #cat , #animal\n"
+        "Life at Google | life_at_google_video_id | #google\n")
+    library = VideoLibrary(videos_file)
+    session = VideoLibraryOverlay(library)
+    library.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    session.flag_video("amazing_cats_video_id", "dont_like_cats")
+    dogs = library.get_video("funny_dogs_video_id")
+    assert not library.reload()
+
+    videos_file.write_text(
+        "Funny Dogs | funny_dogs_video_id | #dog , #animal\n"
+        "Amazing Kittens | amazing_cats_video_id | #cat , #animal\n"
+        "Cat Nap | cat_nap_video_id | #cat\n")
+    os.utime(videos_file, ns=(0, 0))
+    assert library.reload()
+
+    assert library.get_video("funny_dogs_video_id") is dogs
+    assert dogs.flags == "dont_like_dogs"
+    assert library.get_video("life_at_google_video_id") is None
+    assert library.search_tags("#google") == []
+    assert [video.title for video in library.get_videos_by_title()] == [
+        "Amazing Kittens", "Cat Nap", "Funny Dogs"]
+    assert [video.video_id for video in library.search_titles("kitten")] == [
+        "amazing_cats_video_id"]
+    assert library.search_titles("amazing cats") == []
+    kittens = session.get_video("amazing_cats_video_id")
+    assert (kittens.title, kittens.flags) == ("Amazing Kittens",
+                                              "dont_like_cats")
+    assert sorted(session.playable_video_ids()) == ["cat_nap_video_id"]
+
+
+def test_playlist_keeps_videos_removed_by_reload(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n"
+                           "Cat Nap | cat_nap_video_id | #cat\n")
+    library = VideoLibrary(videos_file)
+    player = VideoPlayer(video_library=library, output=MemoryWriter())
+    player.create_playlist("mine")
+    player.add_to_playlist("mine", "funny_dogs_video_id")
+    player.add_to_playlist("mine", "cat_nap_video_id")
+    videos_file.write_text("Cat Nap | cat_nap_video_id | #cat\n")
+    os.utime(videos_file, ns=(0, 0))
+    assert library.reload()
+    player.output.clear()
+
+    player.show_playlist("mine")
+    player.remove_from_playlist("mine", "funny_dogs_video_id")
+    player.remove_from_playlist("mine", "funny_dogs_video_id")
+    assert player.output.getvalue().splitlines() == [
+        "Showing playlist: mine",
+        "funny_dogs_video_id (no longer in the library)",
+        "Cat Nap (cat_nap_video_id) [#cat]",
+        "Removed video from mine: funny_dogs_video_id",
+        "Cannot remove video from mine: Video does not exist"]
+
+def test_reload_after_snapshot_load(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    snapshot_file = tmp_path / "videos.snapshot"
+    videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n")
+    VideoLibrary(videos_file, snapshot_file)
+    library = VideoLibrary(videos_file, snapshot_file)
+    dogs = library.get_video("funny_dogs_video_id")
+
+    videos_file.write_text("Funny Dogs | funny_dogs_video_id | #dog\n"
+                           "Cat Nap | cat_nap_video_id | #cat\n")
+    os.utime(videos_file, ns=(0, 0))
+    assert library.reload()
+
+    assert library.get_video("funny_dogs_video_id") is dogs
+    assert len(library.get_all_videos()) == 2
+
+
+def test_chunk_ranges_start_on_lines(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    videos_file.write_bytes(b"a|a|\n" * 10 + b"b|b|\n")
+    ranges = _chunk_ranges(videos_file, 4)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 55
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and start % 5 == 0
+    assert _chunk_ranges(videos_file, 100)[-1] == (50, 55)
+
+
+def test_parallel_load_matches_sequential_load(tmp_path):
+    videos_file = tmp_path / "videos.txt"
+    lines = [f"Video {number} {random.Random(number).choice('ABC')} | "
+             f"video_{number} | #tag{number % 7} , #Common\n"
+             for number in range(500)]
+    lines[10] = "\n"
+    lines[20] = "No Tags | no_tags_video_id |\n"
+    lines[450] = "Replacement | video_5 | #fresh\n"
+    videos_file.write_text("".join(lines))
+    sequential = VideoLibrary(videos_file)
+    parallel = VideoLibrary(videos_file, workers=3)
+
+    def ids(videos):
+        return [video.video_id for video in videos]
+
+    assert ([str(video) for video in parallel.get_all_videos()]
+            == [str(video) for video in sequential.get_all_videos()])
+    assert (ids(parallel.get_videos_by_title())
+            == ids(sequential.get_videos_by_title()))
+    assert ids(parallel.search_titles("deo 1")) == ids(
+        sequential.search_titles("deo 1"))
+    assert ids(parallel.search_tags("#common", "exact")) == ids(
+        sequential.search_tags("#common", "exact"))
+    assert "video_5" not in ids(parallel.search_tags("#tag5", "exact"))
+    assert ids(parallel.search_tags("#fresh")) == ["video_5"]
+    assert ids(parallel.search_titles("Video 5 ")) == []
+    assert parallel._line_keys == sequential._line_keys
+    assert parallel.playable_count() == 498
+    assert not parallel.reload()